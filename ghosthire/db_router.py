@@ -0,0 +1,90 @@
+"""
+Primary/replica database routing for Ghost Hire
+
+Browse-heavy GET views (decorated with @replica_reads) read from a replica
+listed in settings.DATABASE_REPLICAS; everything else uses the primary.
+After a request writes anything, the user's session is pinned to the primary
+for DATABASE_REPLICA_PIN_SECONDS so they always see their own changes.
+
+Local testing with two SQLite files:
+
+    DATABASES = {
+        'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': 'primary.sqlite3'},
+        'replica': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': 'replica.sqlite3',
+                    'TEST': {'MIRROR': 'default'}},
+    }
+    DATABASE_REPLICAS = ['replica']
+
+Migrations only run on 'default'; after `migrate`, copy primary.sqlite3 to
+replica.sqlite3 to stand in for replication.
+"""
+from contextvars import ContextVar
+from django.conf import settings
+import random
+import time
+
+# Per-request routing state (contextvars keep threads and async tasks isolated)
+_use_replica = ContextVar('use_replica', default=False)
+_wrote = ContextVar('wrote', default=False)
+
+PIN_SESSION_KEY = 'db_primary_pinned_until'
+
+
+def _replicas():
+    return [alias for alias in getattr(settings, 'DATABASE_REPLICAS', []) if alias in settings.DATABASES]
+
+
+class PrimaryReplicaRouter:
+    """Send reads to a replica only while a read-only view is being served"""
+
+    def db_for_read(self, model, **hints):
+        if _use_replica.get():
+            replicas = _replicas()
+            if replicas:
+                return random.choice(replicas)
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        _wrote.set(True)
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # All aliases hold the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Enables replica reads for safe requests to @replica_reads views and pins
+    the session to the primary after any write. Must come after
+    SessionMiddleware in settings.MIDDLEWARE.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        replica_token = _use_replica.set(False)
+        wrote_token = _wrote.set(False)
+        try:
+            response = self.get_response(request)
+            if _wrote.get():
+                pin_seconds = getattr(settings, 'DATABASE_REPLICA_PIN_SECONDS', 5)
+                request.session[PIN_SESSION_KEY] = time.time() + pin_seconds
+            return response
+        finally:
+            _use_replica.reset(replica_token)
+            _wrote.reset(wrote_token)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not getattr(view_func, 'use_replica', False):
+            return None
+        if request.method not in ('GET', 'HEAD'):
+            return None
+        if request.session.get(PIN_SESSION_KEY, 0) > time.time():
+            return None
+        _use_replica.set(True)
+        return None
@@ -52,6 +52,7 @@ MIDDLEWARE = [
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
+    "ghosthire.db_router.ReplicaRoutingMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
@@ -92,6 +93,21 @@ DATABASES = {
     }
 }
 
+# Optional read replica - browse-heavy views read from it (see ghosthire/db_router.py)
+if os.environ.get("MYSQL_REPLICA_HOST"):
+    DATABASES["replica"] = {
+        **DATABASES["default"],
+        "HOST": os.environ.get("MYSQL_REPLICA_HOST"),
+        "PORT": os.environ.get("MYSQL_REPLICA_PORT", DATABASES["default"]["PORT"]),
+        "TEST": {"MIRROR": "default"},
+    }
+
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != "default"]
+DATABASE_ROUTERS = ["ghosthire.db_router.PrimaryReplicaRouter"]
+
+# After a write, keep the user's reads on the primary this long (covers replica lag)
+DATABASE_REPLICA_PIN_SECONDS = int(os.environ.get("DATABASE_REPLICA_PIN_SECONDS", 5))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -131,10 +147,93 @@ STATIC_URL = "/static/"
 STATICFILES_DIRS = [BASE_DIR / "static"]
 STATIC_ROOT = BASE_DIR / "staticfiles"
 
+# collectstatic writes content-hashed filenames (safe to cache forever), WebP copies
+# of theme images and pre-compressed .gz/.br files - see haunted_profiles/storage.py
+STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
+    "staticfiles": {
+        "BACKEND": "haunted_profiles.storage.OptimizedStaticFilesStorage",
+    },
+}
+STATIC_WEBP_MAX_WIDTH = 512
+
 # Media files
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Verification photo uploads - hard byte cap, pixel caps and the verifier's working size
+VERIFICATION_MAX_UPLOAD_BYTES = int(os.environ.get('VERIFICATION_MAX_UPLOAD_BYTES', 8 * 1024 * 1024))
+VERIFICATION_MAX_PIXELS = 40_000_000
+# PNG/WebP can't be decoded at reduced scale - the full image is decoded first
+VERIFICATION_MAX_PIXELS_FULL_DECODE = 12_000_000
+VERIFICATION_IMAGE_SIZE = 224
+
+# Portfolio analysis history retention: every refresh from the last 30 days,
+# then one per week for a year, one per month after that. Only the newest few
+# snapshots keep the full compressed analysis; the rest keep just the metrics.
+PORTFOLIO_HISTORY_DAILY_DAYS = 30
+PORTFOLIO_HISTORY_WEEKLY_DAYS = 365
+PORTFOLIO_HISTORY_MAX_POINTS = 120
+PORTFOLIO_HISTORY_FULL_PAYLOADS = 3
+
+# GitHub/LinkedIn/Devpost are fetched concurrently; sources still running
+# after this many seconds are reported as timed out
+PORTFOLIO_SOURCE_DEADLINE_SECONDS = int(os.environ.get('PORTFOLIO_SOURCE_DEADLINE_SECONDS', 30))
+
+# Total time an in-request analysis may take (keep well under gunicorn's
+# --timeout 120). Whatever doesn't fit is stored as partial and finished in
+# the background with the larger completion budget; leftovers are swept up by
+# `manage.py complete_portfolio_analyses`
+PORTFOLIO_ANALYSIS_BUDGET_SECONDS = int(os.environ.get('PORTFOLIO_ANALYSIS_BUDGET_SECONDS', 45))
+PORTFOLIO_COMPLETION_BUDGET_SECONDS = int(os.environ.get('PORTFOLIO_COMPLETION_BUDGET_SECONDS', 300))
+
+# Repo listing: pages after the first are fetched this many at a time, up to
+# GITHUB_MAX_REPO_PAGES pages of 100 repos
+GITHUB_REPO_PAGE_WORKERS = 4
+GITHUB_MAX_REPO_PAGES = 30
+
+# Commit analysis backend: 'api' reads the last 30 commits of each repo over
+# REST; 'git' streams the full history of bare clones in GIT_MIRROR_DIR
+# (<username>/<repo>.git), falling back to the API for repos without one
+GITHUB_COMMIT_BACKEND = os.environ.get('GITHUB_COMMIT_BACKEND', 'api')
+GIT_MIRROR_DIR = os.environ.get('GIT_MIRROR_DIR')
+GIT_AUTO_MIRROR = os.environ.get('GIT_AUTO_MIRROR', 'False') == 'True'
+GIT_LOG_MAX_COMMITS = 20000
+GIT_COMMAND_TIMEOUT_SECONDS = 60
+
+# Circuit breakers around external dependencies: after failure_threshold
+# consecutive failures calls fail fast for reset_timeout seconds, then one
+# probe is let through. request_timeout caps every call (seconds).
+# State per worker is at /api/circuit-breakers/ (staff only)
+CIRCUIT_BREAKERS = {
+    'github': {'failure_threshold': 5, 'reset_timeout': 30, 'request_timeout': 10},
+    'devpost': {'failure_threshold': 3, 'reset_timeout': 60, 'request_timeout': 8},
+    'workos': {'failure_threshold': 3, 'reset_timeout': 30, 'request_timeout': 8},
+}
+
+# New signups get ghost_xxxxxx usernames from a counter; each worker reserves
+# this many at a time (one database write per block)
+GHOST_ID_BLOCK_SIZE = 100
+
+# Syntax highlighting for code snippets/messages is cached per worker (LRU of
+# rendered HTML, this many bytes) and in the database (pruned to this many rows
+# by `manage.py prune_highlight_cache`). Pastes over the byte/line limits are
+# shown as plain text instead of being highlighted. Snippets without a
+# recognisable language are highlighted as HIGHLIGHT_DEFAULT_LANGUAGE
+HIGHLIGHT_DEFAULT_LANGUAGE = 'python'
+HIGHLIGHT_MEMORY_CACHE_BYTES = 4 * 1024 * 1024
+HIGHLIGHT_DB_MAX_ROWS = 50_000
+HIGHLIGHT_MAX_BYTES = 20_000
+HIGHLIGHT_MAX_LINES = 500
+
+# Near-duplicate submissions: the first SIMILARITY_MAX_BYTES of a submission's
+# code/upload are fingerprinted at submit time, and companies rating it see
+# other submissions to the same opportunity at least this similar (0-1)
+SIMILARITY_THRESHOLD = 0.8
+SIMILARITY_MAX_BYTES = 256 * 1024
+
 # SECURITY NOTE: In production, configure your web server (nginx/apache) to block
 # public access to /media/verification_photos/ directory. These photos should
 # NEVER be publicly accessible. Only ghost_avatars should be served publicly.
@@ -149,6 +248,8 @@ AUTH_USER_MODEL = "haunted_profiles.User"
 
 # Authentication Backends
 AUTHENTICATION_BACKENDS = [
+    "haunted_profiles.backends.LeanModelBackend",
+    # Kept so sessions created before LeanModelBackend stay logged in
     "django.contrib.auth.backends.ModelBackend",
 ]
 
@@ -157,6 +258,9 @@ WORKOS_CLIENT_ID = os.environ.get('WORKOS_CLIENT_ID', '')
 WORKOS_API_KEY = os.environ.get('WORKOS_API_KEY', '')
 WORKOS_REDIRECT_URI = os.environ.get('WORKOS_REDIRECT_URI', 'http://localhost:8000/auth/callback/')
 
+# Cold-start budget enforced by `manage.py check_import_time`
+IMPORT_TIME_BUDGET_MS = int(os.environ.get('IMPORT_TIME_BUDGET_MS', 2000))
+
 # Login/Logout URLs
 LOGIN_REDIRECT_URL = "/verification/"
 LOGOUT_REDIRECT_URL = "/"
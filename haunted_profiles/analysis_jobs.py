@@ -0,0 +1,55 @@
+"""
+Analysis Jobs
+Finishes portfolio analyses that ran out of their in-request time budget.
+
+The partial result is stored straight away (PortfolioSnapshot.partial) and
+the rest is completed in a background thread once the response is out -
+memoized stages mean only the skipped work runs again. Anything still
+partial after that (e.g. the process restarted first) is picked up by
+`python manage.py complete_portfolio_analyses`, meant to run from cron.
+"""
+from django.conf import settings
+from django.db import connection
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def schedule_completion(user_id):
+    """Finish a user's partial analysis in the background"""
+    thread = threading.Thread(
+        target=complete_analysis, args=(user_id,), name=f'portfolio-completion-{user_id}', daemon=True,
+    )
+    thread.start()
+    logger.info(f"⏳ Scheduled completion of partial portfolio for user {user_id}")
+    return thread
+
+
+def complete_analysis(user_id, budget=None):
+    """
+    Re-run a user's analysis with the (larger) completion budget. It isn't
+    rescheduled if it's still partial - the sweep command retries later.
+
+    Returns: the portfolio data, or None if the user is gone or it failed
+    """
+    from .models import User
+
+    budget = budget or getattr(settings, 'PORTFOLIO_COMPLETION_BUDGET_SECONDS', 300)
+    try:
+        user = User.objects.get(pk=user_id)
+        portfolio_data = user.analyze_portfolio(budget=budget, schedule_remaining=False)
+        if portfolio_data['partial']:
+            logger.warning(f"Portfolio for {user.username} still partial after {budget}s")
+        else:
+            logger.info(f"✅ Completed partial portfolio for {user.username}")
+        return portfolio_data
+    except User.DoesNotExist:
+        return None
+    except Exception as e:
+        logger.error(f"Error completing portfolio for user {user_id}: {e}")
+        return None
+    finally:
+        if threading.current_thread() is not threading.main_thread():
+            # Background threads get their own connection - don't leak it
+            connection.close()
@@ -0,0 +1,355 @@
+"""
+Analysis Pipeline Module
+Runs the portfolio analysis as a DAG of named stages with declared inputs.
+Every stage output is memoized under a hash of exactly what it reads, so a
+re-run only recomputes stages whose inputs changed - e.g. editing the
+self-description reuses the GitHub fetch and only redoes the text stages.
+
+A run can be given a time Budget: stages and the external calls inside them
+draw from it, and whatever doesn't fit is skipped and reported as partial
+instead of holding the request open
+"""
+from concurrent.futures import ThreadPoolExecutor, wait
+import contextvars
+import hashlib
+import json
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Slice of a run's budget kept back from the sources for the local stages
+# (they take milliseconds, but must not be starved by a slow fetch) ...
+LOCAL_STAGE_RESERVE_SECONDS = 2.0
+# ... and how long past their own budget sources get to hand back what
+# they have before they're abandoned
+SOURCE_GRACE_SECONDS = 1.0
+
+
+class StageUnavailable(Exception):
+    """A network stage has no memoized output and the run isn't allowed to fetch"""
+
+
+class BudgetExhausted(Exception):
+    """The run's time budget is spent - the call wasn't attempted"""
+
+
+class Budget:
+    """
+    Wall-clock allowance for one pipeline run (seconds=None is unlimited).
+
+    The running budget is visible to stage code through current_budget(), so
+    external calls can size their timeouts to what's left rather than to a
+    fixed constant.
+    """
+
+    def __init__(self, seconds=None):
+        self.seconds = seconds
+        self.deadline = None if seconds is None else time.monotonic() + seconds
+
+    def __repr__(self):
+        return f"<Budget {self.remaining()}s left>"
+
+    def sub_budget(self, seconds=None, reserve=0.0):
+        """A Budget ending reserve seconds before this one (and within seconds from now)"""
+        remaining = self.remaining()
+        if remaining is not None:
+            remaining = max(0.0, remaining - reserve)
+            seconds = remaining if seconds is None else min(seconds, remaining)
+        return Budget(seconds)
+
+    def remaining(self):
+        """Seconds left (None if unlimited)"""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    @property
+    def expired(self):
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def timeout(self, cap=None):
+        """
+        Timeout for one external call: cap, shortened to what's left of the
+        budget. Raises BudgetExhausted when nothing is left.
+        """
+        remaining = self.remaining()
+        if remaining is None:
+            return cap
+        if remaining <= 0:
+            raise BudgetExhausted('time budget spent')
+        return remaining if cap is None else min(cap, remaining)
+
+
+_current_budget = contextvars.ContextVar('analysis_budget', default=None)
+
+
+def current_budget():
+    """Budget of the pipeline run this code is part of (unlimited outside one)"""
+    return _current_budget.get() or Budget()
+
+
+def is_partial(output):
+    """True if a stage output says it's incomplete"""
+    return isinstance(output, dict) and bool(output.get('partial'))
+
+
+class Stage:
+    """
+    One step of the pipeline.
+
+    Args:
+        name: Key the output is stored under (and what later stages list as an input)
+        func: Called with one keyword argument per input (plus user_profile if
+              profile_fields is set, restricted to those fields)
+        inputs: Names of pipeline inputs or earlier stages this stage reads
+        profile_fields: Self-description fields this stage reads
+        network: True if the stage talks to an external service
+        version: Bump to invalidate memoized outputs after changing func
+        default: Output used when func raises
+    """
+
+    def __init__(self, name, func, inputs=(), profile_fields=(), network=False, version=1, default=None):
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.profile_fields = tuple(profile_fields)
+        self.network = network
+        self.version = version
+        self.default = {} if default is None else default
+
+    def __repr__(self):
+        return f"<Stage {self.name}>"
+
+    def arguments(self, values):
+        """Keyword arguments for func, taken from pipeline inputs and earlier outputs"""
+        kwargs = {name: values.get(name) for name in self.inputs}
+        if self.profile_fields:
+            profile = values.get('user_profile') or {}
+            kwargs['user_profile'] = {field: profile.get(field) or '' for field in self.profile_fields}
+        return kwargs
+
+    def input_hash(self, kwargs):
+        encoded = json.dumps([self.name, self.version, kwargs], sort_keys=True, default=str)
+        return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def _timed_call(stage, kwargs):
+    """Run a stage (inline or in a source worker thread), returning (output, error, latency_ms)"""
+    started = time.perf_counter()
+    try:
+        output, error = stage.func(**kwargs), None
+    except Exception as e:
+        output, error = None, e
+    return output, error, round((time.perf_counter() - started) * 1000, 1)
+
+
+def _partial_default(stage):
+    """Stand-in output for a stage that ran out of time"""
+    if isinstance(stage.default, dict):
+        return {**stage.default, 'partial': True}
+    return stage.default
+
+
+class Pipeline:
+    """
+    Ordered set of stages; each stage may only read inputs or stages declared before it.
+
+    Network stages ("sources") may only read pipeline inputs. They are
+    collected first, all at once, under a single deadline, so adding a
+    source doesn't lengthen the critical path; the remaining stages then
+    run in order on the collected results.
+    """
+
+    def __init__(self, stages, inputs=(), source_deadline=None):
+        self.stages = list(stages)
+        self.inputs = tuple(inputs)
+        self.source_deadline = source_deadline
+
+        available = set(self.inputs) | {'user_profile'}
+        for stage in self.stages:
+            missing = set(stage.inputs) - available
+            if missing:
+                raise ValueError(f"Stage {stage.name} reads unknown inputs: {', '.join(sorted(missing))}")
+            if stage.network and not set(stage.inputs) <= set(self.inputs):
+                raise ValueError(f"Source stage {stage.name} may only read pipeline inputs")
+            available.add(stage.name)
+
+    def run(self, inputs, memo=None, refresh=False, offline=False, source_deadline=None, budget=None):
+        """
+        Run every stage, reusing memoized outputs whose input hash still matches.
+
+        Args:
+            inputs: Values for the pipeline inputs (and 'user_profile')
+            memo: {stage_name: {'key': input_hash, 'output': ...}}, updated in place
+            refresh: Re-run network stages even if their inputs haven't changed
+                (True, or the names of the ones to re-run)
+            offline: Raise StageUnavailable instead of running a network stage
+            source_deadline: Seconds the concurrent source fetch may take in total
+                (defaults to the pipeline's); sources still running shortly
+                after get {'error': ..., 'partial': True} as their output
+            budget: Budget (or seconds) for the whole run. Sources get what's
+                left of it minus a reserve for the local stages; a stage that
+                would start after it's spent is skipped and gets its default,
+                marked {'partial': True}
+
+        Partial outputs - skipped, timed out, built on partial inputs, or
+        reporting 'partial' themselves - are never memoized, so the next run
+        redoes exactly that work. A source's {'error': ...} output is
+        memoized like a result unless it's marked partial, so sources must
+        mark transient failures partial (see portfolio_analyzer.source_error).
+        A refreshed source that fails or times out falls back to its
+        memoized output for the same inputs ('stale').
+
+        Returns: (outputs, report) where report is
+            {'recomputed': [...], 'reused': [...], 'timings_ms': {stage: ms},
+             'sources': {stage: {'status': 'ok'|'error'|'timeout'|'partial'|'stale'|'cached', 'latency_ms': ...}},
+             'sources_ms': wall time of the source fetch,
+             'skipped': [...], 'partial': True if any output is incomplete}
+        """
+        memo = {} if memo is None else memo
+        values = dict(inputs)
+        report = {
+            'recomputed': [], 'reused': [], 'timings_ms': {}, 'sources': {}, 'sources_ms': 0,
+            'skipped': [], 'partial': False,
+        }
+        if not isinstance(budget, Budget):
+            budget = Budget(budget)
+        token = _current_budget.set(budget)
+
+        try:
+            remaining = budget.remaining()
+            reserve = 0.0 if remaining is None else min(LOCAL_STAGE_RESERVE_SECONDS, remaining * 0.2)
+            source_budget = budget.sub_budget(
+                self.source_deadline if source_deadline is None else source_deadline, reserve=reserve,
+            )
+
+            sources = [stage for stage in self.stages if stage.network]
+            values.update(self._collect_sources(sources, values, memo, report, refresh, offline, source_budget))
+
+            for stage in self.stages:
+                if not stage.network:
+                    values[stage.name] = self._run_stage(stage, values, memo, report, budget)
+        finally:
+            _current_budget.reset(token)
+
+        report['partial'] = any(is_partial(values[stage.name]) for stage in self.stages)
+        return {stage.name: values[stage.name] for stage in self.stages}, report
+
+    def source_keys(self, inputs):
+        """{source stage name: input hash} for these pipeline inputs - what a memo entry must match"""
+        return {
+            stage.name: stage.input_hash(stage.arguments(inputs)) for stage in self.stages if stage.network
+        }
+
+    def _run_stage(self, stage, values, memo, report, budget):
+        """Output of one local stage - memoized, recomputed, or skipped for lack of budget"""
+        kwargs = stage.arguments(values)
+        key = stage.input_hash(kwargs)
+        cached = memo.get(stage.name)
+
+        if cached and cached.get('key') == key:
+            report['reused'].append(stage.name)
+            return cached['output']
+
+        if budget.expired:
+            logger.warning(f"Skipping analysis stage {stage.name}: time budget spent")
+            report['skipped'].append(stage.name)
+            return _partial_default(stage)
+
+        output, error, latency_ms = _timed_call(stage, kwargs)
+        # Built on incomplete data, so incomplete itself
+        if error is None and isinstance(output, dict) and any(is_partial(values.get(name)) for name in stage.inputs):
+            output = {**output, 'partial': True}
+
+        if error is None and not is_partial(output):
+            memo[stage.name] = {'key': key, 'output': output}
+        else:
+            if error is not None:
+                logger.error(f"Error in analysis stage {stage.name}: {error}")
+                output = _partial_default(stage) if isinstance(error, BudgetExhausted) else stage.default
+            memo.pop(stage.name, None)
+        report['timings_ms'][stage.name] = latency_ms
+        report['recomputed'].append(stage.name)
+        return output
+
+    def _collect_sources(self, sources, values, memo, report, refresh, offline, budget):
+        """Fetch every source that isn't memoized concurrently, within budget; returns {stage_name: output}"""
+        outputs = {}
+        pending = {}
+
+        for stage in sources:
+            kwargs = stage.arguments(values)
+            key = stage.input_hash(kwargs)
+            cached = memo.get(stage.name)
+
+            refreshing = refresh if isinstance(refresh, bool) else stage.name in refresh
+            if cached and cached.get('key') == key and not refreshing:
+                outputs[stage.name] = cached['output']
+                report['reused'].append(stage.name)
+                report['sources'][stage.name] = {'status': 'cached', 'latency_ms': 0}
+            elif offline:
+                raise StageUnavailable(stage.name)
+            else:
+                pending[stage] = (kwargs, key)
+
+        if not pending:
+            return outputs
+
+        deadline = budget.seconds
+        if deadline is not None:
+            # Room for sources that hit their budget to return partial results
+            deadline += min(SOURCE_GRACE_SECONDS, deadline * 0.1)
+
+        started = time.perf_counter()
+        pool = ThreadPoolExecutor(max_workers=len(pending), thread_name_prefix='analysis-source')
+        token = _current_budget.set(budget)
+        try:
+            # Each worker runs in a copy of this context so it sees the sources' budget
+            futures = {
+                stage: pool.submit(contextvars.copy_context().run, _timed_call, stage, kwargs)
+                for stage, (kwargs, _) in pending.items()
+            }
+        finally:
+            _current_budget.reset(token)
+        wait(futures.values(), timeout=deadline)
+        # Don't block on stragglers - their threads finish in the background
+        pool.shutdown(wait=False, cancel_futures=True)
+        report['sources_ms'] = round((time.perf_counter() - started) * 1000, 1)
+
+        for stage, future in futures.items():
+            key = pending[stage][1]
+            report['recomputed'].append(stage.name)
+
+            if future.done():
+                output, error, latency_ms = future.result()
+                status = None
+            else:
+                logger.warning(f"Source {stage.name} missed the {deadline:.1f}s deadline")
+                output, error, latency_ms = {'error': f'Timed out after {deadline:.1f}s', 'partial': True}, None, report['sources_ms']
+                status = 'timeout'
+
+            if error is not None:
+                logger.error(f"Error in analysis stage {stage.name}: {error}")
+                output = _partial_default(stage) if isinstance(error, BudgetExhausted) else stage.default
+                status = 'error'
+
+            cached = memo.get(stage.name)
+            failed = status is not None or (isinstance(output, dict) and output.get('error'))
+            if failed and cached and cached.get('key') == key:
+                # The upstream is down or slow - keep serving the last good result
+                logger.warning(f"Source {stage.name} failed, serving its previous output")
+                outputs[stage.name] = cached['output']
+                status = 'stale'
+            elif status is not None or is_partial(output):
+                outputs[stage.name] = output
+                memo.pop(stage.name, None)
+                status = status or 'partial'
+            else:
+                outputs[stage.name] = output
+                memo[stage.name] = {'key': key, 'output': output}
+                status = 'error' if failed else 'ok'
+            report['sources'][stage.name] = {'status': status, 'latency_ms': latency_ms}
+            report['timings_ms'][stage.name] = latency_ms
+
+        return outputs
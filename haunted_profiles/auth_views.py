@@ -5,16 +5,23 @@ from django.shortcuts import redirect
 from django.contrib.auth import login
 from django.contrib import messages
 from django.views.decorators.csrf import csrf_exempt
-from .workos_auth import get_authorization_url, handle_callback
+from .circuit_breaker import CircuitOpen, get_breaker
 import logging
 
 logger = logging.getLogger(__name__)
 
+LOGIN_UNAVAILABLE_MESSAGE = "🔌 Sign-in is temporarily unavailable - our login provider isn't responding. Try again in a minute."
+
 
 def workos_login(request):
     """
     Initiate WorkOS SSO login flow
     """
+    # Don't send people off to a provider we know is down
+    if get_breaker('workos').retry_after():
+        messages.error(request, LOGIN_UNAVAILABLE_MESSAGE)
+        return redirect('index')
+    
     try:
         # Generate state for CSRF protection
         state = request.session.get('workos_state', '')
@@ -23,7 +30,8 @@ def workos_login(request):
             state = secrets.token_urlsafe(32)
             request.session['workos_state'] = state
         
-        # Get authorization URL
+        # Get authorization URL (WorkOS SDK is only imported on the first login)
+        from .workos_auth import get_authorization_url
         authorization_url = get_authorization_url(state=state)
         
         return redirect(authorization_url)
@@ -55,10 +63,11 @@ def workos_callback(request):
             # Continue anyway for development, but log the warning
         
         # Exchange code for user profile and create/get user
+        from .workos_auth import handle_callback
         user = handle_callback(code)
         
         # Log the user in
-        login(request, user, backend='django.contrib.auth.backends.ModelBackend')
+        login(request, user, backend='haunted_profiles.backends.LeanModelBackend')
         
         # Clear state from session
         if 'workos_state' in request.session:
@@ -77,7 +86,11 @@ def workos_callback(request):
         else:
             messages.success(request, f'Welcome back, {user.username}!')
             return redirect('haunted_portfolio')
-            
+    
+    except CircuitOpen as e:
+        logger.warning(f"WorkOS callback rejected: {e}")
+        messages.error(request, LOGIN_UNAVAILABLE_MESSAGE)
+        return redirect('index')
     except Exception as e:
         logger.error(f"Error in WorkOS callback: {e}")
         print(f"❌ WorkOS Callback Error: {e}")  # Print to console
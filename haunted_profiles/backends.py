@@ -0,0 +1,20 @@
+"""
+Authentication backends for Ghost Hire
+"""
+from django.contrib.auth.backends import ModelBackend
+from .models import User, PROFILE_TEXT_FIELDS
+
+
+class LeanModelBackend(ModelBackend):
+    """
+    ModelBackend whose per-request user loader skips the long self-description
+    columns. request.user is loaded on every request; views that need those
+    fields call user.get_self_description(), which fetches them in one query.
+    """
+    
+    def get_user(self, user_id):
+        try:
+            user = User._default_manager.defer(*PROFILE_TEXT_FIELDS).get(pk=user_id)
+        except User.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
@@ -0,0 +1,225 @@
+"""
+Circuit Breakers
+One breaker per external dependency (GitHub, Devpost, WorkOS). After
+failure_threshold consecutive failures (errors, timeouts, 5xx, rate limits)
+a breaker opens and calls fail immediately with CircuitOpen instead of
+tying up a worker on a dead upstream. After reset_timeout seconds one probe
+call is let through (half-open): success closes the breaker, failure opens
+it again.
+
+State is per process - each gunicorn worker trips on its own, after a few
+fast failures. breaker_metrics() exposes the counters.
+"""
+from django.conf import settings
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+SERVICE_NAMES = {'github': 'GitHub', 'devpost': 'Devpost', 'workos': 'WorkOS'}
+
+DEFAULT_BREAKER_CONFIG = {
+    'failure_threshold': 5,
+    'reset_timeout': 30,
+    'request_timeout': 10,
+}
+
+
+class UpstreamUnavailable(Exception):
+    """A dependency is down, overloaded or rate limiting us - worth retrying later"""
+
+    def __init__(self, service, detail):
+        super().__init__(f"{service} is unavailable: {detail}")
+        self.service = service
+
+
+class CircuitOpen(UpstreamUnavailable):
+    """The dependency's breaker is open - the call wasn't attempted"""
+
+    def __init__(self, service, retry_after):
+        super().__init__(service, f"circuit open, retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Args:
+        name: Dependency name, used in errors and metrics
+        failure_threshold: Consecutive failures that open the breaker
+        reset_timeout: Seconds an open breaker waits before letting a probe through
+        request_timeout: Timeout for each call through the breaker
+    """
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=30, request_timeout=10):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.request_timeout = request_timeout
+
+        self._lock = threading.Lock()
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._probe_in_flight = False
+
+        # Metrics
+        self.calls = 0
+        self.failures = 0
+        self.rejected = 0
+        self.times_opened = 0
+        self.last_error = ''
+
+    def __repr__(self):
+        return f"<CircuitBreaker {self.name} {self.state}>"
+
+    def before_call(self):
+        """Let a call through or raise CircuitOpen"""
+        with self._lock:
+            if self.state == OPEN:
+                retry_after = self.opened_at + self.reset_timeout - time.monotonic()
+                if retry_after > 0:
+                    self.rejected += 1
+                    raise CircuitOpen(self.name, retry_after)
+                self.state = HALF_OPEN
+                logger.info(f"🔌 {self.name} breaker half-open - probing")
+
+            if self.state == HALF_OPEN:
+                # Only one probe at a time; everyone else still fails fast
+                if self._probe_in_flight:
+                    self.rejected += 1
+                    raise CircuitOpen(self.name, self.reset_timeout)
+                self._probe_in_flight = True
+
+            self.calls += 1
+
+    def record_success(self):
+        with self._lock:
+            if self.state != CLOSED:
+                logger.info(f"✅ {self.name} breaker closed")
+            self.state = CLOSED
+            self.consecutive_failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self, error):
+        with self._lock:
+            self.failures += 1
+            self.consecutive_failures += 1
+            self.last_error = str(error)[:200]
+            self._probe_in_flight = False
+
+            if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    self.times_opened += 1
+                    logger.warning(f"🔌 {self.name} breaker opened after {self.consecutive_failures} failures: {self.last_error}")
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+
+    def abandon(self):
+        """The call never reached the dependency (e.g. a malformed URL) - count nothing"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def call(self, func, *args, failure_types=(Exception,), **kwargs):
+        """
+        Call func through the breaker. Exceptions of failure_types count as
+        failures; any other exception means the dependency answered (e.g. a
+        rejected auth code) and is re-raised without tripping anything.
+        """
+        self.before_call()
+        try:
+            result = func(*args, **kwargs)
+        except failure_types as e:
+            self.record_failure(e)
+            raise
+        except Exception:
+            self.record_success()
+            raise
+        self.record_success()
+        return result
+
+    def retry_after(self):
+        """Seconds until an open breaker lets a probe through (0 if a call would be attempted)"""
+        if self.state != OPEN:
+            return 0.0
+        return max(0.0, self.opened_at + self.reset_timeout - time.monotonic())
+
+    def metrics(self):
+        with self._lock:
+            retry_after = self.retry_after()
+            return {
+                'state': self.state,
+                'consecutive_failures': self.consecutive_failures,
+                'calls': self.calls,
+                'failures': self.failures,
+                'rejected': self.rejected,
+                'times_opened': self.times_opened,
+                'retry_after_seconds': round(retry_after, 1),
+                'last_error': self.last_error,
+            }
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name):
+    """Shared breaker for a dependency, configured from CIRCUIT_BREAKERS[name]"""
+    breaker = _breakers.get(name)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.get(name)
+            if breaker is None:
+                config = {**DEFAULT_BREAKER_CONFIG, **getattr(settings, 'CIRCUIT_BREAKERS', {}).get(name, {})}
+                breaker = _breakers[name] = CircuitBreaker(name, **config)
+    return breaker
+
+
+def breaker_metrics():
+    """{name: metrics} for every breaker used so far in this process"""
+    return {name: breaker.metrics() for name, breaker in sorted(_breakers.items())}
+
+
+def is_failure_response(response):
+    """Upstream trouble (as opposed to e.g. a 404 for a missing profile)"""
+    if response.status_code >= 500 or response.status_code == 429:
+        return True
+    # GitHub signals an exhausted rate limit with a 403
+    return response.status_code == 403 and response.headers.get('X-RateLimit-Remaining') == '0'
+
+
+def guarded_get(service, url, budget=None, **kwargs):
+    """
+    requests.get through the service's breaker, with its request_timeout
+    (shortened to what's left of budget, if given).
+
+    Raises CircuitOpen without calling out when the breaker is open.
+    Connection errors, timeouts, 5xx and rate limits count as failures and
+    raise UpstreamUnavailable; other responses (including 404s) are returned.
+    """
+    import requests  # kept off the worker boot path
+
+    breaker = get_breaker(service)
+    timeout = budget.timeout(breaker.request_timeout) if budget is not None else breaker.request_timeout
+
+    breaker.before_call()
+    try:
+        response = requests.get(url, timeout=timeout, **kwargs)
+    except (requests.ConnectionError, requests.Timeout) as e:
+        breaker.record_failure(e)
+        raise UpstreamUnavailable(service, e) from e
+    except Exception:
+        breaker.abandon()
+        raise
+
+    if is_failure_response(response):
+        detail = f"HTTP {response.status_code} from {url}"
+        breaker.record_failure(detail)
+        raise UpstreamUnavailable(service, detail)
+
+    breaker.record_success()
+    return response
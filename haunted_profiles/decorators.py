@@ -33,3 +33,12 @@ def developer_required(view_func):
         
         return view_func(request, *args, **kwargs)
     return wrapper
+
+
+def replica_reads(view_func):
+    """
+    Mark a view as read-only so its GET/HEAD requests can be served from a
+    read replica (see ghosthire.db_router.ReplicaRoutingMiddleware)
+    """
+    view_func.use_replica = True
+    return view_func
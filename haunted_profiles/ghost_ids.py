@@ -0,0 +1,86 @@
+"""
+Ghost IDs
+Usernames for new signups (ghost_xxxxxx) allocated from a counter instead of
+guessing random numbers and checking them: no lookups, no collisions, and
+the cost stays flat however many users there are.
+
+Numbers come from the 'ghost_id' Sequence in blocks of
+GHOST_ID_BLOCK_SIZE, so a worker hits the database once per block, and
+concurrent workers never share a block. Each number is scrambled with a
+bijection before being written in base 36, so consecutive signups don't get
+consecutive names. Encoded IDs are always 6+ characters - legacy names
+(ghost_ plus at most 5 digits) can't collide with them.
+"""
+from django.conf import settings
+import string
+import threading
+
+SEQUENCE_NAME = 'ghost_id'
+PREFIX = 'ghost_'
+
+ALPHABET = string.digits + string.ascii_lowercase
+
+# 6-character IDs: [36^5, 36^6) - about 2.1 billion names
+MIN_ID = 36 ** 5
+ID_SPACE = 36 ** 6 - MIN_ID
+# Coprime with ID_SPACE (= 2^10 * 3^10 * 5 * 7), so n -> n * SCRAMBLE mod ID_SPACE is a bijection
+SCRAMBLE = 1_000_000_007
+
+
+def to_base36(value):
+    digits = []
+    while value:
+        value, remainder = divmod(value, 36)
+        digits.append(ALPHABET[remainder])
+    return ''.join(reversed(digits)) or '0'
+
+
+def encode_ghost_id(number):
+    """The username for the number-th allocation"""
+    if number < ID_SPACE:
+        return PREFIX + to_base36(MIN_ID + number * SCRAMBLE % ID_SPACE)
+    # Past 2.1 billion: 7+ characters, sequential
+    return PREFIX + to_base36(36 ** 6 + number - ID_SPACE)
+
+
+class BlockAllocator:
+    """Hands out numbers from a Sequence, reserving block_size at a time"""
+
+    def __init__(self, sequence_name, block_size):
+        self.sequence_name = sequence_name
+        self.block_size = block_size
+        self._lock = threading.Lock()
+        self._next = 0
+        self._end = 0
+        self.blocks_reserved = 0
+
+    def next(self):
+        from .models import Sequence
+
+        with self._lock:
+            if self._next >= self._end:
+                # Unused numbers of a block are simply skipped if the process exits
+                self._next = Sequence.reserve(self.sequence_name, self.block_size)
+                self._end = self._next + self.block_size
+                self.blocks_reserved += 1
+            number = self._next
+            self._next += 1
+            return number
+
+
+_allocator = None
+_allocator_lock = threading.Lock()
+
+
+def get_allocator():
+    global _allocator
+    if _allocator is None:
+        with _allocator_lock:
+            if _allocator is None:
+                _allocator = BlockAllocator(SEQUENCE_NAME, getattr(settings, 'GHOST_ID_BLOCK_SIZE', 100))
+    return _allocator
+
+
+def allocate_ghost_id():
+    """A fresh, never-issued ghost_xxxxxx username"""
+    return encode_ghost_id(get_allocator().next())
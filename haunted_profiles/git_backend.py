@@ -0,0 +1,201 @@
+"""
+Git Commit Backend
+Scores commit history from local bare clones instead of the REST API: the
+full `git log` is streamed through a generator parser (constant memory, no
+rate limits) and the result is cached by the repo's HEAD sha, so an
+unchanged repo is never re-read.
+
+Clones live in GIT_MIRROR_DIR as <username>/<repo>.git. They can be kept
+up to date by an external mirror job, or managed here with
+GIT_AUTO_MIRROR = True: missing repos are cloned on demand (blobless mirror
+clones - commits only, no file contents) and existing ones fetched.
+
+Every git command's timeout is drawn from the running analysis budget, so
+a slow clone or log can't hold an analysis past it: BudgetExhausted is
+raised once the budget is spent and collect_commit_signals marks the
+result partial.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from .analysis_pipeline import BudgetExhausted, current_budget
+from .github_records import CommitRecord
+import codecs
+import os
+import subprocess
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+CACHE_PREFIX = 'git_commit_scores:v1:'
+
+# Author date, then the raw message; records end with RS, fields split by US
+LOG_FORMAT = '--format=%aI%x1f%B%x1e'
+RECORD_SEPARATOR = '\x1e'
+FIELD_SEPARATOR = '\x1f'
+
+READ_SIZE = 64 * 1024
+
+
+def mirror_path(username, repo_name):
+    mirror_dir = getattr(settings, 'GIT_MIRROR_DIR', None)
+    if not mirror_dir:
+        return None
+    return os.path.join(mirror_dir, username, f'{repo_name}.git')
+
+
+def command_timeout():
+    """
+    GIT_COMMAND_TIMEOUT_SECONDS, shortened to what's left of the running
+    analysis budget. Raises BudgetExhausted when nothing is left.
+    """
+    return current_budget().timeout(getattr(settings, 'GIT_COMMAND_TIMEOUT_SECONDS', 60))
+
+
+def _git(*args, timeout=None):
+    return subprocess.run(
+        ['git', *args], capture_output=True, text=True, check=True,
+        timeout=timeout or command_timeout(),
+    )
+
+
+def ensure_clone(username, repo_name):
+    """Path to a usable local clone, cloning/fetching it first under GIT_AUTO_MIRROR (None if there isn't one)"""
+    path = mirror_path(username, repo_name)
+    if path is None:
+        return None
+
+    auto_mirror = getattr(settings, 'GIT_AUTO_MIRROR', False)
+
+    if os.path.isdir(path):
+        if auto_mirror:
+            try:
+                _git('-C', path, 'fetch', '--prune', '--quiet')
+            except (subprocess.SubprocessError, OSError) as e:
+                # A stale clone is still better than the 30-commit API sample
+                logger.warning(f"Could not fetch {username}/{repo_name}: {e}")
+        return path
+
+    if not auto_mirror:
+        return None
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    try:
+        _git('clone', '--mirror', '--filter=blob:none', '--quiet',
+             f'https://github.com/{username}/{repo_name}.git', path)
+        return path
+    except (subprocess.SubprocessError, OSError) as e:
+        logger.warning(f"Could not clone {username}/{repo_name}: {e}")
+        return None
+
+
+def head_sha(repo_path):
+    """Commit HEAD points at, or None for an empty/broken repo"""
+    try:
+        return _git('-C', repo_path, 'rev-parse', '--verify', '--quiet', 'HEAD').stdout.strip() or None
+    except (subprocess.SubprocessError, OSError):
+        return None
+
+
+def iter_git_log(repo_path, max_count=None):
+    """
+    Yield CommitRecords for HEAD's history, newest first, parsed from a
+    streamed `git log`. Only one read buffer and the current commit are in
+    memory; closing the generator early stops git.
+
+    git is killed if it runs past command_timeout() (taken when the
+    generator starts), and subprocess.TimeoutExpired is raised instead of
+    returning a truncated history.
+    """
+    args = ['git', '-C', repo_path, 'log', '--no-color', LOG_FORMAT]
+    if max_count:
+        args.append(f'--max-count={max_count}')
+
+    timeout = command_timeout()
+    process = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    timed_out = threading.Event()
+
+    def kill():
+        timed_out.set()
+        process.kill()
+
+    watchdog = threading.Timer(timeout, kill) if timeout is not None else None
+    if watchdog is not None:
+        watchdog.daemon = True
+        watchdog.start()
+
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    pending = ''
+
+    try:
+        while True:
+            chunk = process.stdout.read(READ_SIZE)
+            if not chunk:
+                break
+            pending += decoder.decode(chunk)
+
+            *records, pending = pending.split(RECORD_SEPARATOR)
+            for record in records:
+                commit = _parse_record(record)
+                if commit is not None:
+                    yield commit
+
+        if timed_out.is_set():
+            raise subprocess.TimeoutExpired(args, timeout)
+
+        commit = _parse_record(pending + decoder.decode(b'', final=True))
+        if commit is not None:
+            yield commit
+    finally:
+        if watchdog is not None:
+            watchdog.cancel()
+        process.stdout.close()
+        if process.poll() is None:
+            process.kill()
+        process.wait()
+
+
+def _parse_record(record):
+    record = record.lstrip('\n')
+    if not record:
+        return None
+    date, _, message = record.partition(FIELD_SEPARATOR)
+    return CommitRecord(message.strip(), date)
+
+
+def repo_commit_scores(repo_path):
+    """score_commits over a local clone's full history, cached by HEAD sha"""
+    from .portfolio_analyzer import score_commits
+
+    sha = head_sha(repo_path)
+    if sha is None:
+        return None
+
+    max_count = getattr(settings, 'GIT_LOG_MAX_COMMITS', None)
+    key = f'{CACHE_PREFIX}{max_count or "all"}:{sha}'
+    cached = cache.get(key)
+    if cached is not None:
+        return tuple(cached)
+
+    scores = score_commits(iter_git_log(repo_path, max_count))
+    cache.set(key, list(scores), None)
+    return scores
+
+
+def local_repo_commit_scores(username, repo):
+    """Scores for a RepoRecord from its local clone (None to fall back to the API)"""
+    path = ensure_clone(username, repo.name)
+    if path is None:
+        return None
+
+    try:
+        return repo_commit_scores(path)
+    except subprocess.TimeoutExpired as e:
+        if current_budget().expired:
+            # Cut short by the analysis budget, not a slow repo - don't fall back to the API
+            raise BudgetExhausted(f"git timed out reading {path}") from e
+        logger.warning(f"Could not read history of {path}: {e}")
+        return None
+    except (subprocess.SubprocessError, OSError) as e:
+        logger.warning(f"Could not read history of {path}: {e}")
+        return None
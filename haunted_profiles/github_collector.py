@@ -0,0 +1,182 @@
+"""
+GitHub Repo Collector
+Pages through a user's complete repository list and folds it into compact
+aggregates as pages arrive, so prolific developers are analyzed on all of
+their repos while memory stays flat regardless of account size
+"""
+from django.conf import settings
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from itertools import islice
+from urllib.parse import urlparse, parse_qs
+from .analysis_pipeline import current_budget
+from .circuit_breaker import CircuitOpen, guarded_get
+from .github_records import RepoRecord, stream_records
+import heapq
+import logging
+
+logger = logging.getLogger(__name__)
+
+REPOS_PER_PAGE = 100
+
+# Most recently updated repos kept in full for domain/complexity/commit analysis
+SAMPLE_SIZE = 30
+
+UNIQUE_PROJECT_LIMIT = 5
+
+
+def repos_page_url(username, page):
+    return f"https://api.github.com/users/{username}/repos?per_page={REPOS_PER_PAGE}&sort=updated&page={page}"
+
+
+def last_page_number(response):
+    """Page count from the Link header (1 when there's no rel="last")"""
+    last_url = response.links.get('last', {}).get('url')
+    if not last_url:
+        return 1
+    try:
+        return int(parse_qs(urlparse(last_url).query)['page'][0])
+    except (KeyError, ValueError, IndexError):
+        return 1
+
+
+class RepoAggregator:
+    """
+    Streaming fold over RepoRecords. Only totals, a fixed-size sample of the
+    newest repos and the current top unique projects are kept; each record
+    can be dropped as soon as it has been added.
+    """
+
+    def __init__(self):
+        self.languages = {}          # language -> repo count
+        self._language_order = {}    # language -> index of first repo using it
+        self.total_stars = 0
+        self.total_forks = 0
+        self.original_repos = 0
+        self.repo_count = 0
+        self._sample = {}            # index -> compact repo, newest SAMPLE_SIZE only
+        self._unique = []            # min-heap of (stars, -index, project)
+
+    def add(self, repo, index):
+        """Fold one RepoRecord in; index is its position in the update-sorted listing"""
+        self.repo_count += 1
+
+        if index < SAMPLE_SIZE:
+            self._sample[index] = repo.to_dict()
+
+        # Skip forks (we want original work!)
+        if repo.fork:
+            return
+
+        self.original_repos += 1
+
+        if repo.language:
+            lang = repo.language
+            self.languages[lang] = self.languages.get(lang, 0) + 1
+            self._language_order[lang] = min(index, self._language_order.get(lang, index))
+
+        stars = repo.stargazers_count
+        self.total_stars += stars
+        self.total_forks += repo.forks_count
+
+        # Project is "unique" if it has stars, or a description and recent activity
+        has_description = bool(repo.description)
+        is_recent = repo.updated_at[:4] in ['2024', '2025']
+        if stars > 0 or (has_description and is_recent):
+            entry = (stars, -index, {
+                'name': repo.name,
+                'description': repo.description,
+                'stars': stars,
+                'language': repo.language,
+                'url': repo.html_url,
+            })
+            if len(self._unique) < UNIQUE_PROJECT_LIMIT:
+                heapq.heappush(self._unique, entry)
+            elif entry[:2] > self._unique[0][:2]:
+                heapq.heapreplace(self._unique, entry)
+
+    def result(self):
+        """Aggregates in listing order (independent of the order pages arrived in)"""
+        ordered_languages = sorted(self.languages, key=self._language_order.get)
+        return {
+            'repos': [self._sample[i] for i in sorted(self._sample)],
+            'repo_count': self.repo_count,
+            'original_repos': self.original_repos,
+            'languages': {lang: self.languages[lang] for lang in ordered_languages},
+            'total_stars': self.total_stars,
+            'total_forks': self.total_forks,
+            # Most stars first; ties keep listing order
+            'unique_projects': [project for _, _, project in sorted(self._unique, key=lambda e: e[:2], reverse=True)],
+        }
+
+
+def collect_repos(username, max_workers=None, max_pages=None):
+    """
+    Fetch every page of a user's repos and aggregate them.
+
+    Page 1 is fetched first; its Link header says how many pages there are,
+    and the rest are then fetched concurrently and folded in as they arrive.
+    Requests draw from the current analysis budget and go through the
+    GitHub circuit breaker; pages left out because the budget ran out or
+    the breaker opened mark the result partial.
+
+    Returns: RepoAggregator.result() plus 'pages' and 'missing_pages'
+    (and 'partial': True if it's worth retrying later)
+    """
+    max_workers = max_workers or getattr(settings, 'GITHUB_REPO_PAGE_WORKERS', 4)
+    max_pages = max_pages or getattr(settings, 'GITHUB_MAX_REPO_PAGES', 30)
+    budget = current_budget()
+    aggregator = RepoAggregator()
+
+    first = guarded_get('github', repos_page_url(username, 1), budget=budget, stream=True)
+    if first.status_code != 200:
+        logger.warning(f"GitHub repo listing for {username} returned {first.status_code}")
+        return {**aggregator.result(), 'pages': 0, 'missing_pages': 1}
+
+    for i, repo in enumerate(stream_records(first, RepoRecord)):
+        aggregator.add(repo, i)
+
+    pages = min(last_page_number(first), max_pages)
+    fetched = 1
+    breaker_open = False
+
+    if pages > 1:
+        def fetch_page(page):
+            response = guarded_get('github', repos_page_url(username, page), budget=budget, stream=True)
+            if response.status_code != 200:
+                raise ValueError(f"status {response.status_code}")
+            return list(stream_records(response, RepoRecord))
+
+        # At most max_workers pages are in flight (or waiting to be folded in)
+        # at once, so peak memory doesn't grow with the account size
+        remaining = iter(range(2, pages + 1))
+        pool = ThreadPoolExecutor(max_workers=min(max_workers, pages - 1), thread_name_prefix='github-repos')
+        in_flight = {pool.submit(fetch_page, page): page for page in islice(remaining, max_workers)}
+        while in_flight:
+            done, _ = wait(in_flight, timeout=budget.remaining(), return_when=FIRST_COMPLETED)
+            if not done:
+                break  # out of time - whatever is still in flight is dropped
+
+            for future in done:
+                page = in_flight.pop(future)
+                next_page = None if budget.expired else next(remaining, None)
+                if next_page is not None:
+                    in_flight[pool.submit(fetch_page, next_page)] = next_page
+
+                try:
+                    repos = future.result()
+                except Exception as e:
+                    logger.warning(f"Skipping repo page {page} for {username}: {e}")
+                    breaker_open = breaker_open or isinstance(e, CircuitOpen)
+                    continue
+
+                fetched += 1
+                offset = (page - 1) * REPOS_PER_PAGE
+                for i, repo in enumerate(repos):
+                    aggregator.add(repo, offset + i)
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    result = {**aggregator.result(), 'pages': pages, 'missing_pages': pages - fetched}
+    if fetched < pages and (budget.expired or breaker_open):
+        logger.warning(f"Got {fetched}/{pages} repo pages for {username} - will retry later")
+        result['partial'] = True
+    return result
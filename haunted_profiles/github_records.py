@@ -0,0 +1,119 @@
+"""
+GitHub Records
+Compact, slotted records for the handful of repo/commit fields the analyzers
+read, plus a streaming decoder that turns a GitHub JSON array response into
+records one element at a time - the ~80-field API dicts never pile up
+"""
+import codecs
+import json
+
+# Read size for streamed API responses
+CHUNK_SIZE = 64 * 1024
+
+_decoder = json.JSONDecoder()
+
+
+def iter_json_array(chunks):
+    """
+    Yield the elements of a top-level JSON array from an iterable of byte
+    chunks (e.g. response.iter_content()), decoding each one as soon as it
+    is complete. Only the current element's text is buffered.
+
+    Elements are expected to be objects (true for every GitHub list
+    endpoint); a bare number split across two chunks would decode early.
+    """
+    text_decoder = codecs.getincrementaldecoder('utf-8')()
+    buffer = ''
+    started = False
+    pos = 0
+
+    for chunk in chunks:
+        buffer = buffer[pos:] + text_decoder.decode(chunk)
+        pos = 0
+
+        while True:
+            # Skip whitespace and separators between elements
+            while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+                pos += 1
+            if pos >= len(buffer):
+                break
+
+            if not started:
+                if buffer[pos] != '[':
+                    raise ValueError('Expected a JSON array')
+                started = True
+                pos += 1
+                continue
+
+            if buffer[pos] == ']':
+                return
+
+            try:
+                element, end = _decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                break  # element not complete yet - wait for more data
+            pos = end
+            yield element
+
+    buffer = buffer[pos:] + text_decoder.decode(b'', final=True)
+    if buffer.strip() not in ('', ']'):
+        raise ValueError('Truncated JSON array')
+
+
+def stream_records(response, record_class):
+    """Decode a streamed (stream=True) GitHub list response into records"""
+    return (record_class.from_api(item) for item in iter_json_array(response.iter_content(CHUNK_SIZE)))
+
+
+class RepoRecord:
+    """One repository - only the fields the analyzers use"""
+
+    __slots__ = (
+        'name', 'description', 'fork', 'language', 'stargazers_count', 'forks_count', 'updated_at', 'html_url',
+        'text',
+    )
+
+    # Fields stored in the JSON form (text is derived)
+    FIELDS = __slots__[:-1]
+
+    def __init__(self, name, description=None, fork=False, language=None, stargazers_count=0,
+                 forks_count=0, updated_at='', html_url=''):
+        self.name = name
+        self.description = description
+        self.fork = bool(fork)
+        self.language = language
+        self.stargazers_count = stargazers_count or 0
+        self.forks_count = forks_count or 0
+        self.updated_at = updated_at or ''
+        self.html_url = html_url
+        # Lowercased "name description", matched against keyword lists
+        self.text = f"{name} {description or ''}".lower()
+
+    def __repr__(self):
+        return f"<RepoRecord {self.name}>"
+
+    @classmethod
+    def from_api(cls, data):
+        return cls(**{field: data.get(field) for field in cls.FIELDS})
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+
+class CommitRecord:
+    """One commit - message and author date"""
+
+    __slots__ = ('message', 'date', 'message_lower')
+
+    def __init__(self, message, date=''):
+        self.message = message or ''
+        self.date = date or ''
+        self.message_lower = self.message.lower()
+
+    def __repr__(self):
+        return f"<CommitRecord {self.message[:30]!r}>"
+
+    @classmethod
+    def from_api(cls, data):
+        commit = data.get('commit') or {}
+        return cls(commit.get('message', ''), (commit.get('author') or {}).get('date', ''))
@@ -0,0 +1,210 @@
+"""
+Code Highlighting
+Syntax-highlighted HTML for code snippets (Graveyard posts, code messages in
+crew chat), rendered once and reused across page views.
+
+Each snippet is keyed by a hash of its language and content and looked up in
+two tiers: a bounded in-process LRU (HIGHLIGHT_MEMORY_CACHE_BYTES), then the
+HighlightedCode table shared by every worker. Only a miss in both runs
+Pygments, and a page's snippets are looked up in one query. Pastes over
+HIGHLIGHT_MAX_BYTES or HIGHLIGHT_MAX_LINES aren't highlighted at all - they
+render as escaped plain text, so one huge paste can't stall a worker.
+
+The table is always read and written on the primary ('default'), bypassing
+the router: pages showing code are served from replicas (@replica_reads),
+and storing a freshly rendered snippet through the router would count as
+the request writing - pinning the user's session to the primary - while
+lookups on a lagging replica would keep missing snippets that were just
+stored and render them again. The cache isn't user data, so neither
+should depend on replication.
+
+Pygments is optional: without it every snippet renders as plain text.
+Token colours are in static/css/highlight.css.
+"""
+from collections import OrderedDict
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.html import format_html
+from django.utils.safestring import mark_safe
+import hashlib
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+CSS_CLASS = 'highlight'
+AUTO = 'auto'
+
+# Language detection only looks at the start of a snippet, and only weighs
+# these languages - Pygments' own guess_lexer() tries every lexer it has
+# (slow, and it often picks something obscure for a short snippet)
+GUESS_CHARS = 2000
+GUESS_LANGUAGES = [
+    'python', 'javascript', 'typescript', 'java', 'c', 'cpp', 'csharp', 'go', 'rust',
+    'ruby', 'php', 'kotlin', 'swift', 'bash', 'sql', 'html', 'css',
+]
+
+
+def cache_key(code, language=AUTO):
+    return hashlib.sha256(f'{language}\0{code}'.encode('utf-8', 'replace')).hexdigest()
+
+
+def is_too_large(code):
+    return (
+        len(code.encode('utf-8', 'replace')) > getattr(settings, 'HIGHLIGHT_MAX_BYTES', 20_000)
+        or code.count('\n') >= getattr(settings, 'HIGHLIGHT_MAX_LINES', 500)
+    )
+
+
+def plain_html(code):
+    return format_html('<div class="{}"><pre>{}</pre></div>', CSS_CLASS, code)
+
+
+def guess_language(code):
+    """Best-scoring GUESS_LANGUAGES lexer for code, else HIGHLIGHT_DEFAULT_LANGUAGE"""
+    from pygments.lexers import find_lexer_class_by_name
+
+    sample = code[:GUESS_CHARS]
+    best_score, best = 0.0, getattr(settings, 'HIGHLIGHT_DEFAULT_LANGUAGE', 'python')
+    for name in GUESS_LANGUAGES:
+        score = find_lexer_class_by_name(name).analyse_text(sample)
+        if score > best_score:
+            best_score, best = score, name
+    return best
+
+
+def render_html(code, language=AUTO):
+    """Run Pygments over code (language AUTO guesses it), falling back to plain text"""
+    try:
+        from pygments import highlight as pygments_highlight  # kept off the worker boot path
+        from pygments.formatters import HtmlFormatter
+        from pygments.lexers import get_lexer_by_name
+        from pygments.util import ClassNotFound
+    except ImportError:
+        return plain_html(code)
+
+    try:
+        lexer = get_lexer_by_name(guess_language(code) if language == AUTO else language)
+    except ClassNotFound:
+        return plain_html(code)
+
+    return pygments_highlight(code, lexer, HtmlFormatter(cssclass=CSS_CLASS))
+
+
+class MemoryCache:
+    """Thread-safe LRU of rendered HTML, bounded by the total size of the values"""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            html = self._entries.get(key)
+            if html is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return html
+
+    def set(self, key, html):
+        size = len(html)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._size -= len(self._entries.pop(key))
+            self._entries[key] = html
+            self._size += size
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def metrics(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'bytes': self._size, 'hits': self.hits, 'misses': self.misses}
+
+
+_memory_cache = None
+_memory_cache_lock = threading.Lock()
+
+
+def memory_cache():
+    global _memory_cache
+    if _memory_cache is None:
+        with _memory_cache_lock:
+            if _memory_cache is None:
+                _memory_cache = MemoryCache(getattr(settings, 'HIGHLIGHT_MEMORY_CACHE_BYTES', 4 * 1024 * 1024))
+    return _memory_cache
+
+
+def highlight_many(snippets):
+    """
+    Highlighted HTML for each (code, language) pair, in order. Memory hits
+    cost nothing, the rest are fetched in a single query and only snippets
+    missing from both tiers are rendered (and stored for everyone else).
+    """
+    from .models import HighlightedCode
+
+    memory = memory_cache()
+    results = [None] * len(snippets)
+    missing = {}  # key -> (code, language, [positions])
+
+    for position, (code, language) in enumerate(snippets):
+        language = language or AUTO
+        if is_too_large(code):
+            results[position] = plain_html(code)
+            continue
+        key = cache_key(code, language)
+        html = memory.get(key)
+        if html is not None:
+            results[position] = mark_safe(html)
+        else:
+            missing.setdefault(key, (code, language, []))[2].append(position)
+
+    if missing:
+        stored = dict(
+            HighlightedCode.objects.using(DEFAULT_DB_ALIAS).filter(key__in=list(missing)).values_list('key', 'html')
+        )
+        rendered = []
+        for key, (code, language, positions) in missing.items():
+            html = stored.get(key)
+            if html is None:
+                html = render_html(code, language)
+                rendered.append(HighlightedCode(key=key, language=language, html=html))
+            memory.set(key, html)
+            for position in positions:
+                results[position] = mark_safe(html)
+
+        if rendered:
+            # Another worker may have stored the same snippet in the meantime
+            HighlightedCode.objects.using(DEFAULT_DB_ALIAS).bulk_create(rendered, ignore_conflicts=True)
+            logger.debug(f"🎨 Highlighted {len(rendered)} new snippet(s)")
+
+    return results
+
+
+def highlight(code, language=AUTO):
+    """Highlighted HTML for one snippet - prefer highlight_many() for a page of them"""
+    return highlight_many([(code, language)])[0]
+
+
+def attach_highlighting(objects, field, attr='code_html', language=AUTO):
+    """Set attr on each object to its highlighted field (None where the field is empty), in one lookup"""
+    for obj in objects:
+        setattr(obj, attr, None)
+    objects = [obj for obj in objects if getattr(obj, field)]
+    for obj, html in zip(objects, highlight_many([(getattr(obj, field), language) for obj in objects])):
+        setattr(obj, attr, html)
@@ -0,0 +1,109 @@
+"""
+Image Variants Module
+Generates small, content-hashed WebP derivatives of avatars and uploaded images
+so listing pages don't ship full-size originals for 50px thumbnails
+"""
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, features
+import hashlib
+import io
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Widths generated for every image (px) - covers card avatars, profile headers and hi-DPI
+VARIANT_WIDTHS = (48, 128, 512)
+
+# Short hash prefix keeps names readable while staying collision-safe per original
+HASH_LENGTH = 12
+
+CACHE_PREFIX = 'img_variants:'
+
+
+def _content_hash(storage, name):
+    """Stream the original through sha256 without loading it all into memory"""
+    digest = hashlib.sha256()
+    with storage.open(name, 'rb') as f:
+        for chunk in iter(lambda: f.read(64 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:HASH_LENGTH]
+
+
+def variant_name(original_name, digest, width):
+    """
+    Build the storage name for a variant, stored alongside the original
+
+    e.g. ghost_avatars/1.png -> ghost_avatars/variants/1.3f2a9c0d1b7e.128.webp
+    """
+    directory, filename = os.path.split(original_name)
+    root, _ = os.path.splitext(filename)
+    return os.path.join(directory, 'variants', f'{root}.{digest}.{width}.webp')
+
+
+def generate_variants(field_file, storage=None):
+    """
+    Create any missing WebP variants for an image field file.
+
+    Args:
+        field_file: ImageFieldFile (e.g. user.ghost_avatar, post.image)
+        storage: Override storage (defaults to the field's storage)
+
+    Returns:
+        dict: {width: variant storage name}, empty if the image can't be processed
+    """
+    if not field_file or not features.check('webp'):
+        return {}
+
+    storage = storage or getattr(field_file, 'storage', default_storage)
+    name = field_file.name
+
+    try:
+        digest = _content_hash(storage, name)
+        names = {width: variant_name(name, digest, width) for width in VARIANT_WIDTHS}
+        missing = [width for width, vname in names.items() if not storage.exists(vname)]
+
+        if missing:
+            with storage.open(name, 'rb') as f:
+                with Image.open(f) as img:
+                    img.load()
+                    mode = 'RGBA' if img.mode in ('RGBA', 'LA', 'P') else 'RGB'
+                    source = img.convert(mode)
+
+            # Largest first so each step resizes from the closest bigger image
+            for width in sorted(missing, reverse=True):
+                variant = source.copy()
+                variant.thumbnail((width, width), Image.LANCZOS)
+                buf = io.BytesIO()
+                variant.save(buf, 'WEBP', quality=80, method=4)
+                storage.save(names[width], ContentFile(buf.getvalue()))
+
+        cache.set(CACHE_PREFIX + name, names, None)
+        return names
+
+    except Exception as e:
+        logger.error(f"Error generating image variants for {name}: {e}")
+        return {}
+
+
+def get_variant_urls(field_file):
+    """
+    Return {width: url} for an image field, generating variants lazily on first use.
+
+    Results are cached per original name, so after the first request a render
+    costs one cache lookup instead of hashing or touching storage.
+    """
+    if not field_file:
+        return {}
+
+    names = cache.get(CACHE_PREFIX + field_file.name)
+    if names is None:
+        names = generate_variants(field_file)
+        if not names:
+            # Remember failures too so broken images aren't re-processed every render
+            cache.set(CACHE_PREFIX + field_file.name, {}, 300)
+
+    storage = getattr(field_file, 'storage', default_storage)
+    return {width: storage.url(vname) for width, vname in names.items()}
@@ -0,0 +1,173 @@
+"""
+Job Search
+Filtering, facets and cursor pagination for the Summoning Circle.
+
+Everything the filters touch is an indexed column written when a post is
+saved: salary_range strings ("$60k-$80k") are parsed into numeric
+salary_min/salary_max, and required_skills is mirrored into the JobSkill
+link table as normalized (lowercase) names. Searches never scan the JSON
+column, and the facet counts for the sidebar are a fixed handful of
+GROUP BY queries over the filtered posts.
+"""
+from django.db.models import Count, Q
+import re
+
+JOBS_PAGE_SIZE = 20
+FACET_LIMIT = 15
+
+# Annual salary bands offered as a facet: (key, label, lower bound)
+SALARY_BANDS = [
+    ('50k', '$50k+', 50_000),
+    ('80k', '$80k+', 80_000),
+    ('120k', '$120k+', 120_000),
+]
+
+HOURS_PER_YEAR = 2080
+MONTHS_PER_YEAR = 12
+# Largest value salary_min/salary_max (PositiveIntegerField) hold on every database
+MAX_SALARY = 2_147_483_647
+
+# A k/m suffix must not start a word ("8000 monthly"); a "+" right after the number means open-ended
+_NUMBER = re.compile(r'(\d[\d,]*(?:\.\d+)?)\s*(?:([km])(?![a-z]))?(\+)?', re.IGNORECASE)
+_HOURLY = re.compile(r'/\s*(?:h|hr|hour)\b|per\s+hour|hourly', re.IGNORECASE)
+_MONTHLY = re.compile(r'/\s*(?:mo|mon|month)\b|(?:per|a)\s+month|monthly', re.IGNORECASE)
+_UP_TO = re.compile(r'up\s+to|max(?:imum)?|under|<', re.IGNORECASE)
+_MULTIPLIERS = {'k': 1_000, 'm': 1_000_000}
+
+
+def parse_salary_range(text):
+    """
+    Annual (min, max) dollars from a free-text salary range - None for a
+    missing bound. "$60k-$80k" -> (60000, 80000), "$100k+ DOE" -> (100000, None),
+    "up to $70k" -> (None, 70000), "$40/hr" -> (83200, 83200),
+    "$5k/mo" -> (60000, 60000). Bounds too large to store become None.
+    """
+    matches = _NUMBER.findall(text or '')
+    if not matches:
+        return None, None
+
+    hourly = bool(_HOURLY.search(text))
+    monthly = not hourly and bool(_MONTHLY.search(text))
+    # "60-80k": a suffix on the last number applies to the ones before it
+    default_suffix = matches[-1][1].lower()
+
+    values = []
+    for number, suffix, _ in matches[:2]:
+        value = float(number.replace(',', ''))
+        multiplier = _MULTIPLIERS.get((suffix or default_suffix).lower(), 1)
+        value *= multiplier
+        if hourly:
+            value *= HOURS_PER_YEAR
+        elif monthly:
+            value *= MONTHS_PER_YEAR
+        elif multiplier == 1 and value < 1000:
+            value *= 1000  # "60 - 80" means thousands
+        values.append(int(value) if value <= MAX_SALARY else None)
+
+    if len(values) == 2:
+        low, high = values
+        if low is not None and high is not None and low > high:
+            low, high = high, low
+        return low, high
+    if matches[0][2]:
+        return values[0], None
+    if _UP_TO.search(text):
+        return None, values[0]
+    return values[0], values[0]
+
+
+def split_skills(values):
+    """Skill names from form values that may hold comma-separated lists"""
+    return [skill.strip() for value in values for skill in value.split(',') if skill.strip()]
+
+
+def normalize_skill(name):
+    return ' '.join(name.lower().split())[:50]
+
+
+def skill_token_regex(name):
+    """
+    Case-insensitive regex for name as a whole token of a free-text skill
+    list: "go" matches "Go, Rust" but not "Django", "java" not "JavaScript".
+    """
+    words = normalize_skill(name).split()
+    return r'(^|[^a-z0-9_+#])' + r'\s+'.join(re.escape(word) for word in words) + r'([^a-z0-9_+#]|$)'
+
+
+def reaches_salary(amount):
+    """Posts whose range reaches amount - open-ended ones ("$90k+") by their lower bound"""
+    return Q(salary_max__gte=amount) | Q(salary_max__isnull=True, salary_min__gte=amount)
+
+
+def search_jobs(jobs, params):
+    """
+    Filter active jobs by the request's GET params and return one page.
+
+    Params: skill (repeatable, all must match), location, remote=1,
+    salary (a SALARY_BANDS key - the post's range must reach it) and
+    after (cursor: the last id of the previous page).
+
+    Returns: (jobs on this page, cursor for the next page or None, facets)
+    """
+    jobs = jobs.filter(is_active=True)
+
+    skills = [normalize_skill(skill) for skill in params.getlist('skill') if skill.strip()]
+    for skill in skills:
+        jobs = jobs.filter(skill_links__name=skill)
+
+    location = params.get('location', '').strip()
+    if location:
+        jobs = jobs.filter(location__iexact=location)
+
+    if params.get('remote') == '1':
+        jobs = jobs.filter(is_remote=True)
+
+    bands = {key: lower for key, _, lower in SALARY_BANDS}
+    salary = params.get('salary')
+    if salary in bands:
+        jobs = jobs.filter(reaches_salary(bands[salary]))
+
+    facets = job_facets(jobs)
+
+    after = params.get('after', '')
+    page = jobs.order_by('-id')
+    if after.isdigit():
+        page = page.filter(id__lt=int(after))
+    page = list(page[:JOBS_PAGE_SIZE + 1])
+
+    next_cursor = None
+    if len(page) > JOBS_PAGE_SIZE:
+        page = page[:JOBS_PAGE_SIZE]
+        next_cursor = page[-1].id
+    return page, next_cursor, facets
+
+
+def job_facets(jobs):
+    """Counts for the filter sidebar over the filtered posts (four queries)"""
+    from .models import JobSkill
+
+    job_ids = jobs.order_by().values('id')
+
+    skills = (
+        JobSkill.objects.filter(job_id__in=job_ids)
+        .values('name').annotate(count=Count('job_id')).order_by('-count', 'name')[:FACET_LIMIT]
+    )
+    locations = (
+        jobs.order_by().values('location').annotate(count=Count('id')).order_by('-count', 'location')[:FACET_LIMIT]
+    )
+    totals = jobs.order_by().aggregate(
+        total=Count('id'),
+        remote=Count('id', filter=Q(is_remote=True)),
+        **{f'salary_{key}': Count('id', filter=reaches_salary(lower)) for key, _, lower in SALARY_BANDS},
+    )
+
+    return {
+        'total': totals['total'],
+        'remote': totals['remote'],
+        'skills': list(skills),
+        'locations': list(locations),
+        'salaries': [
+            {'key': key, 'label': label, 'count': totals[f'salary_{key}']}
+            for key, label, _ in SALARY_BANDS
+        ],
+    }
@@ -2,6 +2,7 @@
 Journey Extractor Module
 Builds developer's learning journey and growth narrative from GitHub data and user input
 """
+from .portfolio_history import COMPLEXITY_SCORES, metric_deltas
 from datetime import datetime
 import logging
 
@@ -11,16 +12,27 @@ logger = logging.getLogger(__name__)
 class JourneyExtractor:
     """Builds developer's learning journey and growth narrative"""
     
-    def __init__(self, github_data, user_narrative):
+    def __init__(self, github_data, user_narrative, history=None):
         """
         Initialize with GitHub data and user's narrative
         
         Args:
             github_data: Dict containing GitHub analysis results
             user_narrative: Dict containing user's learning journey text
+            history: Optional list of metric points from past analyses, oldest
+                first, ending with the current one (see User.get_metric_history)
         """
         self.github_data = github_data
         self.user_narrative = user_narrative or {}
+        self.history = history or []
+    
+    def _skill_first_seen(self):
+        """Date of the first snapshot each skill shows up in"""
+        first_seen = {}
+        for point in self.history:
+            for skill in point.get('skills') or []:
+                first_seen.setdefault(skill, point['date'])
+        return first_seen
     
     def build_timeline(self):
         """
@@ -47,11 +59,12 @@ class JourneyExtractor:
                 'description': self.user_narrative['learning_journey'][:200]
             })
         
-        # Add skill acquisition events
+        # Add skill acquisition events, dated by the snapshot they first appeared in
         skills = self.github_data.get('skills', [])
+        first_seen = self._skill_first_seen()
         for i, skill in enumerate(skills[:5]):
             timeline.append({
-                'date': f'Phase {i+1}',
+                'date': first_seen[skill][:7] if skill in first_seen else f'Phase {i+1}',
                 'event': f'Learned {skill}',
                 'type': 'skill_acquisition',
                 'skill': skill
@@ -118,49 +131,51 @@ class JourneyExtractor:
     
     def calculate_growth_metrics(self):
         """
-        Track growth over time:
-        - Code quality progression
+        Track growth over time from stored analysis snapshots:
+        - Code quality (original code %) progression
         - Complexity progression
-        - Skill acquisition rate
-        - Consistency improvements
+        - Skill count, repo, star and job readiness progression
         
         Returns: {
-            'code_quality_progression': [60, 65, 70, 75, 80],
-            'complexity_progression': [4, 5, 6, 7, 8],
-            'skill_count_progression': [1, 2, 3, 5, 7]
+            'dates': ['2025-01-04', '2025-02-11', ...],
+            'code_quality_progression': [60, None, 70],
+            'complexity_progression': [5, 7, 7],
+            'skill_count_progression': [2, 3, 5],
+            'repo_progression': [...],
+            'star_progression': [...],
+            'readiness_progression': [...],
+            'trends': {'human_code_percentage': 10, 'public_repos': 4, ...},
+            'snapshots': 3
         }
-        """
-        # Simplified growth metrics based on current state
-        human_percentage = self.github_data.get('human_code_percentage', 50)
-        complexity_level = self.github_data.get('complexity_level', 'intermediate')
-        skills_count = len(self.github_data.get('skills', []))
         
-        # Simulate progression (in real implementation, would analyze commit history)
-        complexity_map = {'basic': 5, 'intermediate': 7, 'advanced': 9}
-        current_complexity = complexity_map.get(complexity_level, 7)
+        Without history there is a single point - the current analysis.
+        """
+        points = self.history
+        if not points:
+            points = [{
+                'date': None,
+                'human_code_percentage': self.github_data.get('human_code_percentage', 50),
+                'complexity': COMPLEXITY_SCORES.get(self.github_data.get('complexity_level', 'intermediate'), 7),
+                'skills': self.github_data.get('skills', []),
+                'public_repos': self.github_data.get('public_repos', 0),
+                'total_stars': self.github_data.get('total_stars', 0),
+                'job_readiness': None,
+            }]
+        
+        # One value per date - None where a snapshot lacks the metric (charts skip gaps)
+        def series(field):
+            return [point.get(field) for point in points]
         
         return {
-            'code_quality_progression': [
-                max(30, human_percentage - 20),
-                max(40, human_percentage - 15),
-                max(50, human_percentage - 10),
-                max(60, human_percentage - 5),
-                human_percentage
-            ],
-            'complexity_progression': [
-                max(3, current_complexity - 4),
-                max(4, current_complexity - 3),
-                max(5, current_complexity - 2),
-                max(6, current_complexity - 1),
-                current_complexity
-            ],
-            'skill_count_progression': [
-                max(1, skills_count - 4),
-                max(2, skills_count - 3),
-                max(3, skills_count - 2),
-                max(4, skills_count - 1),
-                skills_count
-            ]
+            'dates': [point.get('date') for point in points],
+            'code_quality_progression': series('human_code_percentage'),
+            'complexity_progression': series('complexity'),
+            'skill_count_progression': [len(point.get('skills') or []) for point in points],
+            'repo_progression': series('public_repos'),
+            'star_progression': series('total_stars'),
+            'readiness_progression': series('job_readiness'),
+            'trends': metric_deltas(points),
+            'snapshots': len(points),
         }
     
     def generate_narrative(self):
@@ -0,0 +1,106 @@
+"""
+Benchmark: memory cost of holding a large account's repo listing.
+
+Builds a synthetic 1,000-repo account as raw API pages (100 repos per page,
+~80 fields per repo like the real /users/<name>/repos response) and compares
+decoding it the old way (response.json() per page, every dict kept) against
+streaming it into slotted RepoRecords and into the RepoAggregator fold used
+by the analyzer. Runs entirely offline.
+
+Usage:
+    python manage.py benchmark_github_records --repos 1000
+"""
+from django.core.management.base import BaseCommand
+from haunted_profiles.github_collector import RepoAggregator, REPOS_PER_PAGE
+from haunted_profiles.github_records import RepoRecord, CHUNK_SIZE, iter_json_array
+import json
+import time
+import tracemalloc
+
+
+def _fake_repo(i):
+    """A repo object with roughly the fields and size GitHub returns"""
+    repo = {
+        'id': 100000 + i,
+        'node_id': f'R_kgDO{i:08d}',
+        'name': f'project-{i}',
+        'full_name': f'ghostdev/project-{i}',
+        'private': False,
+        'owner': {field: f'https://api.github.com/users/ghostdev/{field}' for field in (
+            'login', 'avatar_url', 'url', 'html_url', 'followers_url', 'following_url', 'gists_url',
+            'starred_url', 'subscriptions_url', 'organizations_url', 'repos_url', 'events_url',
+            'received_events_url', 'type',
+        )},
+        'html_url': f'https://github.com/ghostdev/project-{i}',
+        'description': f'Neural pipeline experiment number {i} with a longer description' if i % 3 else None,
+        'fork': i % 7 == 0,
+        'language': ['Python', 'Go', 'Rust', 'TypeScript', None][i % 5],
+        'stargazers_count': i % 40,
+        'forks_count': i % 9,
+        'updated_at': f'20{19 + i % 7}-01-01T00:00:00Z',
+        'topics': ['ml', 'vision', 'pipeline'],
+        'license': {'key': 'mit', 'name': 'MIT License', 'spdx_id': 'MIT', 'url': 'https://api.github.com/licenses/mit'},
+    }
+    # The long tail of *_url / flag fields the analyzers never read
+    for n in range(65):
+        repo[f'extra_url_{n}'] = f'https://api.github.com/repos/ghostdev/project-{i}/extra/{n}'
+    return repo
+
+
+def _chunks(body):
+    for start in range(0, len(body), CHUNK_SIZE):
+        yield body[start:start + CHUNK_SIZE]
+
+
+class Command(BaseCommand):
+    help = 'Measure memory for decoding a large repo listing as dicts vs slotted records'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repos', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        count = options['repos']
+        pages = [
+            json.dumps([_fake_repo(i) for i in range(start, min(count, start + REPOS_PER_PAGE))]).encode()
+            for start in range(0, count, REPOS_PER_PAGE)
+        ]
+        self.stdout.write(f'{count} repos in {len(pages)} pages, {sum(map(len, pages)) / 1024:.0f} KB of JSON\n')
+
+        def keep_dicts():
+            repos = []
+            for body in pages:
+                repos.extend(json.loads(body))
+            return repos
+
+        def keep_records():
+            return [
+                RepoRecord.from_api(item)
+                for body in pages
+                for item in iter_json_array(_chunks(body))
+            ]
+
+        def aggregate():
+            aggregator = RepoAggregator()
+            index = 0
+            for body in pages:
+                for item in iter_json_array(_chunks(body)):
+                    aggregator.add(RepoRecord.from_api(item), index)
+                    index += 1
+            return aggregator.result()
+
+        scenarios = [
+            ('json.loads, keep raw dicts', keep_dicts),
+            ('stream -> RepoRecord list', keep_records),
+            ('stream -> RepoAggregator', aggregate),
+        ]
+
+        self.stdout.write(f'{"scenario":30} {"ms":>8} {"peak KB":>9} {"kept KB":>9}')
+        for name, fn in scenarios:
+            tracemalloc.start()
+            started = time.perf_counter()
+            result = fn()
+            elapsed = (time.perf_counter() - started) * 1000
+            kept, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            del result
+            self.stdout.write(f'{name:30} {elapsed:8.1f} {peak / 1024:9.0f} {kept / 1024:9.0f}')
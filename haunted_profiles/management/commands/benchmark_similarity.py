@@ -0,0 +1,139 @@
+"""
+Benchmark: near-duplicate detection across one opportunity's submissions.
+
+Generates synthetic submissions (random programs over a small code
+vocabulary) and plants near-duplicates: copies of earlier submissions with
+a share of their tokens edited. Every submission is fingerprinted and put
+in an in-memory LSH index keyed exactly like SubmissionBucket, then each
+one is checked for near-duplicates the way rate_submission does. Reports
+fingerprint and lookup times, how many signature comparisons the buckets
+needed against all-pairs, and how many planted copies were caught (also
+counting only those whose exact similarity reaches the threshold). The
+all-pairs time is extrapolated from comparing a sample against everything.
+
+Usage:
+    python manage.py benchmark_similarity --submissions 10000 --copies 0.02 --edits 0.01
+"""
+from collections import defaultdict
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from haunted_profiles.similarity import band_keys, estimate_similarity, minhash, shingle_hashes
+import random
+import time
+
+KEYWORDS = ['def', 'return', 'if', 'else', 'for', 'in', 'while', 'class', 'import', 'print', 'self', 'None']
+SYMBOLS = ['(', ')', ':', '=', '+', '-', '*', '[', ']', ',', '.', '==', '\n']
+
+
+class Command(BaseCommand):
+    help = 'Measure MinHash/LSH near-duplicate detection against all-pairs comparison'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--submissions', type=int, default=10_000)
+        parser.add_argument('--tokens', type=int, default=300, help='Tokens per synthetic submission')
+        parser.add_argument('--copies', type=float, default=0.02, help='Share of submissions that are edited copies')
+        parser.add_argument('--edits', type=float, default=0.01, help='Share of tokens changed in each copy')
+        parser.add_argument('--threshold', type=float, default=None,
+                            help='Similarity to flag (default SIMILARITY_THRESHOLD)')
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        count = options['submissions']
+        threshold = options['threshold'] or getattr(settings, 'SIMILARITY_THRESHOLD', 0.8)
+
+        texts, planted, origins = self._corpus(rng, count, options['tokens'], options['copies'], options['edits'])
+
+        started = time.perf_counter()
+        signatures = [minhash(shingle_hashes(text)) for text in texts]
+        fingerprint_elapsed = time.perf_counter() - started
+
+        started = time.perf_counter()
+        buckets = defaultdict(list)
+        for index, signature in enumerate(signatures):
+            for key in band_keys(signature):
+                buckets[key].append(index)
+        index_elapsed = time.perf_counter() - started
+
+        started = time.perf_counter()
+        comparisons = 0
+        flagged = set()
+        for index, signature in enumerate(signatures):
+            candidates = {other for key in band_keys(signature) for other in buckets[key] if other != index}
+            comparisons += len(candidates)
+            for other in candidates:
+                if estimate_similarity(signature, signatures[other]) >= threshold:
+                    flagged.add((min(index, other), max(index, other)))
+        lookup_elapsed = time.perf_counter() - started
+
+        all_pairs = count * (count - 1) // 2
+        all_pairs_elapsed = self._all_pairs_estimate(rng, signatures)
+        caught = len(planted & flagged)
+
+        # Copies whose exact shingle similarity reaches the threshold - the ones that should be flagged
+        similar = set()
+        for pair in planted:
+            a, b = (shingle_hashes(texts[index]) for index in pair)
+            if len(a & b) / len(a | b) >= threshold:
+                similar.add(pair)
+
+        self.stdout.write(f'{count} submissions, {len(planted)} planted copies, threshold {threshold}\n')
+        self.stdout.write(f'{"step":28} {"total ms":>10} {"ms/submission":>14}')
+        for name, elapsed in [
+            ('fingerprint (MinHash)', fingerprint_elapsed),
+            ('LSH index', index_elapsed),
+            ('LSH lookups', lookup_elapsed),
+            ('all-pairs (extrapolated)', all_pairs_elapsed),
+        ]:
+            self.stdout.write(f'{name:28} {elapsed * 1000:10.0f} {elapsed * 1000 / count:14.3f}')
+
+        self.stdout.write(
+            f'\nsignature comparisons: {comparisons // 2} with LSH vs {all_pairs} all-pairs '
+            f'({comparisons / 2 / all_pairs:.4%})'
+        )
+        self.stdout.write(f'planted copies caught: {caught}/{len(planted)}')
+        self.stdout.write(f'planted copies at or above the threshold caught: {len(similar & flagged)}/{len(similar)}')
+        unrelated = [pair for pair in flagged if origins[pair[0]] != origins[pair[1]]]
+        self.stdout.write(f'unrelated pairs flagged: {len(unrelated)}')
+
+    def _corpus(self, rng, count, tokens, copies, edits):
+        """
+        Random programs, with a share replaced by edited copies of earlier
+        ones. Returns the texts, the planted (source, copy) pairs and each
+        program's origin - the original all copies of copies trace back to.
+        """
+        def random_token():
+            roll = rng.random()
+            if roll < 0.3:
+                return rng.choice(KEYWORDS)
+            if roll < 0.6:
+                return rng.choice(SYMBOLS)
+            return f'name_{rng.randrange(5000)}'
+
+        programs = []
+        planted = set()
+        origins = []
+        for index in range(count):
+            if index > 0 and rng.random() < copies:
+                source = rng.randrange(index)
+                program = list(programs[source])
+                for position in rng.sample(range(len(program)), int(len(program) * edits)):
+                    program[position] = random_token()
+                planted.add((source, index))
+                origins.append(origins[source])
+            else:
+                program = [random_token() for _ in range(tokens)]
+                origins.append(index)
+            programs.append(program)
+        return [' '.join(program) for program in programs], planted, origins
+
+    def _all_pairs_estimate(self, rng, signatures, sample=20):
+        """Time comparing a sample of signatures with every other one, scaled up to all pairs"""
+        sample = min(sample, len(signatures))
+        started = time.perf_counter()
+        for index in rng.sample(range(len(signatures)), sample):
+            signature = signatures[index]
+            for other in signatures:
+                estimate_similarity(signature, other)
+        per_comparison = (time.perf_counter() - started) / (sample * len(signatures))
+        return per_comparison * len(signatures) * (len(signatures) - 1) / 2
@@ -0,0 +1,121 @@
+"""
+Benchmark: cost of loading users with and without the portfolio blob.
+
+Compares the old access pattern (full User row + full analysis JSON decoded
+for every card) against the lean paths (auth loader with deferred text,
+card projection for listings). Synthetic users are created inside a
+transaction that is rolled back, so the database is left untouched.
+
+Usage:
+    python manage.py benchmark_user_loading --users 200 --repeat 5
+"""
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from haunted_profiles.backends import LeanModelBackend
+from haunted_profiles.models import User, PortfolioSnapshot, PROFILE_TEXT_FIELDS
+import time
+import tracemalloc
+
+
+def _fake_portfolio(i):
+    """Roughly the shape and size of a real analysis (~30 KB of JSON)"""
+    return {
+        'overall_score': 60 + i % 40,
+        'github': {
+            'username': f'dev{i}',
+            'public_repos': 40 + i % 60,
+            'total_stars': i % 300,
+            'human_code_percentage': 50 + i % 50,
+            'skills': ['Python', 'JavaScript', 'Go', 'Rust', 'SQL'],
+            'languages': {f'Lang{n}': n for n in range(40)},
+            'unique_projects': [
+                {'name': f'project-{n}', 'description': 'x' * 200, 'stars': n, 'language': 'Python', 'url': 'https://github.com/x'}
+                for n in range(5)
+            ],
+            'ai_usage_summary': ['summary line ' * 10] * 20,
+            'explanations': ['explanation ' * 20] * 20,
+        },
+        'journey': {'timeline': [{'date': 'Phase', 'event': 'e' * 300}] * 20},
+        'ai_usage_breakdown': {'categories': [{'name': 'c', 'detail': 'd' * 500}] * 20},
+    }
+
+
+class Command(BaseCommand):
+    help = 'Measure memory, bytes and time to load users with and without the portfolio blob'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            ids = self._seed(options['users'])
+
+            scenarios = [
+                ('listing: full rows + blob', lambda: [
+                    (u.bio, u.portfolio_data) for u in
+                    User.objects.select_related('portfolio_snapshot').filter(id__in=ids)
+                ]),
+                ('listing: cards()', lambda: [
+                    (u.bio, u.top_skills, u.public_repos) for u in User.objects.cards().filter(id__in=ids)
+                ]),
+                ('auth: full user row', lambda: [User.objects.get(pk=pk) for pk in ids[:50]]),
+                ('auth: LeanModelBackend', lambda: [LeanModelBackend().get_user(pk) for pk in ids[:50]]),
+            ]
+
+            self.stdout.write(f'{"scenario":32} {"ms":>9} {"peak KB":>9} {"row KB":>9}')
+            for name, fn in scenarios:
+                self._run(name, fn, options['repeat'])
+
+            transaction.set_rollback(True)
+
+    def _seed(self, count):
+        User.objects.bulk_create([
+            User(
+                email=f'bench{i}@example.com', username=f'bench_{i}', is_verified=True,
+                **{field: 'lorem ipsum ' * 150 for field in PROFILE_TEXT_FIELDS},
+            )
+            for i in range(count)
+        ])
+        ids = list(User.objects.filter(username__startswith='bench_').values_list('id', flat=True))
+        PortfolioSnapshot.objects.bulk_create([
+            PortfolioSnapshot(user_id=pk, data=_fake_portfolio(i)) for i, pk in enumerate(ids)
+        ])
+        return ids
+
+    def _run(self, name, fn, repeat):
+        # Bytes: rough size of the column values the queries return
+        counter = _ByteCounter()
+        with connection.execute_wrapper(counter):
+            fn()
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        elapsed_ms = (time.perf_counter() - start) * 1000 / repeat
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        self.stdout.write(f'{name:32} {elapsed_ms:9.1f} {peak / 1024:9.0f} {counter.bytes / 1024:9.0f}')
+
+
+class _ByteCounter:
+    """execute_wrapper that sums the size of every value fetched"""
+
+    def __init__(self):
+        self.bytes = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        result = execute(sql, params, many, context)
+        cursor = context['cursor']
+        original_fetchmany = cursor.fetchmany
+
+        def counting_fetchmany(*args, **kwargs):
+            rows = original_fetchmany(*args, **kwargs)
+            for row in rows:
+                self.bytes += sum(len(str(value)) for value in row if value is not None)
+            return rows
+
+        cursor.fetchmany = counting_fetchmany
+        return result
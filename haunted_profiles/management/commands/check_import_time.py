@@ -0,0 +1,70 @@
+"""
+Cold-start guard: measures what a fresh worker imports while loading the
+project (django.setup() + URLconf) using `python -X importtime`.
+
+Usage:
+    python manage.py check_import_time
+    python manage.py check_import_time --budget-ms 1500 --top 15
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+import os
+import re
+import subprocess
+import sys
+
+# Modules that must only be imported on demand (first login, first analysis, ...)
+LAZY_MODULES = ['workos', 'bs4']
+
+BOOT_SCRIPT = (
+    "import django; django.setup(); "
+    "from django.urls import get_resolver; get_resolver().url_patterns"
+)
+
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)$')
+
+
+class Command(BaseCommand):
+    help = 'Measure worker cold-start import cost and fail if lazy modules are imported eagerly'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--budget-ms', type=int, default=None,
+                            help='Fail if total import time exceeds this (default: settings.IMPORT_TIME_BUDGET_MS)')
+        parser.add_argument('--top', type=int, default=10, help='Show the N slowest top-level imports')
+
+    def handle(self, *args, **options):
+        budget_ms = options['budget_ms'] or getattr(settings, 'IMPORT_TIME_BUDGET_MS', 2000)
+
+        env = dict(os.environ)
+        env.setdefault('DJANGO_SETTINGS_MODULE', 'ghosthire.settings')
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', BOOT_SCRIPT],
+            capture_output=True, text=True, env=env, cwd=settings.BASE_DIR,
+        )
+        if result.returncode != 0:
+            raise CommandError(f'Project failed to boot:\n{result.stderr[-2000:]}')
+
+        # (cumulative_us, module) for top-level imports only
+        top_level = []
+        imported = set()
+        for line in result.stderr.splitlines():
+            match = IMPORTTIME_LINE.match(line)
+            if not match:
+                continue
+            cumulative, indent, module = int(match.group(2)), match.group(3), match.group(4)
+            imported.add(module)
+            if len(indent) == 1:
+                top_level.append((cumulative, module))
+
+        total_ms = sum(us for us, _ in top_level) / 1000
+        self.stdout.write(f'Total import time: {total_ms:.0f} ms (budget {budget_ms} ms)')
+        for us, module in sorted(top_level, reverse=True)[:options['top']]:
+            self.stdout.write(f'  {us / 1000:8.1f} ms  {module}')
+
+        eager = [m for m in LAZY_MODULES if m in imported]
+        if eager:
+            raise CommandError(f'Imported at boot but should be lazy: {", ".join(eager)}')
+        if total_ms > budget_ms:
+            raise CommandError(f'Cold-start import time {total_ms:.0f} ms exceeds budget of {budget_ms} ms')
+
+        self.stdout.write(self.style.SUCCESS('Import time OK'))
@@ -0,0 +1,50 @@
+"""
+Finish portfolio analyses that were stored partial because they ran out of
+their in-request time budget and weren't completed in the background (e.g.
+the worker restarted). Safe to run from cron - complete portfolios are
+never touched.
+
+Usage:
+    python manage.py complete_portfolio_analyses --limit 50 --budget 300
+"""
+from django.core.management.base import BaseCommand
+from haunted_profiles.analysis_jobs import complete_analysis
+from haunted_profiles.models import PortfolioSnapshot
+import time
+
+
+class Command(BaseCommand):
+    help = 'Complete portfolio analyses that were cut short by the request time budget'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=50)
+        parser.add_argument('--budget', type=int, default=None,
+                            help='Seconds per analysis (default PORTFOLIO_COMPLETION_BUDGET_SECONDS)')
+
+    def handle(self, *args, **options):
+        user_ids = list(
+            PortfolioSnapshot.objects.filter(partial=True)
+            .order_by('updated_at')
+            .values_list('user_id', flat=True)[:options['limit']]
+        )
+        if not user_ids:
+            self.stdout.write('No partial portfolios')
+            return
+
+        self.stdout.write(f'{"user":>8} {"result":>10} {"ms":>9}')
+        completed = 0
+        for user_id in user_ids:
+            started = time.perf_counter()
+            portfolio_data = complete_analysis(user_id, budget=options['budget'])
+            elapsed = (time.perf_counter() - started) * 1000
+
+            if portfolio_data is None:
+                result = 'failed'
+            elif portfolio_data['partial']:
+                result = 'partial'
+            else:
+                result = 'complete'
+                completed += 1
+            self.stdout.write(f'{user_id:>8} {result:>10} {elapsed:9.0f}')
+
+        self.stdout.write(f'\n{completed}/{len(user_ids)} completed')
@@ -0,0 +1,41 @@
+"""
+Fingerprint submissions for near-duplicate detection. New submissions are
+indexed when they're submitted; this picks up ones from before that (or
+re-indexes everything with --all after the similarity parameters change).
+
+Usage:
+    python manage.py index_submissions --limit 1000
+    python manage.py index_submissions --all
+"""
+from django.core.management.base import BaseCommand
+from haunted_profiles.models import Submission
+from haunted_profiles.similarity import index_submission
+
+
+class Command(BaseCommand):
+    help = 'Compute MinHash fingerprints and LSH buckets for submissions'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=None)
+        parser.add_argument('--all', action='store_true', help='Re-index submissions that already have a fingerprint')
+
+    def handle(self, *args, **options):
+        submissions = Submission.objects.select_related('invitation').order_by('id')
+        if not options['all']:
+            submissions = submissions.filter(fingerprint__isnull=True)
+        if options['limit']:
+            submissions = submissions[:options['limit']]
+
+        indexed = empty = failed = 0
+        for submission in submissions.iterator(chunk_size=200):
+            try:
+                signature = index_submission(submission)
+            except Exception as e:
+                self.stderr.write(f'Submission {submission.id}: {e}')
+                failed += 1
+                continue
+            if signature is None:
+                empty += 1
+            else:
+                indexed += 1
+        self.stdout.write(f'{indexed} indexed, {empty} without code to fingerprint, {failed} failed')
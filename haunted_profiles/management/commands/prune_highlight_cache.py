@@ -0,0 +1,23 @@
+"""
+Keep the shared syntax highlighting cache bounded: deletes all but the
+newest HIGHLIGHT_DB_MAX_ROWS renderings. Anything deleted that's still on
+a page is simply rendered again the next time it's viewed. Safe to run
+from cron.
+
+Usage:
+    python manage.py prune_highlight_cache --max-rows 50000
+"""
+from django.core.management.base import BaseCommand
+from haunted_profiles.models import HighlightedCode
+
+
+class Command(BaseCommand):
+    help = 'Delete the oldest cached syntax highlighting beyond HIGHLIGHT_DB_MAX_ROWS'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--max-rows', type=int, default=None,
+                            help='Renderings to keep (default HIGHLIGHT_DB_MAX_ROWS)')
+
+    def handle(self, *args, **options):
+        deleted = HighlightedCode.prune(options['max_rows'])
+        self.stdout.write(f'Deleted {deleted} cached highlight(s), {HighlightedCode.objects.count()} kept')
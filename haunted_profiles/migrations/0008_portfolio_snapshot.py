@@ -0,0 +1,100 @@
+# Generated by Django 4.2.25 on 2026-10-19 12:38
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def move_portfolio_to_snapshots(apps, schema_editor):
+    """Copy User.portfolio_data into PortfolioSnapshot and fill the card columns"""
+    User = apps.get_model("haunted_profiles", "User")
+    PortfolioSnapshot = apps.get_model("haunted_profiles", "PortfolioSnapshot")
+
+    users = User.objects.only("id", "portfolio_data")
+    for user in users.iterator(chunk_size=200):
+        data = user.portfolio_data or {}
+        if not data:
+            continue
+        github = data.get("github") or {}
+        PortfolioSnapshot.objects.update_or_create(user_id=user.id, defaults={"data": data})
+        User.objects.filter(id=user.id).update(
+            overall_score=data.get("overall_score", 0) or 0,
+            human_code_percentage=github.get("human_code_percentage"),
+            public_repos=github.get("public_repos", 0) or 0,
+            total_stars=github.get("total_stars", 0) or 0,
+            top_skills=(github.get("skills") or [])[:5],
+        )
+
+
+def restore_portfolio_data(apps, schema_editor):
+    User = apps.get_model("haunted_profiles", "User")
+    PortfolioSnapshot = apps.get_model("haunted_profiles", "PortfolioSnapshot")
+
+    for snapshot in PortfolioSnapshot.objects.iterator(chunk_size=200):
+        User.objects.filter(id=snapshot.user_id).update(portfolio_data=snapshot.data)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("haunted_profiles", "0007_notification_invitation_notification_link_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PortfolioSnapshot",
+            fields=[
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="portfolio_snapshot",
+                        serialize=False,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "data",
+                    models.JSONField(
+                        blank=True,
+                        default=dict,
+                        help_text="AI-analyzed skills and achievements",
+                    ),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="user",
+            name="human_code_percentage",
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="user",
+            name="overall_score",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="user",
+            name="public_repos",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="user",
+            name="top_skills",
+            field=models.JSONField(
+                blank=True, default=list, help_text="Top languages from GitHub (max 5)"
+            ),
+        ),
+        migrations.AddField(
+            model_name="user",
+            name="total_stars",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(move_portfolio_to_snapshots, restore_portfolio_data),
+        migrations.RemoveField(
+            model_name="user",
+            name="portfolio_data",
+        ),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 4.2.25 on 2026-10-19 12:42
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("haunted_profiles", "0008_portfolio_snapshot"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PortfolioHistory",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "captured_at",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+                ("schema_version", models.PositiveSmallIntegerField(default=1)),
+                (
+                    "payload",
+                    models.BinaryField(
+                        blank=True,
+                        help_text="zlib-compressed analysis (dropped when downsampled)",
+                        null=True,
+                    ),
+                ),
+                ("public_repos", models.IntegerField(default=0)),
+                ("total_stars", models.IntegerField(default=0)),
+                (
+                    "human_code_percentage",
+                    models.SmallIntegerField(blank=True, null=True),
+                ),
+                ("job_readiness", models.SmallIntegerField(blank=True, null=True)),
+                ("overall_score", models.SmallIntegerField(default=0)),
+                ("complexity", models.SmallIntegerField(blank=True, null=True)),
+                ("skills", models.JSONField(blank=True, default=list)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="portfolio_history",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "Portfolio histories",
+                "ordering": ["captured_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["user", "captured_at"],
+                        name="haunted_pro_user_id_b6785f_idx",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 4.2.25 on 2026-10-19 12:46
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("haunted_profiles", "0009_portfolio_history"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AnalysisStageResult",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("stage", models.CharField(max_length=50)),
+                ("input_hash", models.CharField(max_length=64)),
+                ("output", models.JSONField(blank=True, default=dict)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="analysis_stages",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("user", "stage")},
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.25 on 2026-10-19 12:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("haunted_profiles", "0010_analysisstageresult"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="portfoliosnapshot",
+            name="partial",
+            field=models.BooleanField(
+                db_index=True,
+                default=False,
+                help_text="Analysis ran out of time and is still being completed",
+            ),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.25 on 2026-10-19 12:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("haunted_profiles", "0011_portfolio_snapshot_partial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AnalysisLease",
+            fields=[
+                (
+                    "key",
+                    models.CharField(max_length=150, primary_key=True, serialize=False),
+                ),
+                ("token", models.CharField(max_length=32)),
+                ("acquired_at", models.DateTimeField()),
+                ("expires_at", models.DateTimeField()),
+            ],
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.25 on 2026-10-19 13:04
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_crew_members(apps, schema_editor):
+    """Fill member_count from the existing membership rows"""
+    GhostCrew = apps.get_model("haunted_profiles", "GhostCrew")
+    Membership = GhostCrew.members.through
+
+    totals = (
+        Membership.objects.filter(ghostcrew_id=OuterRef("pk"))
+        .order_by()
+        .values("ghostcrew_id")
+        .annotate(total=Count("id"))
+        .values("total")
+    )
+    GhostCrew.objects.update(member_count=Coalesce(Subquery(totals), 0))
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("haunted_profiles", "0012_analysis_lease"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ghostcrew",
+            name="member_count",
+            field=models.PositiveSmallIntegerField(
+                default=0,
+                help_text="Maintained by add_member() - don't add members directly",
+            ),
+        ),
+        migrations.RunPython(count_crew_members, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,156 @@
+# Generated by Django 4.2.25 on 2026-10-19 13:10
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+import django.db.models.deletion
+from collections import defaultdict
+
+STAGES = ("invited", "accepted", "declined", "submitted", "rated")
+
+
+def count_funnels(apps, schema_editor):
+    """Rebuild the funnel counters and daily buckets from existing invitations"""
+    Opportunity = apps.get_model("haunted_profiles", "Opportunity")
+    Invitation = apps.get_model("haunted_profiles", "Invitation")
+    CompanyFunnel = apps.get_model("haunted_profiles", "CompanyFunnel")
+    CompanyFunnelDay = apps.get_model("haunted_profiles", "CompanyFunnelDay")
+
+    per_opportunity = defaultdict(lambda: dict.fromkeys(STAGES, 0))
+    per_company = defaultdict(lambda: dict.fromkeys(STAGES, 0))
+    per_day = defaultdict(lambda: dict.fromkeys(STAGES, 0))
+
+    def count(invitation, stage, when):
+        company_id = invitation.opportunity.company_id
+        per_opportunity[invitation.opportunity_id][stage] += 1
+        per_company[company_id][stage] += 1
+        if when is not None:
+            per_day[(company_id, timezone.localdate(when))][stage] += 1
+
+    invitations = Invitation.objects.select_related("opportunity", "submission")
+    for invitation in invitations.iterator(chunk_size=500):
+        count(invitation, "invited", invitation.sent_at)
+        if invitation.status in ("accepted", "declined"):
+            count(invitation, invitation.status, invitation.responded_at)
+        submission = getattr(invitation, "submission", None)
+        if submission is not None:
+            count(invitation, "submitted", submission.submitted_at)
+            if submission.rating is not None:
+                count(invitation, "rated", submission.rated_at)
+
+    def fields(counts):
+        return {f"{stage}_count": total for stage, total in counts.items()}
+
+    for opportunity_id, counts in per_opportunity.items():
+        Opportunity.objects.filter(pk=opportunity_id).update(**fields(counts))
+    CompanyFunnel.objects.bulk_create(
+        [
+            CompanyFunnel(company_id=company_id, **fields(counts))
+            for company_id, counts in per_company.items()
+        ]
+    )
+    CompanyFunnelDay.objects.bulk_create(
+        [
+            CompanyFunnelDay(company_id=company_id, day=day, **fields(counts))
+            for (company_id, day), counts in per_day.items()
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("haunted_profiles", "0015_shortlist"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="opportunity",
+            name="accepted_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="opportunity",
+            name="declined_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="opportunity",
+            name="invited_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="opportunity",
+            name="rated_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="opportunity",
+            name="submitted_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name="CompanyFunnel",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("invited_count", models.PositiveIntegerField(default=0)),
+                ("accepted_count", models.PositiveIntegerField(default=0)),
+                ("declined_count", models.PositiveIntegerField(default=0)),
+                ("submitted_count", models.PositiveIntegerField(default=0)),
+                ("rated_count", models.PositiveIntegerField(default=0)),
+                (
+                    "company",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="funnel",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "abstract": False,
+            },
+        ),
+        migrations.CreateModel(
+            name="CompanyFunnelDay",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("invited_count", models.PositiveIntegerField(default=0)),
+                ("accepted_count", models.PositiveIntegerField(default=0)),
+                ("declined_count", models.PositiveIntegerField(default=0)),
+                ("submitted_count", models.PositiveIntegerField(default=0)),
+                ("rated_count", models.PositiveIntegerField(default=0)),
+                ("day", models.DateField()),
+                (
+                    "company",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="funnel_days",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["day"],
+                "unique_together": {("company", "day")},
+            },
+        ),
+        migrations.RunPython(count_funnels, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.25 on 2026-10-19 13:16
+
+from django.db import migrations, models
+
+
+def fill_job_readiness(apps, schema_editor):
+    """Copy the readiness score out of each stored analysis into the card column"""
+    User = apps.get_model("haunted_profiles", "User")
+    PortfolioSnapshot = apps.get_model("haunted_profiles", "PortfolioSnapshot")
+
+    for snapshot in PortfolioSnapshot.objects.iterator(chunk_size=200):
+        readiness = ((snapshot.data or {}).get("job_readiness") or {}).get(
+            "overall_score"
+        )
+        if readiness is not None:
+            User.objects.filter(id=snapshot.user_id).update(job_readiness=readiness)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("haunted_profiles", "0016_company_funnel"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="user",
+            name="job_readiness",
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.RunPython(fill_job_readiness, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,104 @@
+# Generated by Django 4.2.25 on 2026-10-19 13:13
+
+from django.db import migrations, models
+import django.db.models.deletion
+from haunted_profiles.job_search import (
+    normalize_skill,
+    parse_salary_range,
+    split_skills,
+)
+
+
+def index_jobs(apps, schema_editor):
+    """Parse salary bounds and build the skill links for existing posts"""
+    SummoningPost = apps.get_model("haunted_profiles", "SummoningPost")
+    JobSkill = apps.get_model("haunted_profiles", "JobSkill")
+
+    for job in SummoningPost.objects.iterator(chunk_size=200):
+        # The post form used to store "Python, React" as a single skill
+        skills = split_skills(job.required_skills or [])
+        salary_min, salary_max = parse_salary_range(job.salary_range)
+        SummoningPost.objects.filter(pk=job.pk).update(
+            required_skills=skills, salary_min=salary_min, salary_max=salary_max
+        )
+        JobSkill.objects.bulk_create(
+            [
+                JobSkill(job_id=job.pk, name=name)
+                for name in {normalize_skill(skill) for skill in skills}
+            ],
+            ignore_conflicts=True,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("haunted_profiles", "0017_user_job_readiness"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="JobSkill",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=50)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="summoningpost",
+            name="salary_max",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="summoningpost",
+            name="salary_min",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="summoningpost",
+            index=models.Index(
+                fields=["is_active", "location"], name="haunted_pro_is_acti_bc8941_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="summoningpost",
+            index=models.Index(
+                fields=["is_active", "is_remote"], name="haunted_pro_is_acti_12d15b_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="summoningpost",
+            index=models.Index(
+                fields=["is_active", "salary_max"],
+                name="haunted_pro_is_acti_5a4bfe_idx",
+            ),
+        ),
+        migrations.AddField(
+            model_name="jobskill",
+            name="job",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="skill_links",
+                to="haunted_profiles.summoningpost",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="jobskill",
+            index=models.Index(
+                fields=["name", "job"], name="haunted_pro_name_2a2f77_idx"
+            ),
+        ),
+        migrations.AlterUniqueTogether(
+            name="jobskill",
+            unique_together={("job", "name")},
+        ),
+        migrations.RunPython(index_jobs, migrations.RunPython.noop),
+    ]
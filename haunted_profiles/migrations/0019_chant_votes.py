@@ -0,0 +1,94 @@
+# Generated by Django 4.2.25 on 2026-10-19 13:16
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import math
+
+# Frozen copy of GraveyardPost.hot_score_for as of this migration
+HOT_EPOCH = 1_700_000_000
+HOT_DECAY_SECONDS = 45000
+
+
+def hot_score(roast_score, created_at):
+    age_term = (created_at.timestamp() - HOT_EPOCH) / HOT_DECAY_SECONDS
+    return math.log10(max(roast_score, 1)) + age_term
+
+
+def score_posts(apps, schema_editor):
+    """Give existing posts their hot score"""
+    GraveyardPost = apps.get_model("haunted_profiles", "GraveyardPost")
+    for post in GraveyardPost.objects.only("id", "roast_score", "created_at").iterator(
+        chunk_size=500
+    ):
+        GraveyardPost.objects.filter(pk=post.pk).update(
+            hot_score=hot_score(post.roast_score, post.created_at)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("haunted_profiles", "0018_job_search"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ChantVote",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="graveyardpost",
+            name="hot_score",
+            field=models.FloatField(
+                default=0, help_text="Roast score decayed by age - see hot_score_for()"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="ghostchant",
+            index=models.Index(
+                fields=["post", "-upvotes", "-created_at"],
+                name="haunted_pro_post_id_0d9247_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="graveyardpost",
+            index=models.Index(
+                fields=["-hot_score", "-id"], name="haunted_pro_hot_sco_cd8b57_idx"
+            ),
+        ),
+        migrations.AddField(
+            model_name="chantvote",
+            name="chant",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="votes",
+                to="haunted_profiles.ghostchant",
+            ),
+        ),
+        migrations.AddField(
+            model_name="chantvote",
+            name="voter",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="chant_votes",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AlterUniqueTogether(
+            name="chantvote",
+            unique_together={("chant", "voter")},
+        ),
+        migrations.RunPython(score_posts, migrations.RunPython.noop),
+    ]
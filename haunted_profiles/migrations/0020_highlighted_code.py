@@ -0,0 +1,30 @@
+# Generated by Django 4.2.25 on 2026-10-19 13:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("haunted_profiles", "0019_chant_votes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="HighlightedCode",
+            fields=[
+                (
+                    "key",
+                    models.CharField(
+                        help_text="sha256 of language + code",
+                        max_length=64,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("language", models.CharField(max_length=50)),
+                ("html", models.TextField()),
+                ("created_at", models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.25 on 2026-10-19 15:02
+
+from django.db import migrations
+from haunted_profiles.job_search import parse_salary_range
+
+
+def reparse_salaries(apps, schema_editor):
+    """Re-parse salary bounds: open-ended ("$100k+ DOE") and monthly ranges were misread"""
+    SummoningPost = apps.get_model("haunted_profiles", "SummoningPost")
+
+    for job in SummoningPost.objects.exclude(salary_range="").iterator(chunk_size=200):
+        salary_min, salary_max = parse_salary_range(job.salary_range)
+        if (salary_min, salary_max) != (job.salary_min, job.salary_max):
+            SummoningPost.objects.filter(pk=job.pk).update(
+                salary_min=salary_min, salary_max=salary_max
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("haunted_profiles", "0021_submission_similarity"),
+    ]
+
+    operations = [
+        migrations.RunPython(reparse_salaries, migrations.RunPython.noop),
+    ]
@@ -1,9 +1,64 @@
-from django.db import models
+from django.db import connections, models, router, transaction, IntegrityError
+from django.db.models import Count, F, Q, Value
+from django.db.models.functions import Coalesce, Greatest, Log
+from django.conf import settings
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin, BaseUserManager
 from django.utils import timezone
+from datetime import timedelta
+from .portfolio_history import (
+    PAYLOAD_SCHEMA_VERSION, METRIC_FIELDS, encode_payload, decode_payload, extract_metrics, plan_downsample,
+)
+from .job_search import normalize_skill, parse_salary_range, skill_token_regex
+import json
+import logging
+import math
+import re
+import time
+import uuid
 
+logger = logging.getLogger(__name__)
 
-class CustomUserManager(BaseUserManager):
+
+# Long self-description fields - never needed to authenticate or list users,
+# so they're deferred on request.user and card querysets
+PROFILE_TEXT_FIELDS = [
+    'core_skills', 'strengths', 'weaknesses', 'coding_journey',
+    'expertise_details', 'learning_journey', 'ai_usage_context', 'non_expertise_areas',
+]
+
+# Everything the AI analysis reads from the user's self-description
+SELF_DESCRIPTION_FIELDS = [
+    'developer_role', 'core_skills', 'strengths', 'weaknesses', 'coding_journey',
+    'expertise_area', 'expertise_details', 'learning_journey', 'ai_usage_context', 'non_expertise_areas',
+]
+
+# Columns rendered on developer cards (ghost_hunt, ghost_selector, applications)
+CARD_FIELDS = [
+    'id', 'username', 'email', 'ghost_avatar', 'ghost_level', 'is_verified', 'is_company',
+    'bio', 'developer_role', 'core_skills', 'github_link', 'last_portfolio_update',
+    'overall_score', 'human_code_percentage', 'job_readiness', 'public_repos', 'total_stars', 'top_skills',
+]
+
+
+def _annotated_count(instance, annotation, related_name):
+    """Count from with_counts() if annotated, else from prefetched rows, else one COUNT query"""
+    if annotation in instance.__dict__:
+        return instance.__dict__[annotation]
+    prefetched = getattr(instance, '_prefetched_objects_cache', {})
+    if related_name in prefetched:
+        return len(prefetched[related_name])
+    return getattr(instance, related_name).count()
+
+
+class UserQuerySet(models.QuerySet):
+    """QuerySet helpers for listing users without their heavy columns"""
+    
+    def cards(self):
+        """Only the columns developer cards render"""
+        return self.only(*CARD_FIELDS)
+
+
+class CustomUserManager(BaseUserManager.from_queryset(UserQuerySet)):
     """Custom manager for User model"""
     
     def create_user(self, email, username, password=None, **extra_fields):
@@ -103,9 +158,15 @@ class User(AbstractBaseUser, PermissionsMixin):
     linkedin_url = models.URLField(blank=True)
     devpost_url = models.URLField(blank=True)
     
-    # AI-Analyzed Portfolio Data (scraped from links)
-    portfolio_data = models.JSONField(default=dict, blank=True, help_text='AI-analyzed skills and achievements')
+    # AI-Analyzed Portfolio - the full analysis lives in PortfolioSnapshot;
+    # these few numbers are the "card" listings show without loading it
     last_portfolio_update = models.DateTimeField(null=True, blank=True)
+    overall_score = models.IntegerField(default=0)
+    human_code_percentage = models.IntegerField(null=True, blank=True)
+    job_readiness = models.IntegerField(null=True, blank=True)
+    public_repos = models.IntegerField(default=0)
+    total_stars = models.IntegerField(default=0)
+    top_skills = models.JSONField(default=list, blank=True, help_text='Top languages from GitHub (max 5)')
     
     created_at = models.DateTimeField(auto_now_add=True)
     
@@ -135,6 +196,407 @@ class User(AbstractBaseUser, PermissionsMixin):
     
     def get_short_name(self):
         return self.username
+    
+    @property
+    def portfolio_data(self):
+        """Full AI analysis (loaded from PortfolioSnapshot on first access)"""
+        try:
+            return self.portfolio_snapshot.data
+        except PortfolioSnapshot.DoesNotExist:
+            return {}
+    
+    def github_username(self):
+        """Lowercased GitHub account from github_link ('' if none)"""
+        return (self.github_link or '').rstrip('/').split('/')[-1].lower()
+    
+    def get_self_description(self):
+        """Self-description dict for the analyzer, loading any deferred fields in one query"""
+        deferred = self.get_deferred_fields() & set(SELF_DESCRIPTION_FIELDS)
+        if deferred:
+            self.refresh_from_db(fields=list(deferred))
+        return {field: getattr(self, field) for field in SELF_DESCRIPTION_FIELDS}
+    
+    def update_portfolio(self, portfolio_data):
+        """
+        Store a fresh analysis and refresh the card numbers derived from it.
+        A partial analysis is shown as-is but kept out of the history until
+        it has been completed.
+        """
+        github = portfolio_data.get('github') or {}
+        partial = bool(portfolio_data.get('partial'))
+        
+        PortfolioSnapshot.objects.update_or_create(user=self, defaults={'data': portfolio_data, 'partial': partial})
+        if not partial:
+            PortfolioHistory.record(self, portfolio_data)
+        
+        self.overall_score = portfolio_data.get('overall_score', 0) or 0
+        self.human_code_percentage = github.get('human_code_percentage')
+        self.job_readiness = (portfolio_data.get('job_readiness') or {}).get('overall_score')
+        self.public_repos = github.get('public_repos', 0) or 0
+        self.total_stars = github.get('total_stars', 0) or 0
+        self.top_skills = (github.get('skills') or [])[:5]
+        self.last_portfolio_update = timezone.now()
+        self.save(update_fields=[
+            'overall_score', 'human_code_percentage', 'job_readiness', 'public_repos',
+            'total_stars', 'top_skills', 'last_portfolio_update',
+        ])
+    
+    def analyze_portfolio(self, refresh=False, offline=False, budget=None, schedule_remaining=True):
+        """
+        Run the portfolio analysis and store the result.
+        
+        Stage outputs from the previous run are reused when their inputs are
+        unchanged, so a self-description edit doesn't touch GitHub. refresh
+        re-fetches external profiles anyway; offline raises
+        analysis_pipeline.StageUnavailable instead of fetching anything.
+        
+        The run is limited to budget seconds (PORTFOLIO_ANALYSIS_BUDGET_SECONDS
+        by default). If that isn't enough, the partial result is stored and,
+        with schedule_remaining, the rest is finished in the background.
+        
+        Only one analysis per GitHub account runs at a time, across all
+        workers (see AnalysisLease). A call that finds one in flight waits
+        for it and returns its result instead of fetching everything again;
+        offline re-scores wait and then run, so they see the latest
+        self-description. If the flight was another user's with the same
+        GitHub account, ours then runs on the sources it just fetched (see
+        AnalysisStageResult.borrow_sources). If the wait outlasts the
+        budget, the stored portfolio is returned marked partial.
+        """
+        from .analysis_pipeline import Budget
+        from .analysis_jobs import schedule_completion
+        
+        if budget is None:
+            budget = getattr(settings, 'PORTFOLIO_ANALYSIS_BUDGET_SECONDS', None)
+        budget = budget if isinstance(budget, Budget) else Budget(budget)
+        key = AnalysisLease.key_for(self)
+        shared_since = None
+        
+        while True:
+            # Taken before trying the lease: the flight holding it may save its
+            # snapshot between our failed acquire and the wait
+            waited_from = timezone.now()
+            token = AnalysisLease.acquire(key, budget.seconds)
+            if token is not None:
+                break
+            
+            if not AnalysisLease.wait(key, budget):
+                logger.info(f"⏳ Analysis of {key} still running elsewhere - returning stored portfolio")
+                stored = PortfolioSnapshot.objects.filter(user=self).values_list('data', flat=True).first()
+                return {**(stored or {}), 'partial': True}
+            
+            if not offline:
+                joined = PortfolioSnapshot.objects.filter(user=self, updated_at__gte=waited_from).first()
+                if joined is not None:
+                    return joined.data
+            # The flight was for another user with this GitHub account (or an
+            # offline re-score) - run ours now, on what it fetched
+            shared_since = waited_from if shared_since is None else shared_since
+        
+        try:
+            portfolio_data = self._run_analysis(refresh, offline, budget, shared_since)
+        finally:
+            AnalysisLease.release(key, token)
+        
+        if portfolio_data['partial'] and schedule_remaining:
+            schedule_completion(self.pk)
+        return portfolio_data
+    
+    def _run_analysis(self, refresh, offline, budget, shared_since=None):
+        from .portfolio_analyzer import PORTFOLIO_PIPELINE, analyze_full_portfolio
+        
+        # One spelling per account, so every user linking it has the same source inputs
+        github_username = self.github_username()
+        github_url = f'https://github.com/{github_username}' if github_username else self.github_link
+        
+        memo = AnalysisStageResult.load_memo(self)
+        borrowed = []
+        if shared_since is not None:
+            source_keys = PORTFOLIO_PIPELINE.source_keys({
+                'github_url': github_url, 'linkedin_url': self.linkedin_url, 'devpost_url': self.devpost_url,
+            })
+            borrowed = AnalysisStageResult.borrow_sources(self, memo, source_keys, shared_since)
+            if borrowed and refresh:
+                # Fetched during our wait - as fresh as a refresh would get
+                refresh = [name for name in source_keys if name not in borrowed]
+        
+        portfolio_data = analyze_full_portfolio(
+            github_url=github_url,
+            linkedin_url=self.linkedin_url,
+            devpost_url=self.devpost_url,
+            user_profile=self.get_self_description(),
+            history=self.get_metric_history(),
+            memo=memo,
+            refresh=refresh,
+            offline=offline,
+            budget=budget,
+        )
+        AnalysisStageResult.save_memo(self, memo, [*portfolio_data['pipeline']['recomputed'], *borrowed])
+        self.update_portfolio(portfolio_data)
+        return portfolio_data
+    
+    def get_metric_history(self):
+        """Tracked metrics for every stored refresh, oldest first (no payloads loaded)"""
+        history = []
+        for row in self.portfolio_history.values('captured_at', 'skills', *METRIC_FIELDS):
+            row['date'] = row.pop('captured_at').date().isoformat()
+            history.append(row)
+        return history
+
+
+class PortfolioSnapshot(models.Model):
+    """Latest AI portfolio analysis for a user (kept off the User row)"""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='portfolio_snapshot')
+    data = models.JSONField(default=dict, blank=True, help_text='AI-analyzed skills and achievements')
+    partial = models.BooleanField(default=False, db_index=True, help_text='Analysis ran out of time and is still being completed')
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"Portfolio of {self.user_id}"
+
+
+class AnalysisStageResult(models.Model):
+    """Memoized output of one portfolio analysis stage (see analysis_pipeline.py)"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='analysis_stages')
+    stage = models.CharField(max_length=50)
+    input_hash = models.CharField(max_length=64)
+    output = models.JSONField(default=dict, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        unique_together = ['user', 'stage']
+    
+    def __str__(self):
+        return f"{self.stage} for {self.user_id}"
+    
+    @classmethod
+    def load_memo(cls, user):
+        """{stage: {'key': input_hash, 'output': ...}} for everything stored for this user"""
+        return {
+            stage: {'key': input_hash, 'output': output}
+            for stage, input_hash, output in cls.objects.filter(user=user).values_list('stage', 'input_hash', 'output')
+        }
+    
+    @classmethod
+    def borrow_sources(cls, user, memo, source_keys, since):
+        """
+        Fill memo with source outputs other users stored since since for the
+        same inputs (source_keys, see Pipeline.source_keys) - what an
+        analysis of the same GitHub account just fetched. Sources only read
+        their URL, so the outputs are the same for every user.
+        
+        Returns: names of the borrowed sources
+        """
+        wanted = {
+            stage: key for stage, key in source_keys.items() if (memo.get(stage) or {}).get('key') != key
+        }
+        if not wanted:
+            return []
+        
+        borrowed = []
+        rows = (
+            cls.objects.filter(stage__in=wanted, input_hash__in=set(wanted.values()), updated_at__gte=since)
+            .exclude(user=user).order_by('-updated_at').values_list('stage', 'input_hash', 'output')
+        )
+        for stage, input_hash, output in rows:
+            if stage not in borrowed and wanted[stage] == input_hash:
+                memo[stage] = {'key': input_hash, 'output': output}
+                borrowed.append(stage)
+        return borrowed
+    
+    @classmethod
+    def save_memo(cls, user, memo, stages):
+        """Persist the memo entries for the given (recomputed) stages; drop ones that failed"""
+        rows = [
+            cls(user=user, stage=stage, input_hash=memo[stage]['key'], output=memo[stage]['output'])
+            for stage in stages if stage in memo
+        ]
+        if rows:
+            # MySQL's ON DUPLICATE KEY UPDATE can't name the conflict target - it
+            # uses the (user, stage) unique key on its own
+            features = connections[router.db_for_write(cls)].features
+            target = {'unique_fields': ['user', 'stage']} if features.supports_update_conflicts_with_target else {}
+            cls.objects.bulk_create(
+                rows, update_conflicts=True, update_fields=['input_hash', 'output', 'updated_at'], **target,
+            )
+        failed = [stage for stage in stages if stage not in memo]
+        if failed:
+            cls.objects.filter(user=user, stage__in=failed).delete()
+
+
+class AnalysisLease(models.Model):
+    """
+    Cross-process single-flight lock for portfolio analyses: one row per
+    GitHub account with an analysis in flight. The primary key makes
+    acquiring atomic on any database; expires_at lets another worker take
+    over from one that died mid-analysis.
+    """
+    key = models.CharField(max_length=150, primary_key=True)
+    token = models.CharField(max_length=32)
+    acquired_at = models.DateTimeField()
+    expires_at = models.DateTimeField()
+    
+    # Lease lifetime beyond the analysis budget (saving, scheduling, slow DB)
+    TTL_MARGIN_SECONDS = 60
+    POLL_SECONDS = 0.5
+    
+    def __str__(self):
+        return f"Analysis lease on {self.key}"
+    
+    @staticmethod
+    def key_for(user):
+        """Lease key: the GitHub account (shared by every user linking it), else the user"""
+        github_username = user.github_username()
+        return f'github:{github_username}' if github_username else f'user:{user.pk}'
+    
+    @classmethod
+    def acquire(cls, key, budget_seconds=None):
+        """Take the lease on key (or a stale one), returning its token - None if someone holds it"""
+        if budget_seconds is None:
+            budget_seconds = getattr(settings, 'PORTFOLIO_COMPLETION_BUDGET_SECONDS', 300)
+        token = uuid.uuid4().hex
+        now = timezone.now()
+        expires_at = now + timedelta(seconds=budget_seconds + cls.TTL_MARGIN_SECONDS)
+        
+        # Conditional UPDATE - only one of several workers racing for a stale lease wins
+        if cls.objects.filter(key=key, expires_at__lt=now).update(token=token, acquired_at=now, expires_at=expires_at):
+            return token
+        try:
+            with transaction.atomic():
+                cls.objects.create(key=key, token=token, acquired_at=now, expires_at=expires_at)
+            return token
+        except IntegrityError:
+            return None
+    
+    @classmethod
+    def release(cls, key, token):
+        """Release the lease if it's still ours (it may have expired and been taken over)"""
+        cls.objects.filter(key=key, token=token).delete()
+    
+    @classmethod
+    def wait(cls, key, budget):
+        """Block until nobody holds key; False if budget runs out first"""
+        while cls.objects.filter(key=key, expires_at__gte=timezone.now()).exists():
+            remaining = budget.remaining()
+            if remaining is not None and remaining <= cls.POLL_SECONDS:
+                return False
+            time.sleep(cls.POLL_SECONDS)
+        return True
+
+
+class Sequence(models.Model):
+    """
+    Named counters handed out in blocks (MySQL has no sequences). A worker
+    reserves a whole block with one compare-and-swap UPDATE and then counts
+    through it in memory - see ghost_ids.BlockAllocator.
+    """
+    name = models.CharField(max_length=50, primary_key=True)
+    next_value = models.BigIntegerField(default=0)
+    
+    def __str__(self):
+        return f"{self.name} @ {self.next_value}"
+    
+    @classmethod
+    def reserve(cls, name, size):
+        """Reserve size values from the named sequence, returning the first (creates it at 0)"""
+        while True:
+            current = cls.objects.filter(name=name).values_list('next_value', flat=True).first()
+            if current is None:
+                try:
+                    with transaction.atomic():
+                        cls.objects.create(name=name, next_value=size)
+                    return 0
+                except IntegrityError:
+                    continue  # Another worker created it first
+            
+            # Compare-and-swap: loses (and retries) only if another worker reserved in between
+            if cls.objects.filter(name=name, next_value=current).update(next_value=current + size):
+                return current
+
+
+class HighlightedCode(models.Model):
+    """Rendered syntax highlighting for a code snippet - the shared tier of haunted_profiles.highlighting"""
+    key = models.CharField(max_length=64, primary_key=True, help_text="sha256 of language + code")
+    language = models.CharField(max_length=50)
+    html = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    
+    def __str__(self):
+        return f"{self.language} snippet {self.key[:12]}"
+    
+    @classmethod
+    def prune(cls, max_rows=None):
+        """Delete all but the newest max_rows renderings (default HIGHLIGHT_DB_MAX_ROWS); returns how many went"""
+        if max_rows is None:
+            max_rows = getattr(settings, 'HIGHLIGHT_DB_MAX_ROWS', 50_000)
+        cutoff = cls.objects.order_by('-created_at').values_list('created_at', flat=True)[max_rows:max_rows + 1].first()
+        if cutoff is None:
+            return 0
+        deleted, _ = cls.objects.filter(created_at__lte=cutoff).delete()
+        return deleted
+
+
+class PortfolioHistory(models.Model):
+    """
+    Append-only history of portfolio analyses.
+    Every refresh keeps its tracked metrics as small columns; only the most
+    recent rows keep the full analysis, compressed in payload. Old rows are
+    thinned out by downsample() so each user's history stays bounded.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='portfolio_history')
+    captured_at = models.DateTimeField(default=timezone.now)
+    schema_version = models.PositiveSmallIntegerField(default=PAYLOAD_SCHEMA_VERSION)
+    payload = models.BinaryField(null=True, blank=True, help_text='zlib-compressed analysis (dropped when downsampled)')
+    
+    # Tracked metrics
+    public_repos = models.IntegerField(default=0)
+    total_stars = models.IntegerField(default=0)
+    human_code_percentage = models.SmallIntegerField(null=True, blank=True)
+    job_readiness = models.SmallIntegerField(null=True, blank=True)
+    overall_score = models.SmallIntegerField(default=0)
+    complexity = models.SmallIntegerField(null=True, blank=True)
+    skills = models.JSONField(default=list, blank=True)
+    
+    class Meta:
+        ordering = ['captured_at']
+        indexes = [
+            models.Index(fields=['user', 'captured_at']),
+        ]
+        verbose_name_plural = 'Portfolio histories'
+    
+    def __str__(self):
+        return f"Portfolio of {self.user_id} at {self.captured_at:%Y-%m-%d}"
+    
+    @classmethod
+    def record(cls, user, portfolio_data):
+        """Append a snapshot for this analysis and thin out the user's older history"""
+        entry = cls.objects.create(
+            user=user,
+            payload=encode_payload(portfolio_data),
+            **extract_metrics(portfolio_data),
+        )
+        cls.downsample(user)
+        return entry
+    
+    @classmethod
+    def downsample(cls, user, now=None):
+        """Apply the retention policy in portfolio_history.plan_downsample"""
+        has_payload = models.ExpressionWrapper(models.Q(payload__isnull=False), output_field=models.BooleanField())
+        rows = list(
+            cls.objects.filter(user=user).order_by('captured_at', 'id').values_list('id', 'captured_at', has_payload)
+        )
+        delete_ids, strip_ids = plan_downsample(rows, now or timezone.now())
+        if delete_ids:
+            cls.objects.filter(id__in=delete_ids).delete()
+        if strip_ids:
+            cls.objects.filter(id__in=strip_ids).update(payload=None)
+    
+    @property
+    def data(self):
+        """Full analysis for this snapshot, or None once it has been downsampled"""
+        if self.payload is None:
+            return None
+        return decode_payload(self.payload, self.schema_version)
 
 
 
@@ -144,9 +606,12 @@ class User(AbstractBaseUser, PermissionsMixin):
 
 class GhostCrew(models.Model):
     """A crew of max 5 developers for hackathons"""
+    MAX_MEMBERS = 5
+    
     name = models.CharField(max_length=100, help_text="Crew name (e.g., 'The Python Haunters')")
     created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='created_crews')
     members = models.ManyToManyField(User, related_name='crews', blank=True)
+    member_count = models.PositiveSmallIntegerField(default=0, help_text="Maintained by add_member() - don't add members directly")
     crew_bio = models.TextField(max_length=300, blank=True, help_text="What's your crew about?")
     hackathons_won = models.IntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -157,11 +622,39 @@ class GhostCrew(models.Model):
     def __str__(self):
         return self.name
     
-    def member_count(self):
-        return self.members.count()
-    
+    @property
     def is_full(self):
-        return self.members.count() >= 5
+        return self.member_count >= self.MAX_MEMBERS
+    
+    def add_member(self, user):
+        """
+        Join the crew without overflowing it. A seat is claimed with a single
+        conditional UPDATE (member_count < MAX_MEMBERS) - the row lock lasts
+        one statement, and concurrent joins can't both take the last seat.
+        The membership row is inserted afterwards; if the user turns out to
+        be a member already, the seat is given back.
+        
+        Returns: True if the user is (now) a member, False if the crew is full
+        """
+        Membership = GhostCrew.members.through
+        if Membership.objects.filter(ghostcrew_id=self.pk, user_id=user.pk).exists():
+            return True
+        
+        claimed = GhostCrew.objects.filter(pk=self.pk, member_count__lt=self.MAX_MEMBERS).update(
+            member_count=F('member_count') + 1
+        )
+        if not claimed:
+            return False
+        
+        try:
+            with transaction.atomic():
+                Membership.objects.create(ghostcrew_id=self.pk, user_id=user.pk)
+        except IntegrityError:
+            # A concurrent request added the same user first - give the seat back
+            GhostCrew.objects.filter(pk=self.pk).update(member_count=F('member_count') - 1)
+        
+        self.refresh_from_db(fields=['member_count'])
+        return True
 
 
 class CrewInvitation(models.Model):
@@ -205,6 +698,16 @@ class CrewMessage(models.Model):
 # THE GRAVEYARD MODELS (Roast Zone)
 # ============================================
 
+class GraveyardPostQuerySet(models.QuerySet):
+    def with_counts(self):
+        """Annotate chant totals so chant_count doesn't query per post"""
+        return self.annotate(chants_total=Count('chants', distinct=True))
+    
+    def hot(self):
+        """Hottest first - served straight off the (hot_score, id) index"""
+        return self.order_by('-hot_score', '-id')
+
+
 class GraveyardPost(models.Model):
     """A project post in The Graveyard to get roasted"""
     author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='graveyard_posts')
@@ -215,15 +718,48 @@ class GraveyardPost(models.Model):
     image = models.ImageField(upload_to='graveyard_posts/', blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     roast_score = models.IntegerField(default=0, help_text="How helpful are the roasts?")
+    hot_score = models.FloatField(default=0, help_text="Roast score decayed by age - see hot_score_for()")
+    
+    # Every HOT_DECAY_SECONDS of age is worth a 10x difference in roast score.
+    # Newer posts get a bigger time term instead of old ones losing points, so a
+    # post's score only changes when it's voted on and never needs a sweep.
+    HOT_DECAY_SECONDS = 45000
+    HOT_EPOCH = 1_700_000_000
+    
+    objects = GraveyardPostQuerySet.as_manager()
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-hot_score', '-id']),
+        ]
     
     def __str__(self):
         return f"{self.title} by {self.author.username}"
     
+    @classmethod
+    def age_term(cls, created_at):
+        return (created_at.timestamp() - cls.HOT_EPOCH) / cls.HOT_DECAY_SECONDS
+    
+    @classmethod
+    def hot_score_for(cls, roast_score, created_at):
+        return math.log10(max(roast_score, 1)) + cls.age_term(created_at)
+    
+    def save(self, *args, **kwargs):
+        if self._state.adding:
+            self.created_at = self.created_at or timezone.now()
+            self.hot_score = self.hot_score_for(self.roast_score, self.created_at)
+        super().save(*args, **kwargs)
+    
+    def refresh_hot_score(self):
+        """Recompute hot_score from the roast_score currently in the row"""
+        GraveyardPost.objects.filter(pk=self.pk).update(
+            hot_score=Log(10, Greatest(F('roast_score'), 1)) + Value(self.age_term(self.created_at))
+        )
+    
+    @property
     def chant_count(self):
-        return self.chants.count()
+        return _annotated_count(self, 'chants_total', 'chants')
 
 
 class GhostChant(models.Model):
@@ -237,9 +773,45 @@ class GhostChant(models.Model):
     
     class Meta:
         ordering = ['-upvotes', '-created_at']
+        indexes = [
+            models.Index(fields=['post', '-upvotes', '-created_at']),
+        ]
     
     def __str__(self):
         return f"Ghost Chant by {self.author.username} on {self.post.title}"
+    
+    def upvote(self, user):
+        """
+        Record user's vote, once. The counters are bumped with F() in the
+        database, so concurrent votes never overwrite each other.
+        
+        Returns: True if the vote counted, False if user had already voted
+        """
+        try:
+            with transaction.atomic():
+                ChantVote.objects.create(chant=self, voter=user)
+                GhostChant.objects.filter(pk=self.pk).update(upvotes=F('upvotes') + 1)
+                GraveyardPost.objects.filter(pk=self.post_id).update(roast_score=F('roast_score') + 1)
+                # Separate statement - reads the roast_score just written, under its row lock
+                self.post.refresh_hot_score()
+        except IntegrityError:
+            return False
+        
+        self.refresh_from_db(fields=['upvotes'])
+        return True
+
+
+class ChantVote(models.Model):
+    """One user's upvote on a Ghost Chant - the unique pair is what stops double voting"""
+    chant = models.ForeignKey(GhostChant, on_delete=models.CASCADE, related_name='votes')
+    voter = models.ForeignKey(User, on_delete=models.CASCADE, related_name='chant_votes')
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        unique_together = ('chant', 'voter')
+    
+    def __str__(self):
+        return f"{self.voter.username} upvoted chant {self.chant_id}"
 
 
 
@@ -247,6 +819,12 @@ class GhostChant(models.Model):
 # THE SUMMONING CIRCLE (Hiring/Jobs)
 # ============================================
 
+class SummoningPostQuerySet(models.QuerySet):
+    def with_counts(self):
+        """Annotate application totals so application_count doesn't query per job"""
+        return self.annotate(applications_total=Count('applications', distinct=True))
+
+
 class SummoningPost(models.Model):
     """A job posting in The Summoning Circle - NO DEGREE REQUIRED!"""
     company_name = models.CharField(max_length=200)
@@ -256,19 +834,124 @@ class SummoningPost(models.Model):
     required_skills = models.JSONField(default=list, help_text="Skills needed (e.g., Python, React)")
     location = models.CharField(max_length=200, help_text="Remote/City")
     salary_range = models.CharField(max_length=100, blank=True, help_text="e.g., $60k-$80k")
+    # Annual bounds parsed from salary_range on save, for search
+    salary_min = models.PositiveIntegerField(null=True, blank=True)
+    salary_max = models.PositiveIntegerField(null=True, blank=True)
     is_remote = models.BooleanField(default=True)
     no_degree_required = models.BooleanField(default=True, help_text="Self-taught devs welcome!")
     created_at = models.DateTimeField(auto_now_add=True)
     is_active = models.BooleanField(default=True)
     
+    objects = SummoningPostQuerySet.as_manager()
+    
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['is_active', 'location']),
+            models.Index(fields=['is_active', 'is_remote']),
+            models.Index(fields=['is_active', 'salary_max']),
+        ]
     
     def __str__(self):
         return f"{self.job_title} at {self.company_name}"
     
+    def save(self, *args, **kwargs):
+        self.salary_min, self.salary_max = parse_salary_range(self.salary_range)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'salary_range' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'salary_min', 'salary_max'}
+        super().save(*args, **kwargs)
+    
+    def sync_skills(self):
+        """Mirror required_skills into the JobSkill link table search filters on"""
+        names = {normalize_skill(skill) for skill in self.required_skills if skill.strip()}
+        with transaction.atomic():
+            self.skill_links.exclude(name__in=names).delete()
+            JobSkill.objects.bulk_create(
+                [JobSkill(job=self, name=name) for name in names], ignore_conflicts=True,
+            )
+    
+    @property
     def application_count(self):
-        return self.applications.count()
+        return _annotated_count(self, 'applications_total', 'applications')
+
+
+class JobSkill(models.Model):
+    """One normalized (lowercase) required skill of a job post - what skill search joins on"""
+    job = models.ForeignKey(SummoningPost, on_delete=models.CASCADE, related_name='skill_links')
+    name = models.CharField(max_length=50)
+    
+    class Meta:
+        unique_together = ['job', 'name']
+        indexes = [
+            models.Index(fields=['name', 'job']),
+        ]
+    
+    def __str__(self):
+        return f"{self.name} ({self.job_id})"
+
+
+# Applicant review orderings: sort key -> applicant card column (highest first)
+APPLICANT_SORTS = {
+    'recent': None,
+    'score': 'applicant__overall_score',
+    'human_code': 'applicant__human_code_percentage',
+    'readiness': 'applicant__job_readiness',
+}
+
+
+# GitHub's spelling of languages that title case gets wrong (keyed by normalize_skill)
+GITHUB_LANGUAGE_SPELLINGS = {
+    'javascript': 'JavaScript', 'typescript': 'TypeScript', 'coffeescript': 'CoffeeScript',
+    'powershell': 'PowerShell', 'objective-c': 'Objective-C', 'php': 'PHP', 'html': 'HTML', 'css': 'CSS',
+    'scss': 'SCSS', 'c++': 'C++', 'c#': 'C#', 'matlab': 'MATLAB', 'tex': 'TeX', 'hcl': 'HCL',
+    'plpgsql': 'PLpgSQL', 'tsql': 'TSQL', 'webassembly': 'WebAssembly', 'graphql': 'GraphQL',
+}
+
+
+class JobApplicationQuerySet(models.QuerySet):
+    def for_review(self, sort='recent', skill=''):
+        """
+        Applications joined to their applicants' card columns (one query),
+        ranked by sort, highest first. Applicants without an analysis rank
+        last. Ties are broken by id, so (rank, id) is a keyset cursor.
+        """
+        applications = self.select_related('applicant').only(
+            'id', 'job_id', 'cover_message', 'status', 'applied_at',
+            *[f'applicant__{field}' for field in CARD_FIELDS]
+        )
+        if skill:
+            applications = applications.filter(
+                Q(applicant__core_skills__iregex=skill_token_regex(skill)) | self._top_skill_filter(skill)
+            )
+        
+        column = APPLICANT_SORTS.get(sort)
+        rank = Coalesce(F(column), Value(-1)) if column else F('id')
+        return applications.annotate(rank=rank).order_by('-rank', '-id')
+    
+    def _top_skill_filter(self, skill):
+        """
+        Applicants whose top_skills list holds skill as one of its entries -
+        JSON containment where the database has it, else a match on a whole
+        quoted entry of the JSON text. GitHub spells languages its own way
+        ("JavaScript", "PHP"), so the usual spellings of skill are tried.
+        """
+        spellings = {skill, skill.title(), skill.upper(), GITHUB_LANGUAGE_SPELLINGS.get(normalize_skill(skill), skill)}
+        if connections[self.db].features.supports_json_field_contains:
+            query = Q()
+            for spelling in spellings:
+                query |= Q(applicant__top_skills__contains=[spelling])
+            return query
+        quoted = json.dumps(normalize_skill(skill))
+        return Q(applicant__top_skills__iregex=r'(^\[|,)\s*' + re.escape(quoted) + r'\s*(,|\]$)')
+    
+    def after(self, cursor):
+        """Rows after a review_cursor from a for_review() page (the first page for no/bad cursor)"""
+        try:
+            rank, pk = (int(part) for part in (cursor or '').split('_'))
+        except ValueError:
+            return self
+        return self.filter(Q(rank__lt=rank) | Q(rank=rank, id__lt=pk))
 
 
 class JobApplication(models.Model):
@@ -286,12 +969,19 @@ class JobApplication(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     applied_at = models.DateTimeField(auto_now_add=True)
     
+    objects = JobApplicationQuerySet.as_manager()
+    
     class Meta:
         unique_together = ['job', 'applicant']
         ordering = ['-applied_at']
     
     def __str__(self):
         return f"{self.applicant.username} haunting {self.job.job_title}"
+    
+    @property
+    def review_cursor(self):
+        """Keyset cursor for the page after this row (needs for_review())"""
+        return f'{self.rank}_{self.id}'
 
 
 
@@ -372,7 +1062,39 @@ class Notification(models.Model):
 # GHOST TRIALS - INVITATION-ONLY OPPORTUNITIES
 # ============================================
 
-class Opportunity(models.Model):
+FUNNEL_STAGES = ('invited', 'accepted', 'declined', 'submitted', 'rated')
+
+
+class FunnelCounters(models.Model):
+    """
+    Invite -> accept/decline -> submit -> rate counters. They're bumped as
+    things happen (record_funnel), never recounted, so dashboards read a
+    row instead of counting a company's invitations.
+    """
+    invited_count = models.PositiveIntegerField(default=0)
+    accepted_count = models.PositiveIntegerField(default=0)
+    declined_count = models.PositiveIntegerField(default=0)
+    submitted_count = models.PositiveIntegerField(default=0)
+    rated_count = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        abstract = True
+    
+    @classmethod
+    def bump(cls, lookup, stage, count=1):
+        """Add count to a stage of the row matching lookup, creating the row if needed"""
+        field = f'{stage}_count'
+        if cls.objects.filter(**lookup).update(**{field: F(field) + count}):
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.create(**lookup, **{field: count})
+        except IntegrityError:
+            # Created concurrently - it exists now
+            cls.objects.filter(**lookup).update(**{field: F(field) + count})
+
+
+class Opportunity(FunnelCounters):
     """Opportunities created by companies (Paid Trials, Internships, Skill Challenges)"""
     OPPORTUNITY_TYPES = [
         ('paid_trial', 'Paid Trial'),
@@ -414,15 +1136,6 @@ class Opportunity(models.Model):
     
     def __str__(self):
         return f"{self.title} ({self.get_opportunity_type_display()})"
-    
-    def invitation_count(self):
-        return self.invitations.count()
-    
-    def accepted_count(self):
-        return self.invitations.filter(status='accepted').count()
-    
-    def submission_count(self):
-        return Submission.objects.filter(invitation__opportunity=self).count()
 
 
 class Invitation(models.Model):
@@ -449,6 +1162,20 @@ class Invitation(models.Model):
     def has_submission(self):
         return hasattr(self, 'submission')
     
+    def respond(self, status):
+        """
+        Accept or decline a pending invitation. Conditional on it still being
+        pending, so a double submit can't count twice. Returns False if it
+        was already answered.
+        """
+        responded_at = timezone.now()
+        if not Invitation.objects.filter(pk=self.pk, status='pending').update(status=status, responded_at=responded_at):
+            return False
+        self.status = status
+        self.responded_at = responded_at
+        record_funnel(self.opportunity, status)
+        return True
+    
     def is_expired(self):
         """Check if invitation deadline has passed"""
         if self.opportunity.submission_deadline:
@@ -483,8 +1210,165 @@ class Submission(models.Model):
     def is_rated(self):
         return self.rating is not None
     
+    def rate(self, rating, feedback, public_feedback):
+        """Store the company's rating - once; returns False if it was already rated"""
+        rated_at = timezone.now()
+        rated = Submission.objects.filter(pk=self.pk, rating__isnull=True).update(
+            rating=rating, feedback=feedback, public_feedback=public_feedback, rated_at=rated_at,
+        )
+        if not rated:
+            return False
+        self.rating, self.feedback, self.public_feedback, self.rated_at = rating, feedback, public_feedback, rated_at
+        record_funnel(self.invitation.opportunity, 'rated')
+        return True
+    
     def star_display(self):
         """Return star rating as string (e.g., '⭐⭐⭐⭐⭐')"""
         if self.rating:
             return '⭐' * self.rating
         return 'Not rated yet'
+
+
+class SubmissionFingerprint(models.Model):
+    """MinHash signature of a submission's code - see haunted_profiles.similarity"""
+    submission = models.OneToOneField(Submission, on_delete=models.CASCADE, related_name='fingerprint')
+    signature = models.BinaryField()
+    shingle_count = models.PositiveIntegerField(default=0)
+    indexed_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"Fingerprint of submission {self.submission_id}"
+
+
+class SubmissionBucket(models.Model):
+    """One LSH band of a submission's signature - submissions sharing a key are near-duplicate candidates"""
+    opportunity = models.ForeignKey(Opportunity, on_delete=models.CASCADE, related_name='submission_buckets')
+    key = models.BigIntegerField()
+    submission = models.ForeignKey(Submission, on_delete=models.CASCADE, related_name='lsh_buckets')
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['opportunity', 'key']),
+        ]
+    
+    def __str__(self):
+        return f"Bucket {self.key} of submission {self.submission_id}"
+
+
+class CompanyFunnel(FunnelCounters):
+    """A company's all-time funnel totals across its opportunities"""
+    company = models.OneToOneField(User, on_delete=models.CASCADE, related_name='funnel')
+    
+    def __str__(self):
+        return f"Funnel of {self.company.username}"
+
+
+class CompanyFunnelDay(FunnelCounters):
+    """One day of a company's funnel, for the dashboard's history chart"""
+    company = models.ForeignKey(User, on_delete=models.CASCADE, related_name='funnel_days')
+    day = models.DateField()
+    
+    class Meta:
+        unique_together = ['company', 'day']
+        ordering = ['day']
+    
+    def __str__(self):
+        return f"Funnel of {self.company.username} on {self.day}"
+
+
+def record_funnel(opportunity, stage, count=1):
+    """Count funnel events on the opportunity, the company's totals and today's bucket"""
+    if count <= 0:
+        return
+    with transaction.atomic():
+        Opportunity.bump({'pk': opportunity.pk}, stage, count)
+        CompanyFunnel.bump({'company_id': opportunity.company_id}, stage, count)
+        CompanyFunnelDay.bump({'company_id': opportunity.company_id, 'day': timezone.localdate()}, stage, count)
+
+
+class Shortlist(models.Model):
+    """A company's shortlist of developers to invite to its next opportunity"""
+    company = models.OneToOneField(User, on_delete=models.CASCADE, related_name='shortlist')
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"Shortlist of {self.company.username}"
+    
+    @classmethod
+    def for_company(cls, company):
+        return cls.objects.get_or_create(company=company)[0]
+    
+    @staticmethod
+    def developers_for(company):
+        """Cards of a company's shortlisted developers (doesn't create a shortlist)"""
+        return User.objects.cards().filter(shortlist_entries__shortlist__company=company)
+    
+    @staticmethod
+    def count_for(company):
+        return ShortlistEntry.objects.filter(shortlist__company=company).count()
+    
+    def add(self, developer_ids):
+        """Shortlist developers in bulk - unknown ids, companies and duplicates are skipped"""
+        valid_ids = User.objects.filter(id__in=developer_ids, is_company=False).values_list('id', flat=True)
+        ShortlistEntry.objects.bulk_create(
+            [ShortlistEntry(shortlist=self, developer_id=developer_id) for developer_id in valid_ids],
+            ignore_conflicts=True,
+        )
+        self.save(update_fields=['updated_at'])
+    
+    def remove(self, developer_ids):
+        removed, _ = self.entries.filter(developer_id__in=developer_ids).delete()
+        return removed
+    
+    def clear(self):
+        self.entries.all().delete()
+    
+    def invite(self, opportunity, title, message):
+        """
+        Invite every shortlisted developer to opportunity, skipping anyone
+        already invited, and notify them. The number of queries doesn't grow
+        with the shortlist. Returns: number of invitations created
+        """
+        developer_ids = list(
+            self.entries.exclude(
+                developer_id__in=Invitation.objects.filter(opportunity=opportunity).values('developer_id')
+            ).values_list('developer_id', flat=True)
+        )
+        if not developer_ids:
+            return 0
+        
+        with transaction.atomic():
+            Invitation.objects.bulk_create(
+                [Invitation(opportunity=opportunity, developer_id=developer_id) for developer_id in developer_ids],
+                batch_size=500, ignore_conflicts=True,
+            )
+            # MySQL doesn't return ids from bulk inserts - read them back for the notifications
+            invitations = list(Invitation.objects.filter(
+                opportunity=opportunity, developer_id__in=developer_ids, notification__isnull=True,
+            ).values_list('id', 'developer_id'))
+            Notification.objects.bulk_create([
+                Notification(
+                    user_id=developer_id,
+                    notification_type='invitation_received',
+                    title=title,
+                    message=message,
+                    link='/my-invitations/',
+                    invitation_id=invitation_id,
+                )
+                for invitation_id, developer_id in invitations
+            ], batch_size=500)
+            record_funnel(opportunity, 'invited', len(invitations))
+        return len(invitations)
+
+
+class ShortlistEntry(models.Model):
+    shortlist = models.ForeignKey(Shortlist, on_delete=models.CASCADE, related_name='entries')
+    developer = models.ForeignKey(User, on_delete=models.CASCADE, related_name='shortlist_entries')
+    added_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        verbose_name_plural = 'Shortlist entries'
+        unique_together = ['shortlist', 'developer']
+    
+    def __str__(self):
+        return f"{self.developer.username} on {self.shortlist}"
@@ -2,15 +2,34 @@
 AI Portfolio Analyzer - Scrapes and analyzes GitHub, LinkedIn, Devpost
 Gen Z style - no boring bios, just REAL skills! 🔥
 """
-import requests
+from django.conf import settings
 from bs4 import BeautifulSoup
 import re
 from datetime import datetime
+from .analysis_pipeline import Pipeline, Stage, BudgetExhausted, current_budget
+from .circuit_breaker import SERVICE_NAMES, CircuitOpen, UpstreamUnavailable, guarded_get
+from .github_collector import collect_repos
+from .github_records import RepoRecord, CommitRecord, stream_records
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+def source_error(error):
+    """
+    Output for a fetch that raised - always marked partial, so it isn't
+    memoized and the fetch is retried later. Raised errors are transient
+    (the upstream is down, a stream broke off mid-page, JSON came back
+    truncated); failures that would repeat, like a profile that doesn't
+    exist, are returned by the sources as a plain {'error': ...} instead.
+    """
+    if isinstance(error, UpstreamUnavailable):
+        return {'error': f'{SERVICE_NAMES.get(error.service, error.service)} is unavailable right now', 'partial': True}
+    if isinstance(error, BudgetExhausted) or current_budget().expired:
+        return {'error': 'Analysis ran out of time', 'partial': True}
+    return {'error': str(error), 'partial': True}
+
+
 def detect_developer_domain(repos_data):
     """
     Detect what domain the developer works in (ML/CV, Web, Mobile, etc.)
@@ -28,16 +47,12 @@ def detect_developer_domain(repos_data):
     domain_scores = {domain: 0 for domain in domain_keywords}
     
     for repo in repos_data[:30]:
-        if repo.get('fork'):
+        if repo.fork:
             continue
         
-        repo_name = repo.get('name', '').lower()
-        repo_desc = (repo.get('description') or '').lower()
-        repo_text = f"{repo_name} {repo_desc}"
-        
         for domain, keywords in domain_keywords.items():
             for keyword in keywords:
-                if keyword in repo_text:
+                if keyword in repo.text:
                     domain_scores[domain] += 1
     
     # Get top domains
@@ -62,19 +77,15 @@ def analyze_code_complexity(repos_data, username):
     basic_keywords = ['todo', 'simple', 'basic', 'tutorial', 'practice', 'learning', 'test']
     
     for repo in repos_data[:20]:
-        if repo.get('fork'):
+        if repo.fork:
             continue
         
-        repo_name = repo.get('name', '').lower()
-        repo_desc = (repo.get('description') or '').lower()
-        repo_text = f"{repo_name} {repo_desc}"
-        
         # Check complexity
-        if any(kw in repo_text for kw in advanced_keywords):
+        if any(kw in repo.text for kw in advanced_keywords):
             complexity_indicators['advanced'] += 1
-        elif any(kw in repo_text for kw in intermediate_keywords):
+        elif any(kw in repo.text for kw in intermediate_keywords):
             complexity_indicators['intermediate'] += 1
-        elif any(kw in repo_text for kw in basic_keywords):
+        elif any(kw in repo.text for kw in basic_keywords):
             complexity_indicators['basic'] += 1
     
     total = sum(complexity_indicators.values())
@@ -90,7 +101,128 @@ def analyze_code_complexity(repos_data, username):
         return 'basic', complexity_indicators
 
 
-def analyze_ai_usage_patterns(repos_data, username, user_profile=None):
+# IMPROVED: Check for technical depth in commits
+TECHNICAL_COMMIT_TERMS = ['implement', 'refactor', 'optimize', 'debug', 'algorithm', 'model', 'train', 'architecture', 'pipeline', 'fix bug', 'improve performance']
+
+
+def score_commits(commits):
+    """
+    Human/AI indicators for one repo's commits (CommitRecords, newest first).
+    Consumes any iterable one commit at a time, so it works the same on 30
+    API commits or a streamed full `git log`.
+    
+    Returns: (ai_indicators, human_indicators, {signal: count})
+    """
+    ai_indicators = 0
+    human_indicators = 0
+    signal_counts = {}
+    commit_count = 0
+    recent_times = []
+    
+    def signal(name):
+        signal_counts[name] = signal_counts.get(name, 0) + 1
+    
+    # Analyze commit patterns
+    for commit in commits:
+        commit_count += 1
+        if commit_count <= 10:
+            recent_times.append(commit.date)
+        
+        msg_lower = commit.message_lower
+        
+        if any(term in msg_lower for term in TECHNICAL_COMMIT_TERMS):
+            human_indicators += 2  # Technical commits = human work
+            signal('technical_commits')
+        
+        # Generic messages (but less penalty for ML/CV devs)
+        elif any(phrase in msg_lower for phrase in ['initial commit', 'update', 'fix']) and len(commit.message) < 20:
+            ai_indicators += 1
+        
+        # Detailed commits
+        elif len(commit.message) > 30:
+            human_indicators += 1
+            signal('detailed_commits')
+    
+    # Iterative development
+    if commit_count > 10:
+        human_indicators += 3
+        signal('iterative_development')
+    
+    # Consistent activity
+    if len(set(recent_times)) > 5:
+        human_indicators += 2
+        signal('consistent_activity')
+    
+    return ai_indicators, human_indicators, signal_counts
+
+
+def merge_commit_signals(per_repo_scores):
+    """Combine score_commits results into the collect_commit_signals shape"""
+    merged = {'ai_indicators': 0, 'human_indicators': 0, 'signal_counts': {}}
+    for ai_indicators, human_indicators, signal_counts in per_repo_scores:
+        merged['ai_indicators'] += ai_indicators
+        merged['human_indicators'] += human_indicators
+        for name, count in signal_counts.items():
+            merged['signal_counts'][name] = merged['signal_counts'].get(name, 0) + count
+    return merged
+
+
+def fetch_repo_commit_scores(username, repo):
+    """score_commits over the last 30 commits from the REST API (None if unavailable)"""
+    try:
+        commits_url = f"https://api.github.com/repos/{username}/{repo.name}/commits?per_page=30"
+        commits_response = guarded_get('github', commits_url, budget=current_budget(), stream=True)
+        
+        if commits_response.status_code != 200:
+            return None
+        
+        return score_commits(stream_records(commits_response, CommitRecord))
+        
+    except (CircuitOpen, BudgetExhausted):
+        raise
+    except Exception as e:
+        logger.warning(f"Error analyzing commits for {repo.name}: {e}")
+        return None
+
+
+def collect_commit_signals(repos_data, username):
+    """
+    Fetch recent commits for up to 20 original repos and count the
+    human/AI indicators in them. This is the only part of the AI usage
+    analysis that talks to GitHub, so it's kept apart from the scoring.
+    
+    With GITHUB_COMMIT_BACKEND = 'git' the full history of local clones is
+    read instead (see git_backend.py).
+    
+    Returns: {'ai_indicators': 3, 'human_indicators': 41, 'signal_counts': {'technical_commits': 12, ...}}
+    plus 'partial': True if the time budget ran out before every repo was read
+    """
+    repos = [repo for repo in repos_data[:20] if not repo.fork]
+    budget = current_budget()
+    
+    use_git = getattr(settings, 'GITHUB_COMMIT_BACKEND', 'api') == 'git'
+    if use_git:
+        from .git_backend import local_repo_commit_scores
+    
+    scores = []
+    for repo in repos:
+        if budget.expired:
+            break
+        try:
+            score = local_repo_commit_scores(username, repo) if use_git else None
+            scores.append(score or fetch_repo_commit_scores(username, repo))
+        except (CircuitOpen, BudgetExhausted) as e:
+            # GitHub is down or we're out of time - the rest would fail the same way
+            logger.warning(f"Stopping commit analysis for {username}: {e}")
+            break
+    
+    signals = merge_commit_signals(score for score in scores if score is not None)
+    if len(scores) < len(repos) or budget.expired:
+        signals['partial'] = True
+    return signals
+
+
+def analyze_ai_usage_patterns(repos_data, username, user_profile=None, commit_signals=None):
     """
     ENHANCED: Analyze commit patterns with domain awareness, code complexity, and user self-description
     Returns: AI%, Human%, smart usage indicators, and clear explanations
@@ -100,6 +232,8 @@ def analyze_ai_usage_patterns(repos_data, username, user_profile=None):
         - core_skills: Their main skills
         - strengths: What they're good at
         - weaknesses: What they use AI help for
+    repos_data: RepoRecords, most recently updated first
+    commit_signals: Output of collect_commit_signals (fetched here if not given)
     """
     ai_indicators = 0
     human_indicators = 0
@@ -143,54 +277,13 @@ def analyze_ai_usage_patterns(repos_data, username, user_profile=None):
             domain_bonus += 1
             smart_usage_signals.append('self_aware')
     
-    for repo in repos_data[:20]:
-        if repo.get('fork'):
-            continue
-            
-        try:
-            commits_url = f"https://api.github.com/repos/{username}/{repo['name']}/commits?per_page=30"
-            commits_response = requests.get(commits_url)
-            
-            if commits_response.status_code != 200:
-                continue
-                
-            commits = commits_response.json()
-            commit_messages = [c.get('commit', {}).get('message', '') for c in commits]
-            commit_times = [c.get('commit', {}).get('author', {}).get('date', '') for c in commits]
-            
-            # Analyze commit patterns
-            for i, msg in enumerate(commit_messages):
-                msg_lower = msg.lower()
-                
-                # IMPROVED: Check for technical depth in commits
-                technical_terms = ['implement', 'refactor', 'optimize', 'debug', 'algorithm', 'model', 'train', 'architecture', 'pipeline', 'fix bug', 'improve performance']
-                
-                if any(term in msg_lower for term in technical_terms):
-                    human_indicators += 2  # Technical commits = human work
-                    smart_usage_signals.append('technical_commits')
-                
-                # Generic messages (but less penalty for ML/CV devs)
-                elif any(phrase in msg_lower for phrase in ['initial commit', 'update', 'fix']) and len(msg) < 20:
-                    ai_indicators += 1
-                
-                # Detailed commits
-                elif len(msg) > 30:
-                    human_indicators += 1
-                    smart_usage_signals.append('detailed_commits')
-            
-            # Iterative development
-            if len(commits) > 10:
-                human_indicators += 3
-                smart_usage_signals.append('iterative_development')
-            
-            # Consistent activity
-            if len(set(commit_times[:10])) > 5:
-                human_indicators += 2
-                smart_usage_signals.append('consistent_activity')
-            
-        except Exception as e:
-            logger.debug(f"Error analyzing commits for {repo['name']}: {e}")
-            continue
+    # Commit-history signals (fetched once per GitHub sync, see collect_commit_signals)
+    if commit_signals is None:
+        commit_signals = collect_commit_signals(repos_data, username)
+    ai_indicators += commit_signals['ai_indicators']
+    human_indicators += commit_signals['human_indicators']
+    for signal, count in commit_signals['signal_counts'].items():
+        smart_usage_signals.extend([signal] * count)
     
     # Apply domain bonus
     human_indicators += domain_bonus
@@ -263,86 +356,79 @@ def analyze_ai_usage_patterns(repos_data, username, user_profile=None):
     }
 
 
-def analyze_github(github_url, user_profile=None):
+def fetch_github(github_url):
     """
-    Scrape GitHub profile and analyze:
-    - Languages used (skills!)
-    - Unique/interesting projects
-    - Commit activity
-    - AI vs Human code ratio
-    - Smart AI usage patterns
-    
-    user_profile: Optional dict with user's self-description for smarter analysis
+    Fetch everything the GitHub analysis needs (profile, every repo page,
+    commit signals) without interpreting it. Independent of the user's
+    self-description, so its output can be reused when only that changes.
     """
     try:
         username = github_url.rstrip('/').split('/')[-1]
         api_url = f"https://api.github.com/users/{username}"
-        repos_url = f"https://api.github.com/users/{username}/repos?per_page=100&sort=updated"
         
         # Get user info
-        user_response = requests.get(api_url)
-        repos_response = requests.get(repos_url)
+        user_response = guarded_get('github', api_url, budget=current_budget())
         
         if user_response.status_code != 200:
             return {'error': 'GitHub profile not found'}
         
         user_data = user_response.json()
-        repos_data = repos_response.json() if repos_response.status_code == 200 else []
+        repos = collect_repos(username)
+        commit_signals = collect_commit_signals([RepoRecord(**repo) for repo in repos['repos']], username)
         
-        # Analyze languages (these become skills!)
-        languages = {}
-        total_stars = 0
-        total_forks = 0
-        unique_projects = []
-        
-        for repo in repos_data:
-            # Skip forks (we want original work!)
-            if repo.get('fork'):
-                continue
-                
-            # Count languages
-            if repo.get('language'):
-                lang = repo['language']
-                languages[lang] = languages.get(lang, 0) + 1
-            
-            total_stars += repo.get('stargazers_count', 0)
-            total_forks += repo.get('forks_count', 0)
-            
-            # Find unique/interesting projects
-            stars = repo.get('stargazers_count', 0)
-            has_description = bool(repo.get('description'))
-            is_recent = repo.get('updated_at', '')[:4] in ['2024', '2025']
-            
-            # Project is "unique" if it has stars, description, or is recent
-            if stars > 0 or (has_description and is_recent):
-                unique_projects.append({
-                    'name': repo['name'],
-                    'description': repo.get('description', 'No description'),
-                    'stars': stars,
-                    'language': repo.get('language', 'Unknown'),
-                    'url': repo['html_url'],
-                })
+        github_source = {
+            'username': user_data.get('login') or username,
+            'public_repos': user_data.get('public_repos', 0),
+            'followers': user_data.get('followers', 0),
+            **repos,
+            'commit_signals': commit_signals,
+        }
+        if repos.get('partial') or commit_signals.get('partial'):
+            github_source['partial'] = True
+        return github_source
         
-        # Sort unique projects by stars
-        unique_projects.sort(key=lambda x: x['stars'], reverse=True)
+    except Exception as e:
+        logger.error(f"Error fetching GitHub: {e}")
+        return source_error(e)
+
+
+def summarize_github(github_source, user_profile=None):
+    """
+    Analyze fetched GitHub data (see fetch_github):
+    - Languages used (skills!)
+    - Unique/interesting projects
+    - Commit activity
+    - AI vs Human code ratio
+    - Smart AI usage patterns
+    
+    user_profile: Optional dict with user's self-description for smarter analysis
+    """
+    if github_source.get('error'):
+        return {'error': github_source['error']}
+    
+    try:
+        username = github_source['username']
+        # Newest repos only - the totals below cover every page
+        repos_data = [RepoRecord(**repo) for repo in github_source['repos']]
+        languages = github_source['languages']
         
         # Extract skills from languages (top 5)
         skills = list(languages.keys())[:5] if languages else []
         
         # Analyze AI usage patterns with user profile
-        ai_analysis = analyze_ai_usage_patterns(repos_data, username, user_profile)
+        ai_analysis = analyze_ai_usage_patterns(repos_data, username, user_profile, github_source['commit_signals'])
         
         return {
             'username': username,
-            'public_repos': user_data.get('public_repos', 0),
-            'original_repos': len([r for r in repos_data if not r.get('fork')]),
-            'followers': user_data.get('followers', 0),
-            'total_stars': total_stars,
-            'total_forks': total_forks,
+            'public_repos': github_source.get('public_repos', 0),
+            'original_repos': github_source['original_repos'],
+            'followers': github_source.get('followers', 0),
+            'total_stars': github_source['total_stars'],
+            'total_forks': github_source['total_forks'],
             'languages': languages,
             'skills': skills,  # Top languages as skills
             'top_language': max(languages, key=languages.get) if languages else None,
-            'unique_projects': unique_projects[:5],  # Top 5 unique projects
+            'unique_projects': github_source['unique_projects'],  # Top 5 unique projects
             'ai_code_percentage': ai_analysis['ai_percentage'],
             'human_code_percentage': ai_analysis['human_percentage'],
             'ai_usage_summary': ai_analysis['usage_summary'],
@@ -358,6 +444,10 @@ def analyze_github(github_url, user_profile=None):
         return {'error': str(e)}
 
 
+def analyze_github(github_url, user_profile=None):
+    """Fetch and analyze a GitHub profile in one go"""
+    return summarize_github(fetch_github(github_url), user_profile)
+
 
 def analyze_devpost(devpost_url):
     """
@@ -368,7 +458,7 @@ def analyze_devpost(devpost_url):
     - Submission consistency
     """
     try:
-        response = requests.get(devpost_url)
+        response = guarded_get('devpost', devpost_url, budget=current_budget())
         if response.status_code != 200:
             return {'error': 'Devpost profile not found'}
         
@@ -392,7 +482,7 @@ def analyze_devpost(devpost_url):
         
     except Exception as e:
         logger.error(f"Error analyzing Devpost: {e}")
-        return {'error': str(e)}
+        return source_error(e)
 
 
 def analyze_linkedin(linkedin_url):
@@ -417,115 +507,201 @@ def analyze_linkedin(linkedin_url):
         return {'error': str(e)}
 
 
-def analyze_full_portfolio(github_url=None, linkedin_url=None, devpost_url=None, user_profile=None):
-    """
-    Analyze all profiles and generate comprehensive portfolio data
+# ============================================
+# ANALYSIS PIPELINE
+# ============================================
+# Each stage declares what it reads (see analysis_pipeline.Stage). Network
+# stages (sources) only depend on the profile URLs and are fetched
+# concurrently; the text stages list the exact self-description fields they
+# use, so editing one field only reruns the stages that read it.
+
+def github_source_stage(github_url):
+    return fetch_github(github_url) if github_url else {}
+
+
+def linkedin_stage(linkedin_url):
+    return analyze_linkedin(linkedin_url) if linkedin_url else {}
+
+
+def devpost_stage(devpost_url):
+    return analyze_devpost(devpost_url) if devpost_url else {}
+
+
+def github_stage(github_source, user_profile):
+    return summarize_github(github_source, user_profile) if github_source else {}
+
+
+def career_stage(github, user_profile):
+    """Career Assessment"""
+    if not github or github.get('error'):
+        return {}
     
-    user_profile: Optional dict with user's self-description for smarter analysis
-    """
-    portfolio = {
-        'analyzed_at': datetime.now().isoformat(),
-        'user_profile': user_profile or {},
-        'github': {},
-        'linkedin': {},
-        'devpost': {},
-        'career_assessment': {},
-        'job_readiness': {},
-        'skills_analysis': {},
-        'journey': {},
-        'overall_score': 0,
+    from .career_assessor import CareerAssessor
+    
+    assessor = CareerAssessor(github, user_profile)
+    return {
+        'career_assessment': assessor.assess_career_stage(),
+        'job_readiness': assessor.calculate_job_readiness(),
+        'skills_analysis': assessor.analyze_skill_proficiency(),
+    }
+
+
+def journey_stage(github, career, history, analysis_date, user_profile):
+    """Journey Extraction - past snapshots plus this analysis as the latest point"""
+    if not github or github.get('error'):
+        return {}
+    
+    from .journey_extractor import JourneyExtractor
+    from .portfolio_history import extract_metrics
+    
+    # overall_score isn't final yet, so it's left out of the trends
+    current_point = extract_metrics({'github': github, 'job_readiness': career.get('job_readiness')})
+    current_point.pop('overall_score')
+    current_point['date'] = analysis_date
+    
+    # A same-day re-analysis replaces that day's point rather than adding one
+    points = [point for point in (history or []) if point.get('date') != analysis_date]
+    
+    extractor = JourneyExtractor(github, user_profile, points + [current_point])
+    return {
+        'timeline': extractor.build_timeline(),
+        'key_milestones': extractor.detect_milestones(),
+        'growth_metrics': extractor.calculate_growth_metrics(),
+        'narrative': extractor.generate_narrative()
+    }
+
+
+def ai_usage_breakdown_stage(github, user_profile):
+    """AI Usage Breakdown (NEW!)"""
+    if not github or github.get('error'):
+        return {}
+    
+    from .ai_usage_categorizer import AIUsageCategorizer
+    from .breakdown_calculator import BreakdownCalculator
+    from .visualization_generator import VisualizationGenerator
+    from .messaging_engine import MessagingEngine
+    
+    categorizer = AIUsageCategorizer(user_profile, github)
+    categorized_data = {
+        'categories': categorizer.categorize_by_task_type(),
+        'core_vs_supporting': categorizer.identify_core_vs_supporting()
     }
     
-    # Analyze GitHub with user profile
-    if github_url:
-        portfolio['github'] = analyze_github(github_url, user_profile)
-        
-        # Only run advanced analysis if GitHub data is available
-        if not portfolio['github'].get('error'):
-            try:
-                # Import modules here to avoid circular imports
-                from .career_assessor import CareerAssessor
-                from .journey_extractor import JourneyExtractor
-                from .ai_usage_categorizer import AIUsageCategorizer
-                from .breakdown_calculator import BreakdownCalculator
-                from .visualization_generator import VisualizationGenerator
-                from .messaging_engine import MessagingEngine
-                
-                # Career Assessment
-                assessor = CareerAssessor(portfolio['github'], user_profile or {})
-                portfolio['career_assessment'] = assessor.assess_career_stage()
-                portfolio['job_readiness'] = assessor.calculate_job_readiness()
-                portfolio['skills_analysis'] = assessor.analyze_skill_proficiency()
-                
-                # Journey Extraction
-                extractor = JourneyExtractor(portfolio['github'], user_profile or {})
-                portfolio['journey'] = {
-                    'timeline': extractor.build_timeline(),
-                    'key_milestones': extractor.detect_milestones(),
-                    'growth_metrics': extractor.calculate_growth_metrics(),
-                    'narrative': extractor.generate_narrative()
-                }
-                
-                # AI Usage Breakdown (NEW!)
-                categorizer = AIUsageCategorizer(user_profile or {}, portfolio['github'])
-                categorized_data = {
-                    'categories': categorizer.categorize_by_task_type(),
-                    'core_vs_supporting': categorizer.identify_core_vs_supporting()
-                }
-                
-                calculator = BreakdownCalculator(categorized_data, user_profile or {})
-                breakdown_data = calculator.calculate_category_breakdown()
-                self_awareness = calculator.calculate_self_awareness_score()
-                
-                visualizer = VisualizationGenerator(breakdown_data)
-                stacked_bar_data = visualizer.generate_stacked_bar_data()
-                category_cards = visualizer.generate_category_cards()
-                employer_summary = visualizer.generate_employer_summary()
-                
-                messenger = MessagingEngine(breakdown_data, user_profile or {})
-                motivational_message = messenger.generate_motivational_message()
-                improvement_suggestions = messenger.generate_improvement_suggestions()
-                
-                portfolio['ai_usage_breakdown'] = {
-                    'overall': {
-                        'ai_percentage': portfolio['github'].get('ai_code_percentage', 50),
-                        'human_percentage': portfolio['github'].get('human_code_percentage', 50),
-                        'assessment': breakdown_data.get('overall_assessment', 'smart_ai_user')
-                    },
-                    'core_vs_supporting': categorized_data['core_vs_supporting'],
-                    'categories': breakdown_data.get('categories', []),
-                    'category_cards': category_cards,
-                    'stacked_bar_data': stacked_bar_data,
-                    'self_awareness': self_awareness,
-                    'employer_summary': employer_summary,
-                    'motivational_message': motivational_message,
-                    'improvement_suggestions': improvement_suggestions
-                }
-                
-            except Exception as e:
-                logger.error(f"Error in advanced analysis: {e}")
-    
-    # Analyze LinkedIn
-    if linkedin_url:
-        portfolio['linkedin'] = analyze_linkedin(linkedin_url)
-    
-    # Analyze Devpost
-    if devpost_url:
-        portfolio['devpost'] = analyze_devpost(devpost_url)
-    
-    # Calculate overall score
+    calculator = BreakdownCalculator(categorized_data, user_profile)
+    breakdown_data = calculator.calculate_category_breakdown()
+    self_awareness = calculator.calculate_self_awareness_score()
+    
+    visualizer = VisualizationGenerator(breakdown_data)
+    stacked_bar_data = visualizer.generate_stacked_bar_data()
+    category_cards = visualizer.generate_category_cards()
+    employer_summary = visualizer.generate_employer_summary()
+    
+    messenger = MessagingEngine(breakdown_data, user_profile)
+    motivational_message = messenger.generate_motivational_message()
+    improvement_suggestions = messenger.generate_improvement_suggestions()
+    
+    return {
+        'overall': {
+            'ai_percentage': github.get('ai_code_percentage', 50),
+            'human_percentage': github.get('human_code_percentage', 50),
+            'assessment': breakdown_data.get('overall_assessment', 'smart_ai_user')
+        },
+        'core_vs_supporting': categorized_data['core_vs_supporting'],
+        'categories': breakdown_data.get('categories', []),
+        'category_cards': category_cards,
+        'stacked_bar_data': stacked_bar_data,
+        'self_awareness': self_awareness,
+        'employer_summary': employer_summary,
+        'motivational_message': motivational_message,
+        'improvement_suggestions': improvement_suggestions
+    }
+
+
+def overall_score_stage(github, devpost, career):
+    """Calculate overall score"""
     score = 0
-    if portfolio['github'].get('public_repos', 0) > 0:
-        score += min(portfolio['github']['public_repos'] * 2, 50)
-    if portfolio['github'].get('total_stars', 0) > 0:
-        score += min(portfolio['github']['total_stars'] * 5, 30)
-    if portfolio['devpost'].get('wins', 0) > 0:
-        score += portfolio['devpost']['wins'] * 10
+    if github.get('public_repos', 0) > 0:
+        score += min(github['public_repos'] * 2, 50)
+    if github.get('total_stars', 0) > 0:
+        score += min(github['total_stars'] * 5, 30)
+    if devpost.get('wins', 0) > 0:
+        score += devpost['wins'] * 10
     
     # Use job readiness score if available
-    if portfolio['job_readiness'].get('overall_score'):
-        score = portfolio['job_readiness']['overall_score']
+    if (career.get('job_readiness') or {}).get('overall_score'):
+        score = career['job_readiness']['overall_score']
     
-    portfolio['overall_score'] = min(score, 100)
+    return min(score, 100)
+
+
+PORTFOLIO_PIPELINE = Pipeline(
+    inputs=('github_url', 'linkedin_url', 'devpost_url', 'history', 'analysis_date'),
+    stages=[
+        Stage('github_source', github_source_stage, inputs=['github_url'], network=True, version=2),
+        Stage('linkedin', linkedin_stage, inputs=['linkedin_url'], network=True),
+        Stage('devpost', devpost_stage, inputs=['devpost_url'], network=True),
+        Stage('github', github_stage, inputs=['github_source'],
+              profile_fields=['developer_role', 'core_skills', 'weaknesses']),
+        Stage('career', career_stage, inputs=['github'],
+              profile_fields=['core_skills', 'expertise_area']),
+        Stage('journey', journey_stage, inputs=['github', 'career', 'history', 'analysis_date'],
+              profile_fields=['learning_journey', 'ai_usage_context']),
+        Stage('ai_usage_breakdown', ai_usage_breakdown_stage, inputs=['github'],
+              profile_fields=['developer_role', 'core_skills', 'weaknesses', 'expertise_area',
+                              'expertise_details', 'non_expertise_areas', 'ai_usage_context']),
+        Stage('overall_score', overall_score_stage, inputs=['github', 'devpost', 'career'], default=0),
+    ],
+)
+
+
+def analyze_full_portfolio(github_url=None, linkedin_url=None, devpost_url=None, user_profile=None, history=None,
+                           memo=None, refresh=False, offline=False, budget=None):
+    """
+    Analyze all profiles and generate comprehensive portfolio data
     
-    return portfolio
+    user_profile: Optional dict with user's self-description for smarter analysis
+    history: Optional metric points from earlier analyses (User.get_metric_history)
+             used to measure growth instead of estimating it
+    memo: Optional stage memo from the last run (AnalysisStageResult.load_memo),
+          updated in place - stages whose inputs are unchanged are reused
+    refresh: Re-fetch GitHub/LinkedIn/Devpost even if the URLs haven't changed
+             (True, or the names of the source stages to re-fetch)
+    offline: Raise StageUnavailable rather than fetching anything
+    budget: Optional seconds the whole analysis may take. Every stage and
+            GitHub/Devpost request draws from it; when it runs out, the
+            sections done so far are returned, unfinished ones are marked
+            'partial': True, and so is the portfolio itself
+    
+    GitHub, LinkedIn and Devpost are fetched in parallel within
+    PORTFOLIO_SOURCE_DEADLINE_SECONDS (or what's left of the budget);
+    per-source status and latency are reported under
+    portfolio['pipeline']['sources'], skipped stages under
+    portfolio['pipeline']['skipped'].
+    """
+    analyzed_at = datetime.now()
+    outputs, report = PORTFOLIO_PIPELINE.run({
+        'github_url': github_url,
+        'linkedin_url': linkedin_url,
+        'devpost_url': devpost_url,
+        'history': history or [],
+        'analysis_date': analyzed_at.date().isoformat(),
+        'user_profile': user_profile or {},
+    }, memo=memo, refresh=refresh, offline=offline, budget=budget,
+        source_deadline=getattr(settings, 'PORTFOLIO_SOURCE_DEADLINE_SECONDS', 30))
+    
+    career = outputs['career']
+    return {
+        'analyzed_at': analyzed_at.isoformat(),
+        'user_profile': user_profile or {},
+        'github': outputs['github'],
+        'linkedin': outputs['linkedin'],
+        'devpost': outputs['devpost'],
+        'career_assessment': career.get('career_assessment', {}),
+        'job_readiness': career.get('job_readiness', {}),
+        'skills_analysis': career.get('skills_analysis', {}),
+        'journey': outputs['journey'],
+        'ai_usage_breakdown': outputs['ai_usage_breakdown'],
+        'overall_score': outputs['overall_score'],
+        'partial': report['partial'],
+        'pipeline': report,
+    }
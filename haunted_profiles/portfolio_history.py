@@ -0,0 +1,160 @@
+"""
+Portfolio History Module
+Compact storage helpers for the append-only portfolio analysis history:
+versioned zlib-compressed payloads, the numeric metrics tracked per refresh
+and the downsampling policy that keeps each user's history bounded
+"""
+from django.conf import settings
+from datetime import timedelta
+import json
+import zlib
+import logging
+
+try:
+    import msgpack
+except ImportError:  # Optional - payloads fall back to compressed JSON
+    msgpack = None
+
+logger = logging.getLogger(__name__)
+
+# Bump when the shape of the stored analysis changes and register an
+# upgrade function in PAYLOAD_UPGRADES so old rows still decode
+PAYLOAD_SCHEMA_VERSION = 1
+
+# First payload byte says how the rest was serialized before compression
+CODEC_JSON = b'J'
+CODEC_MSGPACK = b'M'
+
+# {from_version: function(data) -> data at from_version + 1}
+PAYLOAD_UPGRADES = {}
+
+# Numeric metrics tracked for every refresh (stored as plain columns)
+METRIC_FIELDS = [
+    'public_repos', 'total_stars', 'human_code_percentage',
+    'job_readiness', 'overall_score', 'complexity',
+]
+
+COMPLEXITY_SCORES = {'basic': 5, 'intermediate': 7, 'advanced': 9}
+
+
+# ============================================
+# PAYLOAD ENCODING
+# ============================================
+
+def encode_payload(data):
+    """Serialize an analysis dict to compressed bytes (msgpack when installed)"""
+    if msgpack is not None:
+        raw = CODEC_MSGPACK + msgpack.packb(data, use_bin_type=True, default=str)
+    else:
+        raw = CODEC_JSON + json.dumps(data, separators=(',', ':'), default=str).encode('utf-8')
+    return zlib.compress(raw, 9)
+
+
+def decode_payload(payload, schema_version=PAYLOAD_SCHEMA_VERSION):
+    """Decompress a stored payload and upgrade it to the current schema"""
+    raw = zlib.decompress(bytes(payload))
+    codec, body = raw[:1], raw[1:]
+
+    if codec == CODEC_MSGPACK:
+        if msgpack is None:
+            raise ValueError('Payload was stored with msgpack, which is not installed')
+        data = msgpack.unpackb(body, raw=False)
+    elif codec == CODEC_JSON:
+        data = json.loads(body.decode('utf-8'))
+    else:
+        raise ValueError(f'Unknown portfolio payload codec: {codec!r}')
+
+    version = schema_version
+    while version < PAYLOAD_SCHEMA_VERSION:
+        data = PAYLOAD_UPGRADES[version](data)
+        version += 1
+    return data
+
+
+# ============================================
+# METRICS
+# ============================================
+
+def extract_metrics(portfolio_data):
+    """Pull the tracked numbers (and skill list) out of a full analysis dict"""
+    github = portfolio_data.get('github') or {}
+    readiness = (portfolio_data.get('job_readiness') or {}).get('overall_score')
+
+    return {
+        'public_repos': github.get('public_repos', 0) or 0,
+        'total_stars': github.get('total_stars', 0) or 0,
+        'human_code_percentage': github.get('human_code_percentage'),
+        'job_readiness': readiness,
+        'overall_score': portfolio_data.get('overall_score', 0) or 0,
+        'complexity': COMPLEXITY_SCORES.get(github.get('complexity_level')),
+        'skills': list(github.get('skills') or []),
+    }
+
+
+def metric_deltas(points):
+    """Change in each tracked metric between the first and last point"""
+    if len(points) < 2:
+        return {}
+
+    first, last = points[0], points[-1]
+    deltas = {}
+    for field in METRIC_FIELDS:
+        if first.get(field) is not None and last.get(field) is not None:
+            deltas[field] = last[field] - first[field]
+    return deltas
+
+
+# ============================================
+# DOWNSAMPLING
+# ============================================
+
+def _bucket(captured_at, now):
+    """Retention bucket: one point per day recently, per week, then per month"""
+    daily_days = getattr(settings, 'PORTFOLIO_HISTORY_DAILY_DAYS', 30)
+    weekly_days = getattr(settings, 'PORTFOLIO_HISTORY_WEEKLY_DAYS', 365)
+    age = now - captured_at
+
+    if age <= timedelta(days=daily_days):
+        return ('day', captured_at.date())
+    if age <= timedelta(days=weekly_days):
+        return ('week',) + tuple(captured_at.isocalendar()[:2])
+    return ('month', captured_at.year, captured_at.month)
+
+
+def plan_downsample(rows, now):
+    """
+    Decide which history rows to drop and which lose their full payload.
+
+    Args:
+        rows: [(id, captured_at, has_payload), ...] oldest first
+        now: current datetime
+
+    Returns: (ids_to_delete, ids_to_strip_payload)
+
+    The first row is always kept so trends stay anchored to where the
+    developer started; within each bucket the newest row wins.
+    """
+    if not rows:
+        return [], []
+
+    max_points = getattr(settings, 'PORTFOLIO_HISTORY_MAX_POINTS', 120)
+    full_payloads = getattr(settings, 'PORTFOLIO_HISTORY_FULL_PAYLOADS', 3)
+
+    newest_in_bucket = {}
+    for row_id, captured_at, _ in rows[1:]:
+        newest_in_bucket[_bucket(captured_at, now)] = row_id
+
+    bucket_winners = set(newest_in_bucket.values())
+    keep = [rows[0][0]] + [row_id for row_id, _, _ in rows[1:] if row_id in bucket_winners]
+    if len(keep) > max_points:
+        keep = keep[:1] + keep[len(keep) - max_points + 1:]
+
+    keep_set = set(keep)
+    delete_ids = [row_id for row_id, _, _ in rows if row_id not in keep_set]
+
+    payload_ids = set(keep[-full_payloads:]) if full_payloads else set()
+    strip_ids = [
+        row_id for row_id, _, has_payload in rows
+        if has_payload and row_id in keep_set and row_id not in payload_ids
+    ]
+    return delete_ids, strip_ids
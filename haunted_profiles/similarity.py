@@ -0,0 +1,238 @@
+"""
+Submission Similarity
+Flags near-duplicate submissions to the same opportunity without comparing
+every pair.
+
+At submit time a submission's code (code_text plus the text in its upload)
+is cut into overlapping token shingles and reduced to a MinHash signature
+of NUM_PERM slots; the share of equal slots between two signatures
+estimates the Jaccard similarity of their shingle sets. It's a
+one-permutation MinHash: each shingle is hashed once and only competes for
+the minimum of the slot its hash falls in, so a signature costs one pass
+over the shingles instead of NUM_PERM (empty slots borrow from the next
+filled one). The signature is split into BANDS bands of ROWS_PER_BAND
+slots and each band is hashed to a bucket key (LSH). Two submissions share
+at least one bucket with probability 1 - (1 - s^ROWS_PER_BAND)^BANDS: with
+16 bands of 8 that's ~95% at the default 0.8 threshold, >99.9% at 0.9,
+~61% at 0.7 and ~6% at 0.5 - so a pair right at the threshold is
+occasionally missed, and dissimilar ones rarely become candidates.
+
+Finding the near-duplicates of a submission is one indexed lookup of its
+BANDS keys within the opportunity plus a signature comparison for each
+candidate - independent of how many submissions there are.
+
+Changing NUM_PERM, BANDS, SHINGLE_SIZE or the tokenizer changes every
+signature: re-run `python manage.py index_submissions --all` afterwards.
+"""
+from django.conf import settings
+from django.db import transaction
+import hashlib
+import re
+import struct
+import zipfile
+import zlib
+import logging
+
+logger = logging.getLogger(__name__)
+
+SHINGLE_SIZE = 5
+NUM_PERM = 128
+BANDS = 16
+ROWS_PER_BAND = NUM_PERM // BANDS
+
+# Slot values are the hash bits above the slot number; a borrowed value is
+# tagged with how far it was borrowed from (above those bits)
+SLOT_BITS = (NUM_PERM - 1).bit_length()
+VALUE_BITS = 64 - SLOT_BITS
+
+SIGNATURE_FORMAT = f'<{NUM_PERM}Q'
+
+_TOKEN = re.compile(r'\w+|[^\w\s]')
+
+# What reading an upload or one of its zip members can raise: encrypted
+# members (RuntimeError), unsupported compression (NotImplementedError),
+# corrupt or truncated data (BadZipFile, zlib.error, EOFError)
+UNREADABLE_ZIP_ERRORS = (OSError, EOFError, RuntimeError, NotImplementedError, zipfile.BadZipFile, zlib.error)
+
+
+# ============================================
+# MINHASH / LSH
+# ============================================
+
+def shingle_hashes(text):
+    """64-bit hashes of the distinct SHINGLE_SIZE-token shingles of text (lowercased, whitespace ignored)"""
+    tokens = _TOKEN.findall(text.lower())
+    if not tokens:
+        return set()
+    if len(tokens) < SHINGLE_SIZE:
+        tokens += [''] * (SHINGLE_SIZE - len(tokens))
+
+    hashes = set()
+    for i in range(len(tokens) - SHINGLE_SIZE + 1):
+        shingle = '\x1f'.join(tokens[i:i + SHINGLE_SIZE]).encode()
+        hashes.add(int.from_bytes(hashlib.blake2b(shingle, digest_size=8).digest(), 'little'))
+    return hashes
+
+
+def minhash(hashes):
+    """One-permutation MinHash signature (NUM_PERM ints) of a non-empty set of shingle hashes"""
+    slots = [None] * NUM_PERM
+    for h in hashes:
+        slot, value = h % NUM_PERM, h >> SLOT_BITS
+        current = slots[slot]
+        if current is None or value < current:
+            slots[slot] = value
+
+    # Densify: an empty slot takes the next filled slot's value, tagged with the distance
+    signature = list(slots)
+    for slot in range(NUM_PERM):
+        if slots[slot] is None:
+            distance = 1
+            while slots[(slot + distance) % NUM_PERM] is None:
+                distance += 1
+            signature[slot] = slots[(slot + distance) % NUM_PERM] | (distance << VALUE_BITS)
+    return signature
+
+
+def band_keys(signature):
+    """One signed 64-bit bucket key per band (the band number is part of the key)"""
+    keys = []
+    for band in range(BANDS):
+        rows = signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]
+        digest = hashlib.blake2b(struct.pack(f'<H{ROWS_PER_BAND}Q', band, *rows), digest_size=8).digest()
+        keys.append(int.from_bytes(digest, 'little', signed=True))
+    return keys
+
+
+def estimate_similarity(signature_a, signature_b):
+    """Estimated Jaccard similarity: the share of signature slots that agree"""
+    return sum(a == b for a, b in zip(signature_a, signature_b)) / NUM_PERM
+
+
+def pack_signature(signature):
+    return struct.pack(SIGNATURE_FORMAT, *signature)
+
+
+def unpack_signature(data):
+    return struct.unpack(SIGNATURE_FORMAT, bytes(data))
+
+
+# ============================================
+# SUBMISSIONS
+# ============================================
+
+def submission_text(submission):
+    """
+    code_text plus the text of the uploaded file (or of a zip's members), up
+    to SIMILARITY_MAX_BYTES. A file that can't be read contributes nothing.
+    """
+    max_bytes = getattr(settings, 'SIMILARITY_MAX_BYTES', 256 * 1024)
+    parts = [submission.code_text or '']
+
+    if submission.files:
+        try:
+            with submission.files.open('rb') as upload:
+                # Any size of zip is opened - only what's decompressed from it is capped
+                if zipfile.is_zipfile(upload):
+                    data = _zip_text(upload, max_bytes)
+                else:
+                    upload.seek(0)
+                    data = upload.read(max_bytes)
+            parts.append(data.decode('utf-8', errors='ignore'))
+        except UNREADABLE_ZIP_ERRORS as e:
+            logger.warning(f"Could not read files of submission {submission.pk}: {e}")
+
+    return '\n'.join(parts)
+
+
+def _zip_text(upload, max_bytes):
+    """
+    Concatenated text members of a zip archive, capped at max_bytes. Binary
+    members are skipped, and so are ones that can't be read (encrypted,
+    unsupported compression, corrupt data).
+    """
+    chunks = []
+    remaining = max_bytes
+    with zipfile.ZipFile(upload) as archive:
+        for member in sorted(archive.infolist(), key=lambda info: info.filename):
+            if member.is_dir() or remaining <= 0:
+                continue
+            try:
+                with archive.open(member) as f:
+                    chunk = f.read(remaining)
+            except UNREADABLE_ZIP_ERRORS as e:
+                logger.debug(f"Skipping zip member {member.filename}: {e}")
+                continue
+            if b'\0' in chunk:
+                continue
+            chunks.append(chunk)
+            remaining -= len(chunk)
+    return b'\n'.join(chunks)
+
+
+def index_submission(submission):
+    """
+    Store the submission's signature and LSH buckets (replacing any old ones).
+
+    Returns: the signature, or None if there's no text to fingerprint
+    """
+    from .models import SubmissionBucket, SubmissionFingerprint
+
+    hashes = shingle_hashes(submission_text(submission))
+    signature = minhash(hashes) if hashes else None
+    opportunity_id = submission.invitation.opportunity_id
+
+    with transaction.atomic():
+        SubmissionBucket.objects.filter(submission=submission).delete()
+        if signature is None:
+            SubmissionFingerprint.objects.filter(submission=submission).delete()
+            return None
+        SubmissionFingerprint.objects.update_or_create(
+            submission=submission,
+            defaults={'signature': pack_signature(signature), 'shingle_count': len(hashes)},
+        )
+        SubmissionBucket.objects.bulk_create([
+            SubmissionBucket(opportunity_id=opportunity_id, key=key, submission=submission)
+            for key in band_keys(signature)
+        ])
+    return signature
+
+
+def find_near_duplicates(submission, threshold=None):
+    """
+    Other submissions to the same opportunity whose estimated similarity is
+    at least threshold (default SIMILARITY_THRESHOLD), most similar first.
+    Indexes the submission first if it hasn't been.
+
+    Returns: [(submission, similarity)]
+    """
+    from .models import Submission, SubmissionBucket, SubmissionFingerprint
+
+    if threshold is None:
+        threshold = getattr(settings, 'SIMILARITY_THRESHOLD', 0.8)
+
+    fingerprint = SubmissionFingerprint.objects.filter(submission=submission).first()
+    if fingerprint is not None:
+        signature = unpack_signature(fingerprint.signature)
+    else:
+        signature = index_submission(submission)
+        if signature is None:
+            return []
+
+    candidate_ids = (
+        SubmissionBucket.objects.filter(
+            opportunity_id=submission.invitation.opportunity_id, key__in=band_keys(signature),
+        )
+        .exclude(submission=submission)
+        .values('submission_id')
+    )
+    similarities = {}
+    for other_id, other_signature in SubmissionFingerprint.objects.filter(
+        submission_id__in=candidate_ids
+    ).values_list('submission_id', 'signature'):
+        similarity = estimate_similarity(signature, unpack_signature(other_signature))
+        if similarity >= threshold:
+            similarities[other_id] = similarity
+
+    matches = Submission.objects.filter(id__in=similarities).select_related('invitation__developer')
+    return sorted(((match, similarities[match.id]) for match in matches), key=lambda pair: -pair[1])
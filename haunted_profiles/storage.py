@@ -0,0 +1,126 @@
+"""
+Static Files Storage
+collectstatic backend that adds content-hashed names (far-future cacheable),
+WebP copies of theme images and pre-compressed gzip/brotli files
+"""
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+from PIL import Image, features
+import gzip
+import io
+import os
+import logging
+
+try:
+    import brotli
+except ImportError:  # Optional - gzip copies are still produced without it
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+WEBP_SOURCE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.svg', '.html', '.txt', '.json', '.map')
+
+
+class OptimizedStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    ManifestStaticFilesStorage plus build-time asset optimization.
+
+    After the usual hashing pass, every PNG/JPEG gets a resized WebP sibling
+    registered in the manifest (so {% static 'images/x.webp' %} resolves to
+    the hashed file), and text assets get .gz/.br copies next to the hashed
+    file for web servers that serve pre-compressed files (nginx gzip_static).
+    """
+
+    # Names missing from the manifest are hashed on the fly from the collected file
+    manifest_strict = False
+
+    def stored_name(self, name):
+        """Hashed name for {% static %} - the unhashed name if the file doesn't exist, rather than a 500"""
+        try:
+            return super().stored_name(name)
+        except ValueError as e:
+            logger.warning(f"Static file left unhashed: {e}")
+            return name
+
+    def url_converter(self, name, hashed_files, template=None):
+        """Leave CSS url() references to missing files untouched instead of aborting collectstatic"""
+        converter = super().url_converter(name, hashed_files, template)
+
+        def tolerant_converter(matchobj):
+            try:
+                return converter(matchobj)
+            except ValueError as e:
+                logger.warning(f"Static reference left unhashed in {name}: {e}")
+                return matchobj.group(0)
+
+        return tolerant_converter
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+
+        if dry_run:
+            return
+
+        for name, hashed_name in list(self.hashed_files.items()):
+            ext = os.path.splitext(name)[1].lower()
+
+            if ext in WEBP_SOURCE_EXTENSIONS:
+                webp = self._make_webp(name, hashed_name)
+                if webp:
+                    yield webp[0], webp[1], True
+
+            if ext in COMPRESSIBLE_EXTENSIONS:
+                self._precompress(hashed_name)
+
+        # Re-save so the WebP entries are part of the manifest
+        self.save_manifest()
+
+    def _make_webp(self, name, hashed_name):
+        """Write a WebP copy (capped at STATIC_WEBP_MAX_WIDTH) and register it in the manifest"""
+        if not features.check('webp'):
+            return None
+
+        max_width = getattr(settings, 'STATIC_WEBP_MAX_WIDTH', 512)
+        webp_name = os.path.splitext(name)[0] + '.webp'
+
+        try:
+            with self.open(hashed_name) as f:
+                with Image.open(f) as img:
+                    img.load()
+                    mode = 'RGBA' if img.mode in ('RGBA', 'LA', 'P') else 'RGB'
+                    img = img.convert(mode)
+
+            img.thumbnail((max_width, max_width), Image.LANCZOS)
+            buf = io.BytesIO()
+            img.save(buf, 'WEBP', quality=80, method=6)
+            content = ContentFile(buf.getvalue())
+
+            webp_hashed = self.hashed_name(webp_name, content)
+            if self.exists(webp_hashed):
+                self.delete(webp_hashed)
+            self._save(webp_hashed, content)
+            self.hashed_files[self.hash_key(webp_name)] = webp_hashed
+            return webp_name, webp_hashed
+
+        except Exception as e:
+            logger.warning(f"Could not build WebP for {name}: {e}")
+            return None
+
+    def _precompress(self, hashed_name):
+        """Write .gz (and .br when brotli is installed) copies if they're smaller"""
+        with self.open(hashed_name) as f:
+            data = f.read()
+
+        variants = [('.gz', gzip.compress(data, compresslevel=9, mtime=0))]
+        if brotli is not None:
+            variants.append(('.br', brotli.compress(data, quality=11)))
+
+        for suffix, compressed in variants:
+            if len(compressed) >= len(data):
+                continue
+            target = hashed_name + suffix
+            if self.exists(target):
+                self.delete(target)
+            self._save(target, ContentFile(compressed))
@@ -0,0 +1,79 @@
+"""
+Template tags for responsive image variants
+
+Usage:
+    {% load ghost_images %}
+    {% ghost_image dev.ghost_avatar 120 alt=dev.username class="dev-avatar" %}
+    <img src="{{ dev.ghost_avatar.url }}" srcset="{% image_srcset dev.ghost_avatar %}" sizes="50px">
+    {% static_picture 'images/ghost_3.png' class="floating-ghost top-right" alt="" %}
+"""
+from django import template
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+import os
+from ..image_variants import get_variant_urls
+
+register = template.Library()
+
+
+@register.simple_tag
+def image_srcset(field_file):
+    """Emit a srcset value ("url 48w, url 128w, ...") or an empty string"""
+    urls = get_variant_urls(field_file)
+    return format_html_join(', ', '{} {}w', ((url, width) for width, url in sorted(urls.items())))
+
+
+@register.simple_tag
+def ghost_image(field_file, display_size, **attrs):
+    """
+    Render an <img> for an avatar/upload using the smallest variant that covers
+    display_size (CSS px), with a srcset so hi-DPI screens can pick a larger one.
+    Falls back to the original file when no variants are available.
+    """
+    if not field_file:
+        return ''
+
+    urls = get_variant_urls(field_file)
+    display_size = int(display_size)
+
+    if urls:
+        fitting = [width for width in sorted(urls) if width >= display_size]
+        src = urls[fitting[0] if fitting else max(urls)]
+        srcset = image_srcset(field_file)
+    else:
+        src = field_file.url
+        srcset = ''
+
+    extra = format_html_join('', ' {}="{}"', attrs.items())
+    if srcset:
+        return format_html(
+            '<img src="{}" srcset="{}" sizes="{}px" loading="lazy"{}>',
+            src, srcset, display_size, extra
+        )
+    return format_html(
+        '<img src="{}" loading="lazy"{}>',
+        src, extra
+    )
+
+
+@register.simple_tag
+def static_picture(path, **attrs):
+    """
+    Render a theme image as <picture> with the WebP copy built by collectstatic
+    (see storage.OptimizedStaticFilesStorage), falling back to a plain <img>
+    in development where only the original file exists.
+    """
+    extra = format_html_join('', ' {}="{}"', attrs.items())
+    img = format_html('<img src="{}"{}>', static(path), extra)
+
+    webp_path = os.path.splitext(path)[0] + '.webp'
+    hashed_files = getattr(staticfiles_storage, 'hashed_files', {})
+    if settings.DEBUG or webp_path not in hashed_files:
+        return img
+
+    return format_html(
+        '<picture><source type="image/webp" srcset="{}">{}</picture>',
+        static(webp_path), img
+    )
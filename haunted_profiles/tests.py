@@ -1,3 +1,832 @@
-from django.test import TestCase
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.http import QueryDict
+from django.templatetags.static import static
+from django.test import Client, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.db import OperationalError, connection
+from django.apps import apps
+from ghosthire import db_router
+from types import SimpleNamespace
+from unittest import mock
+from .analysis_pipeline import Budget, BudgetExhausted, Pipeline, Stage, _current_budget
+from .highlighting import highlight_many, memory_cache
+from .models import AnalysisLease, AnalysisStageResult, CrewInvitation, GhostChant, GhostCrew, GraveyardPost, HighlightedCode, CompanyFunnel, CompanyFunnelDay, Invitation, JobApplication, Opportunity, Shortlist, Submission, SummoningPost, User
+from .similarity import submission_text
+from .utils import UploadRejected, load_verification_image, stream_upload_to_temp
+from PIL import Image
+from .job_search import job_facets, parse_salary_range, search_jobs
+from . import ghost_ids
+from .ghost_ids import ID_SPACE, BlockAllocator, encode_ghost_id
+from .workos_auth import create_ghost_user
+from .git_backend import command_timeout, head_sha, iter_git_log, local_repo_commit_scores, repo_commit_scores
+from .portfolio_analyzer import collect_commit_signals, score_commits, source_error
+import importlib
+import io
+import logging
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+import zipfile
 
-# Create your tests here.
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+# Pages render without running collectstatic first
+PLAIN_STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+
+
+class GitRepoMixin:
+    """Throwaway repositories built with the git CLI - no network involved"""
+
+    def make_repo(self, path, commits=()):
+        os.makedirs(path, exist_ok=True)
+        self.git(path, 'init', '--quiet')
+        for message, date in commits:
+            self.commit(path, message, date)
+        return path
+
+    def commit(self, path, message, date='2024-01-01T12:00:00+00:00'):
+        env = {**os.environ, 'GIT_AUTHOR_DATE': date, 'GIT_COMMITTER_DATE': date}
+        self.git(path, 'commit', '--quiet', '--allow-empty', '-m', message, env=env)
+
+    def git(self, path, *args, env=None):
+        subprocess.run(
+            ['git', '-c', 'user.name=Ghost', '-c', 'user.email=ghost@example.com', '-C', path, *args],
+            check=True, capture_output=True, env=env,
+        )
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class GitBackendTests(GitRepoMixin, SimpleTestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        cache.clear()
+
+    def test_iter_git_log_streams_history_newest_first(self):
+        repo = self.make_repo(os.path.join(self.root, 'repo'), [
+            ('Initial commit', '2024-01-01T10:00:00+00:00'),
+            ('Add parser\n\nHandles multi-line bodies and ünïcode', '2024-01-02T10:00:00+00:00'),
+            ('fix', '2024-01-03T10:00:00+00:00'),
+        ])
+
+        commits = list(iter_git_log(repo))
+
+        self.assertEqual([c.message for c in commits], [
+            'fix', 'Add parser\n\nHandles multi-line bodies and ünïcode', 'Initial commit',
+        ])
+        self.assertEqual(commits[0].date, '2024-01-03T10:00:00+00:00')
+        self.assertEqual([c.message for c in iter_git_log(repo, max_count=1)], ['fix'])
+
+    def test_score_commits_over_a_local_history(self):
+        repo = self.make_repo(os.path.join(self.root, 'repo'), [
+            (f'Refactor the cache layer to avoid a race in step {i}', f'2024-01-{i + 1:02d}T10:00:00+00:00')
+            for i in range(12)
+        ])
+
+        ai_indicators, human_indicators, signal_counts = score_commits(iter_git_log(repo))
+
+        self.assertEqual(signal_counts, {
+            'technical_commits': 12, 'iterative_development': 1, 'consistent_activity': 1,
+        })
+        self.assertEqual((ai_indicators, human_indicators), (0, 12 * 2 + 3 + 2))
+
+    def test_scores_are_cached_by_head_sha(self):
+        repo = self.make_repo(os.path.join(self.root, 'repo'), [('Initial commit', '2024-01-01T10:00:00+00:00')])
+        first = repo_commit_scores(repo)
+        self.assertEqual(first, score_commits(iter_git_log(repo)))
+
+        self.commit(repo, 'Implement the upload endpoint with streaming validation', '2024-01-02T10:00:00+00:00')
+
+        second = repo_commit_scores(repo)
+        self.assertNotEqual(first, second)
+        self.assertEqual(second, score_commits(iter_git_log(repo)))
+
+    def test_empty_repository_has_no_scores(self):
+        repo = self.make_repo(os.path.join(self.root, 'empty'))
+        self.assertIsNone(head_sha(repo))
+        self.assertIsNone(repo_commit_scores(repo))
+
+    def test_local_repo_commit_scores_reads_the_mirror_dir(self):
+        mirror = os.path.join(self.root, 'mirrors')
+        self.make_repo(os.path.join(mirror, 'casper', 'spooky.git'), [('Initial commit', '2024-01-01T10:00:00+00:00')])
+
+        with override_settings(GIT_MIRROR_DIR=mirror, GIT_AUTO_MIRROR=False):
+            scores = local_repo_commit_scores('casper', SimpleNamespace(name='spooky'))
+            missing = local_repo_commit_scores('casper', SimpleNamespace(name='elsewhere'))
+
+        self.assertEqual(scores, (1, 0, {}))
+        self.assertIsNone(missing)
+
+    def run_with_budget(self, seconds):
+        token = _current_budget.set(Budget(seconds))
+        self.addCleanup(_current_budget.reset, token)
+
+    def test_command_timeout_is_capped_by_the_budget(self):
+        with override_settings(GIT_COMMAND_TIMEOUT_SECONDS=60):
+            self.assertEqual(command_timeout(), 60)
+            self.run_with_budget(5)
+            self.assertLessEqual(command_timeout(), 5)
+
+    def test_spent_budget_stops_git(self):
+        mirror = os.path.join(self.root, 'mirrors')
+        repo = self.make_repo(os.path.join(mirror, 'casper', 'spooky.git'), [('Initial commit', '2024-01-01T10:00:00+00:00')])
+        self.run_with_budget(0)
+
+        with self.assertRaises(BudgetExhausted):
+            list(iter_git_log(repo))
+
+        with override_settings(GIT_MIRROR_DIR=mirror, GIT_AUTO_MIRROR=False, GITHUB_COMMIT_BACKEND='git'):
+            with self.assertRaises(BudgetExhausted):
+                local_repo_commit_scores('casper', SimpleNamespace(name='spooky'))
+            signals = collect_commit_signals([SimpleNamespace(name='spooky', fork=False)], 'casper')
+
+        self.assertTrue(signals['partial'])
+
+
+@override_settings(CACHES=LOCMEM_CACHE, STORAGES=PLAIN_STORAGES, ALLOWED_HOSTS=['localhost'])
+class ListingQueryCountTests(TestCase):
+    """Listing pages run the same number of queries however many rows they show"""
+
+    PAGES = ['/graveyard/', '/my-crews/', '/crew/invitations/']
+
+    def setUp(self):
+        cache.clear()
+        self.owner = self.make_user()
+        self.client = Client(HTTP_HOST='localhost')
+        self.client.force_login(self.owner)
+
+    def make_user(self):
+        n = User.objects.count()
+        return User.objects.create_user(f'ghost{n}@example.com', f'ghost{n}', None, is_verified=True)
+
+    def add_rows(self, count):
+        for i in range(count):
+            crew = GhostCrew.objects.create(name=f'crew {i}', created_by=self.owner)
+            for member in [self.owner, *(self.make_user() for _ in range(i % 4))]:
+                crew.add_member(member)
+            CrewInvitation.objects.create(crew=crew, from_user=self.make_user(), to_user=self.owner)
+
+            post = GraveyardPost.objects.create(author=self.owner, title=f'post {i}', description='d')
+            for _ in range(3):
+                GhostChant.objects.create(post=post, author=self.make_user(), chant='boo')
+
+    def query_counts(self):
+        counts = {}
+        for url in self.PAGES:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200, url)
+            counts[url] = len(queries)
+        return counts
+
+    def test_query_counts_do_not_grow_with_rows(self):
+        self.add_rows(3)
+        few = self.query_counts()
+        self.add_rows(6)
+
+        for url, count in few.items():
+            with self.subTest(url=url), self.assertNumQueries(count):
+                self.client.get(url)
+
+
+class CrewSeatRaceTests(TransactionTestCase):
+    """Concurrent joins can't overflow a crew (add_member claims a seat with one conditional UPDATE)"""
+
+    JOINERS = 8
+
+    def test_parallel_joins_take_the_last_seat_once(self):
+        owner = User.objects.create_user('owner@example.com', 'owner', None)
+        crew = GhostCrew.objects.create(name='race', created_by=owner)
+        for n in range(GhostCrew.MAX_MEMBERS - 1):
+            crew.add_member(owner if n == 0 else User.objects.create_user(f'm{n}@example.com', f'm{n}', None))
+        joiners = [User.objects.create_user(f'j{n}@example.com', f'j{n}', None) for n in range(self.JOINERS)]
+
+        results = []
+        barrier = threading.Barrier(self.JOINERS)
+
+        def join(user):
+            barrier.wait()
+            try:
+                for _ in range(100):
+                    try:
+                        results.append(GhostCrew.objects.get(pk=crew.pk).add_member(user))
+                        break
+                    except OperationalError:
+                        # SQLite locks the whole database - retry; other backends lock the row
+                        time.sleep(0.01)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=join, args=(user,)) for user in joiners]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        crew.refresh_from_db()
+        self.assertEqual(sorted(results), [False] * (self.JOINERS - 1) + [True])
+        self.assertEqual(crew.member_count, GhostCrew.MAX_MEMBERS)
+        self.assertEqual(crew.members.count(), GhostCrew.MAX_MEMBERS)
+        self.assertFalse(crew.add_member(User.objects.create_user('late@example.com', 'late', None)))
+        self.assertTrue(crew.add_member(owner))
+        self.assertEqual(GhostCrew.objects.get(pk=crew.pk).member_count, GhostCrew.MAX_MEMBERS)
+
+
+class ApplicantSkillFilterTests(TestCase):
+    """for_review(skill=...) matches whole skills, not substrings"""
+
+    def setUp(self):
+        company = User.objects.create_user('co@example.com', 'co', None, is_company=True)
+        self.job = SummoningPost.objects.create(
+            company_name='Haunt Inc', posted_by=company, job_title='Dev', description='d', location='Remote',
+        )
+        for username, core_skills, top_skills in [
+            ('djangonaut', 'Django, REST APIs', ['Python']),
+            ('gopher', 'Distributed systems, go', ['Rust']),
+            ('scripter', 'Frontend', ['JavaScript', 'CSS']),
+            ('javanese', 'Spring Boot', ['Java']),
+            ('cpp', 'C++, CUDA', []),
+        ]:
+            applicant = User.objects.create_user(
+                f'{username}@example.com', username, None, core_skills=core_skills, top_skills=top_skills,
+            )
+            JobApplication.objects.create(job=self.job, applicant=applicant, cover_message='boo')
+
+    def matching(self, skill):
+        return sorted(application.applicant.username for application in self.job.applications.for_review(skill=skill))
+
+    def test_skills_match_whole_tokens(self):
+        self.assertEqual(self.matching('go'), ['gopher'])
+        self.assertEqual(self.matching('Django'), ['djangonaut'])
+        self.assertEqual(self.matching('c++'), ['cpp'])
+        self.assertEqual(self.matching('rest  apis'), ['djangonaut'])
+
+    def test_top_skills_match_whole_entries_in_any_case(self):
+        self.assertEqual(self.matching('java'), ['javanese'])
+        self.assertEqual(self.matching('javascript'), ['scripter'])
+        self.assertEqual(self.matching('PYTHON'), ['djangonaut'])
+        self.assertEqual(self.matching('script'), [])
+
+
+class SalaryRangeTests(SimpleTestCase):
+    def test_parse_salary_range(self):
+        for text, expected in [
+            ('$60k-$80k', (60_000, 80_000)),
+            ('60 - 80', (60_000, 80_000)),
+            ('$90k+', (90_000, None)),
+            ('$100k+ DOE', (100_000, None)),
+            ('$120k + equity', (120_000, 120_000)),
+            ('up to $70k', (None, 70_000)),
+            ('$40/hr', (83_200, 83_200)),
+            ('$5k/mo', (60_000, 60_000)),
+            ('$8,000 monthly', (96_000, 96_000)),
+            ('$99999999999', (None, None)),
+            ('DOE', (None, None)),
+        ]:
+            with self.subTest(text=text):
+                self.assertEqual(parse_salary_range(text), expected)
+
+
+class JobSearchTests(TestCase):
+    def setUp(self):
+        company = User.objects.create_user('co@example.com', 'co', None, is_company=True)
+        for salary_range in ['$60k-$80k', '$100k+ DOE', '$5k/mo', '$99999999999', '']:
+            SummoningPost.objects.create(
+                company_name='Haunt Inc', posted_by=company, job_title=salary_range or 'unpaid',
+                description='d', location='Remote', salary_range=salary_range,
+            )
+
+    def test_oversized_salaries_are_stored_without_bounds(self):
+        job = SummoningPost.objects.get(salary_range='$99999999999')
+        self.assertEqual((job.salary_min, job.salary_max), (None, None))
+
+    def test_salary_bands_include_open_ended_ranges(self):
+        jobs, _, facets = search_jobs(SummoningPost.objects.all(), QueryDict('salary=80k'))
+
+        self.assertEqual(sorted(job.job_title for job in jobs), ['$100k+ DOE', '$60k-$80k'])
+        self.assertEqual([band['count'] for band in facets['salaries']], [2, 2, 0])
+        facets = job_facets(SummoningPost.objects.all())
+        self.assertEqual([band['count'] for band in facets['salaries']], [3, 2, 0])
+
+
+class HighlightCacheTests(TestCase):
+    def setUp(self):
+        memory_cache().clear()
+        self.addCleanup(memory_cache().clear)
+
+    def test_storing_snippets_does_not_count_as_a_request_write(self):
+        token = db_router._wrote.set(False)
+        self.addCleanup(db_router._wrote.reset, token)
+
+        first = highlight_many([('def boo():\n    return 1\n', 'python')])
+        memory_cache().clear()
+        again = highlight_many([('def boo():\n    return 1\n', 'python')])
+
+        self.assertEqual(first, again)
+        self.assertEqual(HighlightedCode.objects.count(), 1)
+        self.assertFalse(db_router._wrote.get())
+
+
+@override_settings(SIMILARITY_MAX_BYTES=1024)
+class SubmissionTextTests(SimpleTestCase):
+    """Unreadable uploads and zip members are skipped rather than failing the submission"""
+
+    CODE = b'def haunt(house):\n    return house.ghosts\n'
+
+    def zip_bytes(self, members, compression=zipfile.ZIP_STORED):
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w', compression) as archive:
+            for name, data in members:
+                archive.writestr(name, data)
+        return bytearray(buffer.getvalue())
+
+    def text(self, data):
+        submission = SimpleNamespace(pk=1, code_text='print(1)', files=ContentFile(bytes(data), name='work.zip'))
+        return submission_text(submission)
+
+    def test_encrypted_members_are_skipped(self):
+        data = self.zip_bytes([('a_secret.py', b'top secret'), ('b_main.py', self.CODE)])
+        # Set the "encrypted" flag of the first member in the central directory
+        entry = data.index(b'PK\x01\x02')
+        data[entry + 8] |= 0x1
+
+        self.assertEqual(self.text(data), 'print(1)\n' + self.CODE.decode())
+
+    def test_corrupt_members_are_skipped(self):
+        data = self.zip_bytes([('a_broken.py', b'x = 1\n' * 200), ('b_main.py', self.CODE)], zipfile.ZIP_DEFLATED)
+        # Scramble the start of the first member's deflate stream
+        start = 30 + len('a_broken.py')
+        data[start:start + 4] = b'\xff\xff\xff\xff'
+
+        self.assertEqual(self.text(data), 'print(1)\n' + self.CODE.decode())
+
+    def test_zips_larger_than_the_cap_are_still_read_as_zips(self):
+        data = self.zip_bytes([('a_main.py', self.CODE), ('b_blob.bin', os.urandom(4096)), ('c_long.py', b'y' * 4096)])
+
+        text = self.text(data)
+
+        self.assertTrue(text.startswith('print(1)\n' + self.CODE.decode()))
+        self.assertNotIn('PK', text)
+        self.assertLessEqual(len(text), len('print(1)\n') + 1024 + 1)
+
+
+@override_settings(VERIFICATION_MAX_UPLOAD_BYTES=4096, VERIFICATION_MAX_PIXELS=250_000,
+                   VERIFICATION_MAX_PIXELS_FULL_DECODE=10_000, VERIFICATION_IMAGE_SIZE=32)
+class VerificationUploadTests(SimpleTestCase):
+    def image_file(self, size, fmt):
+        buffer = io.BytesIO()
+        Image.new('RGB', size, (40, 200, 120)).save(buffer, fmt)
+        return self.temp_file(buffer.getvalue())
+
+    def temp_file(self, data):
+        fd, path = tempfile.mkstemp()
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def test_uploads_over_the_byte_cap_are_rejected(self):
+        with self.assertRaises(UploadRejected):
+            stream_upload_to_temp(SimpleUploadedFile('me.jpg', b'x' * 4097))
+
+        path = stream_upload_to_temp(SimpleUploadedFile('me.JPG', b'x' * 4096))
+        self.addCleanup(os.remove, path)
+        self.assertTrue(path.endswith('.jpg'))
+        self.assertEqual(os.path.getsize(path), 4096)
+
+    def test_pixel_caps(self):
+        # JPEGs decode at reduced scale and get the larger cap...
+        img = load_verification_image(self.image_file((400, 400), 'JPEG'))
+        self.assertEqual((img.mode, img.size), ('RGB', (32, 32)))
+        with self.assertRaises(UploadRejected):
+            load_verification_image(self.image_file((600, 600), 'JPEG'))
+
+        # ...PNG and WebP are fully decoded, so they get the smaller one
+        self.assertEqual(load_verification_image(self.image_file((100, 100), 'PNG')).size, (32, 32))
+        for fmt in ['PNG', 'WEBP']:
+            with self.subTest(fmt=fmt), self.assertRaises(UploadRejected):
+                load_verification_image(self.image_file((400, 400), fmt))
+
+    def test_non_images_are_rejected(self):
+        for path in [self.temp_file(b'<?php echo "boo"; ?>'), self.image_file((10, 10), 'GIF')]:
+            with self.subTest(path=path), self.assertRaises(UploadRejected):
+                load_verification_image(path)
+
+
+@override_settings(CACHES=LOCMEM_CACHE, ALLOWED_HOSTS=['localhost'])
+class ManifestStaticFilesTests(TestCase):
+    """Pages render through the production static storage after collectstatic"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.static_root = tempfile.mkdtemp()
+        cls.addClassCleanup(shutil.rmtree, cls.static_root)
+        cls.enterClassContext(override_settings(STATIC_ROOT=cls.static_root))
+        # The theme CSS points at a few images that aren't in the repo - collectstatic warns about each
+        storage_logger = logging.getLogger('haunted_profiles.storage')
+        level = storage_logger.level
+        storage_logger.setLevel(logging.ERROR)
+        try:
+            call_command('collectstatic', interactive=False, verbosity=0)
+        finally:
+            storage_logger.setLevel(level)
+
+    def test_profile_without_avatar_renders(self):
+        user = User.objects.create_user('plain@example.com', 'plain', None, is_verified=True)
+        client = Client(HTTP_HOST='localhost')
+        client.force_login(user)
+
+        response = client.get('/profile/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertRegex(response.content.decode(), r'/static/images/cute_ghost\.[0-9a-f]{12}\.png')
+
+    def test_missing_files_fall_back_to_their_unhashed_name(self):
+        with self.assertLogs('haunted_profiles.storage', 'WARNING'):
+            self.assertEqual(static('images/not-there.png'), '/static/images/not-there.png')
+
+
+class SourceMemoTests(SimpleTestCase):
+    """Transient source failures are retried on the next run; lasting ones are memoized"""
+
+    def pipeline(self, fetch):
+        return Pipeline([
+            Stage('profile_source', fetch, inputs=['url'], network=True),
+            Stage('profile', lambda profile_source: {'name': profile_source.get('name')}, inputs=['profile_source']),
+        ], inputs=['url'])
+
+    def test_a_timed_out_source_is_fetched_again(self):
+        import requests
+
+        calls = []
+
+        def fetch(url):
+            calls.append(url)
+            try:
+                if len(calls) == 1:
+                    raise requests.exceptions.ChunkedEncodingError('Connection broken: IncompleteRead')
+                return {'name': 'casper'}
+            except Exception as e:
+                return source_error(e)
+
+        memo = {}
+        outputs, report = self.pipeline(fetch).run({'url': 'u'}, memo=memo)
+        self.assertTrue(report['partial'])
+        self.assertEqual(report['sources']['profile_source']['status'], 'partial')
+        self.assertEqual(memo, {})
+
+        outputs, report = self.pipeline(fetch).run({'url': 'u'}, memo=memo)
+        self.assertFalse(report['partial'])
+        self.assertEqual(outputs['profile'], {'name': 'casper'})
+        self.assertEqual(len(calls), 2)
+
+        self.pipeline(fetch).run({'url': 'u'}, memo=memo)
+        self.assertEqual(len(calls), 2)
+
+    def test_a_missing_profile_is_memoized(self):
+        calls = []
+
+        def fetch(url):
+            calls.append(url)
+            return {'error': 'GitHub profile not found'}
+
+        memo = {}
+        for _ in range(2):
+            outputs, report = self.pipeline(fetch).run({'url': 'u'}, memo=memo)
+        self.assertEqual(outputs['profile_source'], {'error': 'GitHub profile not found'})
+        self.assertEqual(len(calls), 1)
+
+
+class SharedAnalysisTests(TransactionTestCase):
+    """Users linking the same GitHub account share one fetch of it"""
+
+    def fake_github(self, github_url):
+        self.fetches.append(github_url)
+        self.fetching.set()
+        time.sleep(0.3)
+        return {
+            'username': 'casper', 'public_repos': 1, 'followers': 0, 'repos': [], 'languages': {},
+            'original_repos': 0, 'total_stars': 0, 'total_forks': 0, 'unique_projects': [],
+            'commit_signals': {'ai_indicators': 0, 'human_indicators': 0, 'signal_counts': {}},
+        }
+
+    def run_locked(self, func, *args):
+        """Call func, retrying while SQLite's shared in-memory test database is locked by the other thread"""
+        for _ in range(200):
+            try:
+                return func(*args)
+            except OperationalError:
+                time.sleep(0.01)
+        return func(*args)
+
+    def test_concurrent_analyses_of_one_account_fetch_it_once(self):
+        self.fetches = []
+        self.fetching = threading.Event()
+        first = User.objects.create_user('a@example.com', 'casper_a', None, github_link='https://github.com/Casper')
+        second = User.objects.create_user('b@example.com', 'casper_b', None, github_link='https://github.com/casper/')
+        results = {}
+
+        def analyze(user):
+            try:
+                results[user.username] = self.run_locked(
+                    lambda: User.objects.get(pk=user.pk).analyze_portfolio(refresh=True, schedule_remaining=False)
+                )
+            finally:
+                connection.close()
+
+        with mock.patch('haunted_profiles.portfolio_analyzer.fetch_github', self.fake_github):
+            threads = [threading.Thread(target=analyze, args=(first,))]
+            threads[0].start()
+            self.assertTrue(self.fetching.wait(5))
+            threads.append(threading.Thread(target=analyze, args=(second,)))
+            threads[1].start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(self.fetches, ['https://github.com/casper'])
+        for user in [first, second]:
+            self.assertEqual(results[user.username]['github']['username'], 'casper')
+            self.assertTrue(AnalysisStageResult.objects.filter(user=user, stage='github_source').exists())
+        self.assertFalse(AnalysisLease.objects.exists())
+
+
+class GhostIdTests(TransactionTestCase):
+    """Allocated usernames are unique - the Sequence CAS and the encoding are all that guarantees it"""
+
+    def test_blocks_from_two_allocators_never_overlap(self):
+        first, second = BlockAllocator('test_ids', 7), BlockAllocator('test_ids', 7)
+        numbers = [allocator.next() for _ in range(30) for allocator in (first, second)]
+        self.assertEqual(len(set(numbers)), len(numbers))
+
+        # Concurrently, several allocators racing on the same sequence
+        allocators = [BlockAllocator('race_ids', 5) for _ in range(4)]
+        drawn = []
+        barrier = threading.Barrier(len(allocators))
+
+        def draw(allocator):
+            barrier.wait()
+            try:
+                for _ in range(25):
+                    for _ in range(200):
+                        try:
+                            drawn.append(allocator.next())
+                            break
+                        except OperationalError:
+                            time.sleep(0.01)  # SQLite locks the whole database
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=draw, args=(allocator,)) for allocator in allocators]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(drawn), 100)
+        self.assertEqual(len(set(drawn)), 100)
+
+    def test_encode_ghost_id_is_injective_and_never_legacy(self):
+        sample = [*range(50_000), *range(ID_SPACE - 1000, ID_SPACE + 1000), 10 ** 12]
+        names = [encode_ghost_id(number) for number in sample]
+
+        self.assertEqual(len(set(names)), len(names))
+        legacy = re.compile(r'ghost_\d{1,5}')
+        self.assertFalse([name for name in names if legacy.fullmatch(name)])
+        self.assertTrue(all(len(name) >= len('ghost_') + 6 for name in names))
+
+    def test_create_ghost_user_skips_a_name_taken_by_hand(self):
+        self.addCleanup(setattr, ghost_ids, '_allocator', ghost_ids._allocator)
+        ghost_ids._allocator = None
+        # A fresh sequence hands out 0 first
+        User.objects.create_user('squatter@example.com', encode_ghost_id(0), None)
+
+        user = create_ghost_user(email='new@example.com')
+
+        self.assertEqual(user.username, encode_ghost_id(1))
+
+
+@override_settings(CACHES=LOCMEM_CACHE, STORAGES=PLAIN_STORAGES, ALLOWED_HOSTS=['localhost'])
+class ShortlistTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.company = User.objects.create_user('co@example.com', 'co', None, is_company=True)
+        self.developers = [
+            User.objects.create_user(f'dev{i}@example.com', f'dev{i}', None, is_verified=True) for i in range(3)
+        ]
+        self.ids = [developer.id for developer in self.developers]
+        self.shortlist = Shortlist.for_company(self.company)
+
+    def shortlisted(self):
+        return sorted(self.shortlist.entries.values_list('developer_id', flat=True))
+
+    def test_add_skips_companies_unknown_ids_and_duplicates(self):
+        other_company = User.objects.create_user('rival@example.com', 'rival', None, is_company=True)
+
+        self.shortlist.add([self.ids[0], self.ids[0], other_company.id, 999_999])
+        self.shortlist.add(self.ids)
+
+        self.assertEqual(self.shortlisted(), self.ids)
+
+    def test_remove_in_bulk(self):
+        self.shortlist.add(self.ids)
+
+        self.assertEqual(self.shortlist.remove([self.ids[0], self.ids[2], 999_999]), 2)
+        self.assertEqual(self.shortlisted(), [self.ids[1]])
+
+    def test_invite_skips_developers_already_invited(self):
+        opportunity = Opportunity.objects.create(
+            company=self.company, opportunity_type='skill_challenge', title='Haunt', description='d',
+        )
+        Invitation.objects.create(opportunity=opportunity, developer=self.developers[0])
+        self.shortlist.add(self.ids)
+
+        self.assertEqual(self.shortlist.invite(opportunity, title='t', message='m'), 2)
+        self.assertEqual(self.shortlist.invite(opportunity, title='t', message='m'), 0)
+        self.assertEqual(Invitation.objects.filter(opportunity=opportunity).count(), 3)
+        self.assertEqual(
+            sorted(Invitation.objects.filter(notification__isnull=False).values_list('developer_id', flat=True)),
+            self.ids[1:],
+        )
+
+    def login_with_session_shortlist(self):
+        client = Client(HTTP_HOST='localhost')
+        client.force_login(self.company)
+        session = client.session
+        session['shortlist'] = [str(developer_id) for developer_id in self.ids[:2]]
+        session.save()
+        return client
+
+    def test_session_shortlist_is_adopted_when_the_shortlist_is_read(self):
+        for url in ['/ghost-selector/', '/api/shortlist/', '/create-opportunity/']:
+            with self.subTest(url=url):
+                self.shortlist.clear()
+                client = self.login_with_session_shortlist()
+
+                client.get(url)
+
+                self.assertEqual(self.shortlisted(), self.ids[:2])
+                self.assertNotIn('shortlist', client.session)
+
+    def test_session_shortlist_is_invited(self):
+        opportunity = Opportunity.objects.create(
+            company=self.company, opportunity_type='skill_challenge', title='Haunt', description='d',
+        )
+        client = self.login_with_session_shortlist()
+
+        client.post(f'/send-invitations/{opportunity.id}/')
+
+        self.assertEqual(
+            sorted(Invitation.objects.filter(opportunity=opportunity).values_list('developer_id', flat=True)),
+            self.ids[:2],
+        )
+
+
+@override_settings(CACHES=LOCMEM_CACHE, STORAGES=PLAIN_STORAGES, ALLOWED_HOSTS=['localhost'])
+class FunnelTests(TestCase):
+    """Funnel counters move with each stage exactly once and back the dashboard"""
+
+    COUNTS = ['invited_count', 'accepted_count', 'declined_count', 'submitted_count', 'rated_count']
+
+    def setUp(self):
+        cache.clear()
+        self.company = User.objects.create_user('co@example.com', 'co', None, is_company=True)
+        self.opportunity = Opportunity.objects.create(
+            company=self.company, opportunity_type='skill_challenge', title='Haunt', description='d',
+        )
+
+    def make_developer(self):
+        n = User.objects.count()
+        return User.objects.create_user(f'dev{n}@example.com', f'dev{n}', None, is_verified=True)
+
+    def invite(self, count):
+        shortlist = Shortlist.for_company(self.company)
+        shortlist.add([self.make_developer().id for _ in range(count)])
+        shortlist.invite(self.opportunity, title='t', message='m')
+        shortlist.clear()
+
+    def funnels(self):
+        return [
+            [getattr(row, field) for field in self.COUNTS] for row in [
+                Opportunity.objects.get(pk=self.opportunity.pk),
+                CompanyFunnel.objects.get(company=self.company),
+                CompanyFunnelDay.objects.get(company=self.company, day=timezone.localdate()),
+            ]
+        ]
+
+    def test_bump_creates_then_increments(self):
+        lookup = {'company_id': self.company.id}
+
+        CompanyFunnel.bump(lookup, 'invited', 3)
+        CompanyFunnel.bump(lookup, 'invited')
+        CompanyFunnel.bump(lookup, 'declined')
+
+        funnel = CompanyFunnel.objects.get(company=self.company)
+        self.assertEqual((funnel.invited_count, funnel.declined_count, funnel.rated_count), (4, 1, 0))
+
+    def test_invite_accept_submit_rate_flow(self):
+        self.invite(2)
+        accepted, declined = Invitation.objects.filter(opportunity=self.opportunity).order_by('id')
+        self.assertTrue(accepted.respond('accepted'))
+        self.assertTrue(declined.respond('declined'))
+
+        client = Client(HTTP_HOST='localhost')
+        client.force_login(accepted.developer)
+        client.post(f'/submit-work/{accepted.id}/', {'code_text': 'print("boo")'})
+        submission = Submission.objects.get(invitation=accepted)
+        self.assertTrue(submission.rate(5, 'spooky', True))
+
+        self.assertEqual(self.funnels(), [[2, 1, 1, 1, 1]] * 3)
+
+    def test_answering_twice_counts_once(self):
+        self.invite(1)
+        invitation = Invitation.objects.get(opportunity=self.opportunity)
+        submission = Submission.objects.create(invitation=invitation, code_text='boo')
+
+        self.assertTrue(invitation.respond('accepted'))
+        self.assertFalse(Invitation.objects.get(pk=invitation.pk).respond('accepted'))
+        self.assertFalse(Invitation.objects.get(pk=invitation.pk).respond('declined'))
+        self.assertTrue(submission.rate(4, 'ok', False))
+        self.assertFalse(Submission.objects.get(pk=submission.pk).rate(1, 'changed my mind', False))
+
+        self.assertEqual(self.funnels(), [[1, 1, 0, 0, 1]] * 3)
+        self.assertEqual(Submission.objects.get(pk=submission.pk).rating, 4)
+
+    def test_backfill_counts_existing_invitations(self):
+        developers = [self.make_developer() for _ in range(3)]
+        invitations = [Invitation.objects.create(opportunity=self.opportunity, developer=d) for d in developers]
+        Invitation.objects.filter(pk=invitations[0].pk).update(status='accepted', responded_at=timezone.now())
+        Invitation.objects.filter(pk=invitations[1].pk).update(status='declined', responded_at=timezone.now())
+        Submission.objects.create(invitation=invitations[0], rating=3, rated_at=timezone.now())
+
+        migration = importlib.import_module('haunted_profiles.migrations.0016_company_funnel')
+        migration.count_funnels(apps, None)
+
+        self.assertEqual(self.funnels(), [[3, 1, 1, 1, 1]] * 3)
+
+    def test_dashboard_queries_do_not_grow_with_invitations(self):
+        client = Client(HTTP_HOST='localhost')
+        client.force_login(self.company)
+        self.invite(2)
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get('/company-dashboard/')
+        self.assertEqual(response.status_code, 200)
+
+        self.invite(30)
+        with self.assertNumQueries(len(queries)):
+            client.get('/company-dashboard/')
+
+
+@override_settings(CACHES=LOCMEM_CACHE, STORAGES=PLAIN_STORAGES, ALLOWED_HOSTS=['localhost'])
+class ChantVoteTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user('author@example.com', 'author', None)
+        self.voter = User.objects.create_user('voter@example.com', 'voter', None)
+        self.post = GraveyardPost.objects.create(author=self.author, title='post', description='d')
+        self.chant = GhostChant.objects.create(post=self.post, author=self.author, chant='boo')
+
+    def test_second_vote_is_rejected(self):
+        self.assertTrue(self.chant.upvote(self.voter))
+        self.assertFalse(GhostChant.objects.get(pk=self.chant.pk).upvote(self.voter))
+
+        self.assertEqual(GhostChant.objects.get(pk=self.chant.pk).upvotes, 1)
+        self.assertEqual(GraveyardPost.objects.get(pk=self.post.pk).roast_score, self.post.roast_score + 1)
+
+    def test_upvote_refreshes_hot_score(self):
+        GraveyardPost.objects.filter(pk=self.post.pk).update(roast_score=9)
+
+        self.chant.upvote(self.voter)
+
+        post = GraveyardPost.objects.get(pk=self.post.pk)
+        self.assertAlmostEqual(post.hot_score, GraveyardPost.hot_score_for(10, post.created_at))
+        self.assertGreater(post.hot_score, self.post.hot_score)
+
+    def test_view_blocks_voting_for_own_chant(self):
+        client = Client(HTTP_HOST='localhost')
+        client.force_login(self.author)
+
+        response = client.post(f'/graveyard/chants/{self.chant.id}/upvote/', HTTP_ACCEPT='application/json')
+
+        self.assertEqual(response.json(), {'success': False, 'upvotes': 0})
+        self.assertFalse(self.chant.votes.exists())
+
+    def test_migration_scores_posts_like_the_model(self):
+        migration = importlib.import_module('haunted_profiles.migrations.0019_chant_votes')
+        for roast_score in (0, 1, 42):
+            with self.subTest(roast_score=roast_score):
+                self.assertAlmostEqual(
+                    migration.hot_score(roast_score, self.post.created_at),
+                    GraveyardPost.hot_score_for(roast_score, self.post.created_at),
+                )
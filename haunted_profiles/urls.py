@@ -23,6 +23,7 @@ urlpatterns = [
     path('graveyard/', views.graveyard, name='graveyard'),
     path('graveyard/create/', views.create_graveyard_post, name='create_graveyard_post'),
     path('graveyard/<int:post_id>/chant/', views.add_ghost_chant, name='add_ghost_chant'),
+    path('graveyard/chants/<int:chant_id>/upvote/', views.upvote_chant, name='upvote_chant'),
     
     # The Summoning Circle (Jobs)
     path('summoning-circle/', views.summoning_circle, name='summoning_circle'),
@@ -52,6 +53,8 @@ urlpatterns = [
     path('submit-work/<int:invitation_id>/', views.submit_work, name='submit_work'),
     path('rate-submission/<int:submission_id>/', views.rate_submission, name='rate_submission'),
     path('api/notifications/', views.notifications_api, name='notifications_api'),
+    path('api/shortlist/', views.shortlist_api, name='shortlist_api'),
+    path('api/circuit-breakers/', views.circuit_breakers_api, name='circuit_breakers_api'),
     
     # Toggle company mode (for testing/prototyping)
     path('toggle-company-mode/', views.toggle_company_mode, name='toggle_company_mode'),
@@ -1,11 +1,111 @@
 from PIL import Image
+from django.conf import settings
 import requests
 import os
+import tempfile
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+# ============================================
+# VERIFICATION UPLOAD PIPELINE
+# ============================================
+
+class UploadRejected(Exception):
+    """Raised when an uploaded verification photo fails size or format checks"""
+
+
+def stream_upload_to_temp(uploaded_file, max_bytes=None):
+    """
+    Stream an uploaded file to a private, uniquely named temp file.
+    
+    Chunks are written as they arrive so the upload is never held in memory,
+    and writing stops as soon as the byte limit is exceeded.
+    
+    Args:
+        uploaded_file: Django UploadedFile
+        max_bytes: Hard size limit (defaults to settings.VERIFICATION_MAX_UPLOAD_BYTES)
+        
+    Returns:
+        str: Path to the temp file (caller is responsible for removing it)
+    """
+    max_bytes = max_bytes or settings.VERIFICATION_MAX_UPLOAD_BYTES
+    
+    # Cheap rejection when the client told us the size up front
+    if uploaded_file.size and uploaded_file.size > max_bytes:
+        raise UploadRejected(f'Photo is too large (max {max_bytes // (1024 * 1024)} MB).')
+    
+    # Never trust the client filename - only keep a short, sanitized extension
+    _, ext = os.path.splitext(uploaded_file.name or '')
+    suffix = ext.lower() if ext.lower() in ('.jpg', '.jpeg', '.png', '.webp') else ''
+    
+    fd, temp_path = tempfile.mkstemp(prefix='ghost_verify_', suffix=suffix)
+    written = 0
+    try:
+        with os.fdopen(fd, 'wb') as destination:
+            for chunk in uploaded_file.chunks():
+                written += len(chunk)
+                if written > max_bytes:
+                    raise UploadRejected(f'Photo is too large (max {max_bytes // (1024 * 1024)} MB).')
+                destination.write(chunk)
+    except Exception:
+        os.remove(temp_path)
+        raise
+    
+    return temp_path
+
+
+def load_verification_image(image_path, size=None):
+    """
+    Decode a verification photo at the small scale the verifier works on.
+    
+    Only the image header is read before the size checks, so oversized or
+    malformed files are rejected without decoding any pixel data. JPEGs are
+    decoded directly at reduced scale via draft mode, so they may have up to
+    VERIFICATION_MAX_PIXELS. PNG and WebP have no reduced-scale decode - the
+    whole image is decoded before reduce() - so they're held to the much
+    lower VERIFICATION_MAX_PIXELS_FULL_DECODE, which is what bounds peak
+    memory for them.
+    
+    Args:
+        image_path: Path to the uploaded photo
+        size: Target edge length (defaults to settings.VERIFICATION_IMAGE_SIZE)
+        
+    Returns:
+        PIL.Image: RGB image of size x size pixels
+    """
+    size = size or settings.VERIFICATION_IMAGE_SIZE
+    
+    try:
+        img = Image.open(image_path)
+    except (Image.UnidentifiedImageError, Image.DecompressionBombError, OSError):
+        raise UploadRejected('That file is not a supported image.')
+    
+    with img:
+        if img.format not in ('JPEG', 'PNG', 'WEBP'):
+            raise UploadRejected('Please upload a JPEG, PNG or WebP photo.')
+        
+        if img.format == 'JPEG':
+            max_pixels = settings.VERIFICATION_MAX_PIXELS
+        else:
+            max_pixels = getattr(settings, 'VERIFICATION_MAX_PIXELS_FULL_DECODE', 12_000_000)
+        width, height = img.size
+        if width * height > max_pixels:
+            raise UploadRejected('Photo dimensions are too large.')
+        
+        # JPEG: let libjpeg decode at 1/2, 1/4 or 1/8 scale
+        if img.format == 'JPEG':
+            img.draft('RGB', (size, size))
+        
+        # Integer-factor downscale before the final (more expensive) resample
+        factor = min(img.size) // (size * 2)
+        if factor >= 2:
+            img = img.reduce(factor)
+        
+        return img.convert('RGB').resize((size, size), Image.BILINEAR)
+
+
 # ============================================
 # REVERSE IMAGE SEARCH
 # ============================================
@@ -64,6 +164,8 @@ def check_duplicate_face(uploaded_photo_path):
     
     NOTE: PyTorch-based face detection disabled for production deployment.
     This feature is too resource-intensive for Railway's free tier.
+    When re-enabled, decode the photo with load_verification_image() so the
+    model only ever sees a bounded 224x224 input.
     
     Args:
         uploaded_photo_path: Path to the uploaded photo
@@ -3,9 +3,19 @@ from django.contrib.auth.decorators import login_required
 from django.contrib.auth import logout
 from django.contrib import messages
 from django.utils import timezone
-from .models import User, GhostCrew, CrewInvitation, CrewMessage, GraveyardPost, GhostChant, SummoningPost, JobApplication
+from django.db.models import Prefetch
+from django.core.paginator import Paginator
+from django.http import JsonResponse
+from .models import APPLICANT_SORTS, CARD_FIELDS, PROFILE_TEXT_FIELDS, SELF_DESCRIPTION_FIELDS, User, GhostCrew, CrewInvitation, CrewMessage, GraveyardPost, GhostChant, ChantVote, SummoningPost, JobApplication
 from .forms import ProfileSetupForm
-from .utils import check_image_online, check_duplicate_face
+from .image_variants import generate_variants
+from .decorators import replica_reads
+from .analysis_pipeline import StageUnavailable
+from .circuit_breaker import breaker_metrics
+from .highlighting import attach_highlighting
+from .job_search import search_jobs, split_skills
+from .similarity import find_near_duplicates, index_submission
+from .utils import check_image_online, check_duplicate_face, stream_upload_to_temp, load_verification_image, UploadRejected
 import os
 import logging
 
@@ -26,25 +36,22 @@ def verification(request):
     
     if request.method == 'POST' and request.FILES.get('verification_photo'):
         uploaded_file = request.FILES['verification_photo']
-        
-        # Save temporarily
-        temp_path = f'/tmp/{uploaded_file.name}'
-        with open(temp_path, 'wb+') as destination:
-            for chunk in uploaded_file.chunks():
-                destination.write(chunk)
+        temp_path = None
         
         try:
+            # Stream to a private temp file (size-capped) and check it decodes as a photo
+            temp_path = stream_upload_to_temp(uploaded_file)
+            load_verification_image(temp_path)
+            
             # Step 1: Reverse image search
             exists_online, sources = check_image_online(temp_path)
             if exists_online:
-                os.remove(temp_path)
                 messages.error(request, 'This photo exists online. Upload your real face, ghost.')
                 return render(request, 'verification.html')
             
             # Step 2: Duplicate face check
             is_duplicate, matched_user = check_duplicate_face(temp_path)
             if is_duplicate:
-                os.remove(temp_path)
                 messages.error(request, 'This face already haunts our community. One ghost per person.')
                 return render(request, 'verification.html')
             
@@ -52,17 +59,22 @@ def verification(request):
             user = request.user
             user.verification_photo = uploaded_file
             user.is_verified = True
-            user.save()
+            user.save(update_fields=['verification_photo', 'is_verified'])
             
-            os.remove(temp_path)
             messages.success(request, '✅ Verified Ghost! Welcome to the cemetery.')
             return redirect('tell_kiro_about_you')
+        
+        except UploadRejected as e:
+            messages.error(request, str(e))
+            return render(request, 'verification.html')
             
         except Exception as e:
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
             messages.error(request, f'Verification error: {str(e)}')
             return render(request, 'verification.html')
+        
+        finally:
+            if temp_path and os.path.exists(temp_path):
+                os.remove(temp_path)
     
     return render(request, 'verification.html')
 
@@ -89,11 +101,24 @@ def tell_kiro_about_you(request):
         user.ai_usage_context = request.POST.get('ai_usage_context', '')
         user.non_expertise_areas = request.POST.get('non_expertise_areas', '')
         
-        user.save()
+        # Only the edited columns - a concurrent analysis may be writing the card fields
+        user.save(update_fields=SELF_DESCRIPTION_FIELDS)
+        
+        # Re-score an existing analysis right away - only the stages that read
+        # the self-description rerun, GitHub/Devpost results are reused
+        if user.last_portfolio_update:
+            try:
+                user.analyze_portfolio(offline=True)
+            except StageUnavailable:
+                logger.info(f"No stored source data for {user.username}, analysis updates on next refresh")
+            except Exception as e:
+                logger.error(f"Error re-analyzing portfolio: {e}")
         
         messages.success(request, '✅ Thanks! This will help our AI understand you better!')
         return redirect('haunt_setup')
     
+    # Form is pre-filled from the (deferred) self-description fields - load them in one query
+    request.user.get_self_description()
     return render(request, 'tell_kiro_about_you.html')
 
 
@@ -113,38 +138,25 @@ def haunt_setup(request):
             user.linkedin_url = form.cleaned_data.get('linkedin_url', '')
             user.devpost_url = form.cleaned_data.get('devpost_url', '')
             
-            user.save()
+            user.save(update_fields=[*ProfileSetupForm.Meta.fields, 'linkedin_url', 'devpost_url'])
             
-            # Analyze portfolio in background (async would be better, but keeping it simple)
-            from .portfolio_analyzer import analyze_full_portfolio
+            # Pre-build avatar thumbnails so listing pages never serve the original
+            if 'ghost_avatar' in request.FILES:
+                generate_variants(user.ghost_avatar)
+            
+            # Analyze within PORTFOLIO_ANALYSIS_BUDGET_SECONDS; anything that
+            # doesn't fit is finished in the background
+            # Profiles whose URL didn't change are reused from the last analysis
+            partial = False
             try:
-                # Prepare user profile for AI analysis
-                user_profile = {
-                    'developer_role': user.developer_role,
-                    'core_skills': user.core_skills,
-                    'strengths': user.strengths,
-                    'weaknesses': user.weaknesses,
-                    'coding_journey': user.coding_journey,
-                    'expertise_area': user.expertise_area,
-                    'expertise_details': user.expertise_details,
-                    'learning_journey': user.learning_journey,
-                    'ai_usage_context': user.ai_usage_context,
-                    'non_expertise_areas': user.non_expertise_areas,
-                }
-                
-                portfolio_data = analyze_full_portfolio(
-                    github_url=user.github_link,
-                    linkedin_url=user.linkedin_url,
-                    devpost_url=user.devpost_url,
-                    user_profile=user_profile,
-                )
-                user.portfolio_data = portfolio_data
-                user.last_portfolio_update = timezone.now()
-                user.save()
+                partial = user.analyze_portfolio()['partial']
             except Exception as e:
                 logger.error(f"Error analyzing portfolio: {e}")
             
-            messages.success(request, '🎃 Your haunted portfolio is ready!')
+            if partial:
+                messages.info(request, '⏳ Your haunted portfolio is rising - some parts are still being analyzed!')
+            else:
+                messages.success(request, '🎃 Your haunted portfolio is ready!')
             return redirect('haunted_portfolio')
     else:
         form = ProfileSetupForm(instance=request.user)
@@ -187,37 +199,13 @@ def refresh_portfolio(request):
         messages.error(request, '❌ Add your GitHub link first!')
         return redirect('haunt_setup')
     
-    from .portfolio_analyzer import analyze_full_portfolio
-    
     try:
-        # Prepare user profile for AI analysis
-        user_profile = {
-            'developer_role': user.developer_role,
-            'core_skills': user.core_skills,
-            'strengths': user.strengths,
-            'weaknesses': user.weaknesses,
-            'coding_journey': user.coding_journey,
-            'expertise_area': user.expertise_area,
-            'expertise_details': user.expertise_details,
-            'learning_journey': user.learning_journey,
-            'ai_usage_context': user.ai_usage_context,
-            'non_expertise_areas': user.non_expertise_areas,
-        }
-        
         messages.info(request, '🔄 Analyzing your GitHub... This may take a moment!')
         
-        portfolio_data = analyze_full_portfolio(
-            github_url=user.github_link,
-            linkedin_url=user.linkedin_url,
-            devpost_url=user.devpost_url,
-            user_profile=user_profile,
-        )
-        
-        user.portfolio_data = portfolio_data
-        user.last_portfolio_update = timezone.now()
-        user.save()
-        
-        messages.success(request, '✅ Portfolio refreshed! Check out your updated analysis!')
+        if user.analyze_portfolio(refresh=True)['partial']:
+            messages.info(request, '⏳ GitHub is slow right now - the rest of your analysis will appear shortly!')
+        else:
+            messages.success(request, '✅ Portfolio refreshed! Check out your updated analysis!')
     except Exception as e:
         logger.error(f"Error refreshing portfolio: {e}")
         messages.error(request, f'❌ Error analyzing GitHub: {str(e)}')
@@ -226,13 +214,17 @@ def refresh_portfolio(request):
 
 
 @login_required
+@replica_reads
 def haunted_portfolio(request, username=None):
     """
     Haunted Portfolio - Shows AI-analyzed skills and achievements
     Gen Z style - visual, fun, and REAL! 🔥
     """
     if username:
-        profile_user = get_object_or_404(User, username=username)
+        profile_user = get_object_or_404(
+            User.objects.select_related('portfolio_snapshot').defer(*PROFILE_TEXT_FIELDS),
+            username=username
+        )
     else:
         profile_user = request.user
     
@@ -267,13 +259,31 @@ def haunted_portfolio(request, username=None):
 # THE GRAVEYARD (Roast Zone) VIEWS
 # ============================================
 
+GRAVEYARD_PAGE_SIZE = 20
+
+
 @login_required
+@replica_reads
 def graveyard(request):
     """The Graveyard - Post projects and get roasted! 🔥"""
-    posts = GraveyardPost.objects.all()
+    # Hot first; chant_count comes from the prefetched chants
+    posts = Paginator(
+        GraveyardPost.objects.hot().select_related('author').prefetch_related(
+            Prefetch('chants', queryset=GhostChant.objects.select_related('author'))
+        ),
+        GRAVEYARD_PAGE_SIZE,
+    ).get_page(request.GET.get('page'))
+    
+    attach_highlighting(posts, 'code_snippet')
+    
+    voted_chant_ids = set(
+        ChantVote.objects.filter(voter=request.user, chant__post__in=[post.id for post in posts])
+        .values_list('chant_id', flat=True)
+    )
     
     context = {
         'posts': posts,
+        'voted_chant_ids': voted_chant_ids,
     }
     return render(request, 'graveyard.html', context)
 
@@ -288,7 +298,7 @@ def create_graveyard_post(request):
         project_link = request.POST.get('project_link', '')
         image = request.FILES.get('image')
         
-        post = GraveyardPost.objects.create(
+        GraveyardPost.objects.create(
             author=request.user,
             title=title,
             description=description,
@@ -323,11 +333,35 @@ def add_ghost_chant(request, post_id):
     return redirect('graveyard')
 
 
+@login_required
+def upvote_chant(request, chant_id):
+    """Upvote a Ghost Chant - once per user. JSON for fetch() callers, else back to the Graveyard"""
+    if request.method != 'POST':
+        return redirect('graveyard')
+    
+    chant = get_object_or_404(GhostChant.objects.select_related('post'), id=chant_id)
+    counted = False
+    if chant.author_id != request.user.id:
+        counted = chant.upvote(request.user)
+    
+    if request.headers.get('Accept') == 'application/json':
+        return JsonResponse({'success': counted, 'upvotes': chant.upvotes})
+    
+    if counted:
+        messages.success(request, '👍 Upvoted!')
+    elif chant.author_id == request.user.id:
+        messages.error(request, "You can't upvote your own chant 👻")
+    else:
+        messages.info(request, 'You already upvoted that chant 👻')
+    return redirect('graveyard')
+
+
 # ============================================
 # GHOST CREW VIEWS
 # ============================================
 
 @login_required
+@replica_reads
 def ghost_hunt(request):
     """Ghost Hunt - Find developers by username or ghost_id"""
     from django.db.models import Q
@@ -336,7 +370,7 @@ def ghost_hunt(request):
     search_query = request.GET.get('search', '').strip()
     
     # Get all verified users except current user
-    developers = User.objects.filter(is_verified=True).exclude(id=request.user.id)
+    developers = User.objects.cards().filter(is_verified=True).exclude(id=request.user.id)
     
     # Apply search filter if provided
     if search_query:
@@ -355,8 +389,9 @@ def ghost_hunt(request):
 @login_required
 def my_crews(request):
     """View all crews the user is part of"""
-    created_crews = request.user.created_crews.all()
-    member_crews = request.user.crews.all()
+    members = Prefetch('members', queryset=User.objects.cards())
+    created_crews = request.user.created_crews.prefetch_related(members)
+    member_crews = request.user.crews.select_related('created_by').prefetch_related(members)
     
     context = {
         'created_crews': created_crews,
@@ -379,7 +414,7 @@ def create_crew(request):
         )
         
         # Add creator as first member
-        crew.members.add(request.user)
+        crew.add_member(request.user)
         
         messages.success(request, f'👻 {name} crew created! Start hunting for members!')
         return redirect('crew_detail', crew_id=crew.id)
@@ -390,7 +425,12 @@ def create_crew(request):
 @login_required
 def crew_detail(request, crew_id):
     """View a Ghost Crew and its chat"""
-    crew = get_object_or_404(GhostCrew, id=crew_id)
+    crew = get_object_or_404(
+        GhostCrew.objects.select_related('created_by').prefetch_related(
+            Prefetch('members', queryset=User.objects.cards())
+        ),
+        id=crew_id
+    )
     
     # Check if user is a member
     is_member = request.user in crew.members.all()
@@ -400,7 +440,11 @@ def crew_detail(request, crew_id):
         return redirect('my_crews')
     
     # Get crew messages
-    messages_list = crew.messages.all()
+    messages_list = list(crew.messages.select_related('sender').only(
+        'id', 'crew_id', 'message', 'is_code', 'created_at',
+        *[f'sender__{field}' for field in CARD_FIELDS]
+    ))
+    attach_highlighting([msg for msg in messages_list if msg.is_code], 'message')
     
     context = {
         'crew': crew,
@@ -427,7 +471,7 @@ def send_crew_invitation(request, user_id):
             return redirect('ghost_hunt')
         
         # Check if crew is full
-        if crew.is_full():
+        if crew.is_full:
             messages.error(request, "Your crew is full (max 5 members)!")
             return redirect('ghost_hunt')
         
@@ -443,8 +487,7 @@ def send_crew_invitation(request, user_id):
         return redirect('ghost_hunt')
     
     # Show user's crews to choose from (that aren't full)
-    user_crews = request.user.created_crews.all()
-    available_crews = [crew for crew in user_crews if not crew.is_full()]
+    available_crews = request.user.created_crews.filter(member_count__lt=GhostCrew.MAX_MEMBERS)
     
     context = {
         'to_user': to_user,
@@ -456,7 +499,11 @@ def send_crew_invitation(request, user_id):
 @login_required
 def crew_invitations(request):
     """View pending crew invitations"""
-    invitations = request.user.received_invitations.filter(status='pending')
+    invitations = request.user.received_invitations.filter(status='pending').select_related(
+        'crew__created_by', 'from_user'
+    ).prefetch_related(
+        Prefetch('crew__members', queryset=User.objects.cards())
+    )
     
     context = {
         'invitations': invitations,
@@ -473,8 +520,11 @@ def respond_to_invitation(request, invitation_id):
         action = request.POST.get('action')
         
         if action == 'accept':
+            # The crew may have filled up since the invitation was sent
+            if not invitation.crew.add_member(request.user):
+                messages.error(request, f'{invitation.crew.name} is full (max {GhostCrew.MAX_MEMBERS} members)!')
+                return redirect('crew_invitations')
             invitation.status = 'accepted'
-            invitation.crew.members.add(request.user)
             messages.success(request, f'🎃 You joined {invitation.crew.name}!')
         elif action == 'decline':
             invitation.status = 'declined'
@@ -517,18 +567,28 @@ def send_crew_message(request, crew_id):
 # THE SUMMONING CIRCLE (Hiring) VIEWS
 # ============================================
 
+# Applicants shown per page when reviewing a job's applications
+APPLICANTS_PAGE_SIZE = 20
+
+
+@replica_reads
 def summoning_circle(request):
     """The Summoning Circle - Jobs that don't require degrees!"""
-    jobs = SummoningPost.objects.filter(is_active=True)
+    jobs, next_cursor, facets = search_jobs(SummoningPost.objects.all(), request.GET)
     
-    # Filter by skills if provided
-    skill_filter = request.GET.get('skill')
-    if skill_filter:
-        jobs = jobs.filter(required_skills__contains=skill_filter)
+    # Filters without the cursor, for facet and "more" links
+    filters = request.GET.copy()
+    filters.pop('after', None)
     
     context = {
         'jobs': jobs,
-        'skill_filter': skill_filter,
+        'facets': facets,
+        'next_cursor': next_cursor,
+        'filters': filters,
+        'skill_filters': request.GET.getlist('skill'),
+        'location_filter': request.GET.get('location', ''),
+        'remote_filter': request.GET.get('remote') == '1',
+        'salary_filter': request.GET.get('salary', ''),
     }
     return render(request, 'summoning_circle.html', context)
 
@@ -540,12 +600,12 @@ def create_summoning_post(request):
         company_name = request.POST.get('company_name')
         job_title = request.POST.get('job_title')
         description = request.POST.get('description')
-        required_skills = request.POST.getlist('required_skills')
+        required_skills = split_skills(request.POST.getlist('required_skills'))
         location = request.POST.get('location')
         salary_range = request.POST.get('salary_range', '')
         is_remote = request.POST.get('is_remote') == 'on'
         
-        SummoningPost.objects.create(
+        job = SummoningPost.objects.create(
             company_name=company_name,
             posted_by=request.user,
             job_title=job_title,
@@ -555,6 +615,7 @@ def create_summoning_post(request):
             salary_range=salary_range,
             is_remote=is_remote,
         )
+        job.sync_skills()
         
         messages.success(request, '🔮 Summoning post created! Ghosts will start haunting!')
         return redirect('summoning_circle')
@@ -604,13 +665,31 @@ def my_applications(request):
 
 @login_required
 def job_applications(request, job_id):
-    """View applications for a job (for job posters)"""
+    """Review applications for a job (for job posters) - ranked, filtered by skill, keyset-paginated"""
     job = get_object_or_404(SummoningPost, id=job_id, posted_by=request.user)
-    applications = job.applications.all()
+    
+    sort = request.GET.get('sort', 'recent')
+    if sort not in APPLICANT_SORTS:
+        sort = 'recent'
+    skill = request.GET.get('skill', '').strip()
+    
+    # One row past the page tells whether there's a next one
+    applications = list(
+        job.applications.for_review(sort, skill).after(request.GET.get('after'))[:APPLICANTS_PAGE_SIZE + 1]
+    )
+    next_cursor = None
+    if len(applications) > APPLICANTS_PAGE_SIZE:
+        applications = applications[:APPLICANTS_PAGE_SIZE]
+        next_cursor = applications[-1].review_cursor
     
     context = {
         'job': job,
         'applications': applications,
+        'application_count': job.application_count,
+        'sort': sort,
+        'skill': skill,
+        'next_cursor': next_cursor,
+        'is_first_page': not request.GET.get('after'),
     }
     return render(request, 'job_applications.html', context)
 
@@ -619,17 +698,55 @@ def job_applications(request, job_id):
 # GHOST TRIALS - INVITATION-ONLY OPPORTUNITIES
 # ============================================
 
-from .models import Opportunity, Invitation, Submission, Notification
+from .models import Opportunity, Invitation, Submission, Notification, Shortlist, CompanyFunnel, FUNNEL_STAGES, record_funnel
 from .decorators import company_required, developer_required
 from django.db.models import Q, Avg, Count
-from django.http import JsonResponse
-from django.core.paginator import Paginator
+from datetime import timedelta
+
+# Company dashboard: rows per submission/invitation page, days of funnel history
+DASHBOARD_PAGE_SIZE = 25
+FUNNEL_HISTORY_DAYS = 30
+
+
+def _developer_ids(values):
+    return [int(value) for value in values if str(value).isdigit()]
+
+
+def _adopt_session_shortlist(request):
+    """
+    Shortlists used to live in the session - move a leftover one into the
+    table. Called by every view that reads or edits the shortlist.
+    """
+    legacy_ids = request.session.pop('shortlist', None)
+    if legacy_ids:
+        Shortlist.for_company(request.user).add(_developer_ids(legacy_ids))
+
+
+def _update_shortlist(request):
+    """
+    Apply a shortlist form: action add_to_shortlist / remove_from_shortlist
+    with one or more developer_id values.
+    """
+    shortlist = Shortlist.for_company(request.user)
+    action = request.POST.get('action')
+    developer_ids = _developer_ids(request.POST.getlist('developer_id'))
+    if not developer_ids:
+        return
+    
+    if action == 'add_to_shortlist':
+        shortlist.add(developer_ids)
+        messages.success(request, '👻 Added to shortlist!')
+    elif action == 'remove_from_shortlist':
+        if shortlist.remove(developer_ids):
+            messages.success(request, '✅ Removed from shortlist')
 
 
 @login_required
 @company_required
 def ghost_selector(request):
     """Company browse page to find and shortlist developers"""
+    _adopt_session_shortlist(request)
+    
     # Get all developers (non-company users)
     developers = User.objects.filter(is_company=False, is_verified=True)
     
@@ -639,50 +756,30 @@ def ghost_selector(request):
     min_authenticity = request.GET.get('min_authenticity')
     
     if skills_filter:
-        # Filter by skills (portfolio_data contains skills)
+        # Filter by skills (card keeps the top skills)
         for skill in skills_filter:
-            developers = developers.filter(portfolio_data__icontains=skill)
+            developers = developers.filter(top_skills__icontains=skill)
     
     if min_ghost_level:
         developers = developers.filter(ghost_level__gte=int(min_ghost_level))
     
     if min_authenticity:
-        # Filter by AI percentage (authenticity = 100 - ai_percentage)
-        # This requires checking portfolio_data JSON field
-        pass  # Will implement after seeing portfolio_data structure
+        developers = developers.filter(human_code_percentage__gte=int(min_authenticity))
     
     # Pagination
     paginator = Paginator(developers, 20)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     
-    # Get shortlist from session
-    shortlist_ids = request.session.get('shortlist', [])
-    shortlist = User.objects.filter(id__in=shortlist_ids)
-    
     # Handle shortlist actions
     if request.method == 'POST':
-        action = request.POST.get('action')
-        developer_id = request.POST.get('developer_id')
-        
-        if action == 'add_to_shortlist' and developer_id:
-            if developer_id not in shortlist_ids:
-                shortlist_ids.append(developer_id)
-                request.session['shortlist'] = shortlist_ids
-                messages.success(request, 'Developer added to shortlist!')
-        
-        elif action == 'remove_from_shortlist' and developer_id:
-            if developer_id in shortlist_ids:
-                shortlist_ids.remove(developer_id)
-                request.session['shortlist'] = shortlist_ids
-                messages.success(request, 'Developer removed from shortlist!')
-        
+        _update_shortlist(request)
         return redirect('ghost_selector')
     
     context = {
         'developers': page_obj,
-        'shortlist': shortlist,
-        'shortlist_count': len(shortlist_ids),
+        'shortlist': Shortlist.developers_for(request.user),
+        'shortlist_count': Shortlist.count_for(request.user),
     }
     return render(request, 'ghost_selector.html', context)
 
@@ -691,6 +788,8 @@ def ghost_selector(request):
 @company_required
 def create_opportunity(request):
     """Create a new opportunity (Paid Trial, Internship, or Skill Challenge)"""
+    _adopt_session_shortlist(request)
+    
     if request.method == 'POST':
         # Get common fields
         opportunity_type = request.POST.get('opportunity_type')
@@ -735,12 +834,9 @@ def create_opportunity(request):
         return redirect('send_invitations', opportunity_id=opportunity.id)
     
     # GET request - show form
-    shortlist_ids = request.session.get('shortlist', [])
-    shortlist = User.objects.filter(id__in=shortlist_ids)
-    
     context = {
-        'shortlist': shortlist,
-        'shortlist_count': len(shortlist_ids),
+        'shortlist': Shortlist.developers_for(request.user),
+        'shortlist_count': Shortlist.count_for(request.user),
     }
     return render(request, 'create_opportunity.html', context)
 
@@ -749,61 +845,40 @@ def create_opportunity(request):
 @company_required
 def send_invitations(request, opportunity_id):
     """Send invitations to shortlisted developers"""
+    _adopt_session_shortlist(request)
+    
     opportunity = get_object_or_404(Opportunity, id=opportunity_id, company=request.user)
     
     if request.method == 'POST':
-        # Get shortlisted developers
-        shortlist_ids = request.session.get('shortlist', [])
+        shortlist = Shortlist.for_company(request.user)
         
-        if not shortlist_ids:
+        if not shortlist.entries.exists():
             messages.error(request, 'Please add at least one developer to your shortlist.')
             return redirect('ghost_selector')
         
         # Create invitations
-        created_count = 0
-        for dev_id in shortlist_ids:
-            developer = User.objects.get(id=dev_id)
-            
-            # Check if invitation already exists
-            if not Invitation.objects.filter(opportunity=opportunity, developer=developer).exists():
-                invitation = Invitation.objects.create(
-                    opportunity=opportunity,
-                    developer=developer,
-                    status='pending'
-                )
-                
-                # Create notification
-                type_icons = {
-                    'paid_trial': '💰',
-                    'internship': '🎓',
-                    'skill_challenge': '⭐'
-                }
-                icon = type_icons.get(opportunity.opportunity_type, '👻')
-                
-                Notification.objects.create(
-                    user=developer,
-                    notification_type='invitation_received',
-                    title=f'{icon} New Invitation from {request.user.username}',
-                    message=f'{request.user.username} invited you to: {opportunity.title}',
-                    link=f'/my-invitations/',
-                    invitation=invitation
-                )
-                
-                created_count += 1
+        type_icons = {
+            'paid_trial': '💰',
+            'internship': '🎓',
+            'skill_challenge': '⭐'
+        }
+        icon = type_icons.get(opportunity.opportunity_type, '👻')
+        created_count = shortlist.invite(
+            opportunity,
+            title=f'{icon} New Invitation from {request.user.username}',
+            message=f'{request.user.username} invited you to: {opportunity.title}',
+        )
         
         # Clear shortlist
-        request.session['shortlist'] = []
+        shortlist.clear()
         
         messages.success(request, f'Successfully sent {created_count} invitations!')
         return redirect('company_dashboard')
     
     # GET request - show confirmation page
-    shortlist_ids = request.session.get('shortlist', [])
-    shortlist = User.objects.filter(id__in=shortlist_ids)
-    
     context = {
         'opportunity': opportunity,
-        'shortlist': shortlist,
+        'shortlist': Shortlist.developers_for(request.user),
     }
     return render(request, 'send_invitations.html', context)
 
@@ -812,24 +887,7 @@ def send_invitations(request, opportunity_id):
 @company_required
 def company_dashboard(request):
     """Company dashboard showing opportunities, invitations, and submissions"""
-    # Get company's opportunities
-    opportunities = Opportunity.objects.filter(company=request.user).order_by('-created_at')
-    
-    # Get invitations grouped by status
-    invitations = Invitation.objects.filter(opportunity__company=request.user).select_related('opportunity', 'developer')
-    
-    # Get submissions awaiting rating
-    pending_submissions = Submission.objects.filter(
-        invitation__opportunity__company=request.user,
-        rating__isnull=True
-    ).select_related('invitation__developer', 'invitation__opportunity')
-    
-    context = {
-        'opportunities': opportunities,
-        'invitations': invitations,
-        'pending_submissions': pending_submissions,
-    }
-    return render(request, 'company_dashboard.html', context)
+    return render(request, 'company_dashboard.html', _company_dashboard_context(request))
 
 
 @login_required
@@ -862,9 +920,9 @@ def accept_invitation(request, invitation_id):
         messages.error(request, 'This invitation has already been responded to.')
         return redirect('my_invitations')
     
-    invitation.status = 'accepted'
-    invitation.responded_at = timezone.now()
-    invitation.save()
+    if not invitation.respond('accepted'):
+        messages.error(request, 'This invitation has already been responded to.')
+        return redirect('my_invitations')
     
     # Notify company
     Notification.objects.create(
@@ -890,9 +948,9 @@ def decline_invitation(request, invitation_id):
         messages.error(request, 'This invitation has already been responded to.')
         return redirect('my_invitations')
     
-    invitation.status = 'declined'
-    invitation.responded_at = timezone.now()
-    invitation.save()
+    if not invitation.respond('declined'):
+        messages.error(request, 'This invitation has already been responded to.')
+        return redirect('my_invitations')
     
     # Notify company
     Notification.objects.create(
@@ -931,6 +989,12 @@ def submit_work(request, invitation_id):
         if request.FILES.get('files'):
             submission.files = request.FILES['files']
             submission.save()
+        try:
+            index_submission(submission)
+        except Exception as e:
+            # Similarity flags are a review aid - never fail a submission over them
+            logger.error(f"Error fingerprinting submission {submission.id}: {e}")
+        record_funnel(invitation.opportunity, 'submitted')
         
         # Notify company
         Notification.objects.create(
@@ -962,11 +1026,9 @@ def rate_submission(request, submission_id):
         feedback = request.POST.get('feedback', '')
         public_feedback = request.POST.get('public_feedback') == 'on'
         
-        submission.rating = rating
-        submission.feedback = feedback
-        submission.public_feedback = public_feedback
-        submission.rated_at = timezone.now()
-        submission.save()
+        if not submission.rate(rating, feedback, public_feedback):
+            messages.error(request, '⚠️ This submission has already been rated.')
+            return redirect('company_dashboard')
         
         # Notify developer
         Notification.objects.create(
@@ -981,8 +1043,15 @@ def rate_submission(request, submission_id):
         messages.success(request, 'Submission rated successfully!')
         return redirect('company_dashboard')
     
+    try:
+        near_duplicates = find_near_duplicates(submission)
+    except Exception as e:
+        logger.error(f"Error finding near-duplicates of submission {submission.id}: {e}")
+        near_duplicates = []
+    
     context = {
         'submission': submission,
+        'near_duplicates': near_duplicates,
     }
     return render(request, 'rate_submission.html', context)
 
@@ -1032,17 +1101,18 @@ def notifications_api(request):
 
 from .models import Opportunity, Invitation, Submission
 from .decorators import company_required, developer_required
-from django.core.paginator import Paginator
 from django.db.models import Q, Count
-from django.http import JsonResponse
 
 
 @login_required
 @company_required
+@replica_reads
 def ghost_selector(request):
     """Company view to browse and filter developers"""
+    _adopt_session_shortlist(request)
+    
     # Get all developers (non-company users)
-    developers = User.objects.filter(is_company=False, is_verified=True)
+    developers = User.objects.cards().filter(is_company=False, is_verified=True)
     
     # Apply filters
     skills_filter = request.GET.get('skills', '').strip()
@@ -1050,40 +1120,22 @@ def ghost_selector(request):
     min_authenticity = request.GET.get('min_authenticity', '').strip()
     
     if skills_filter:
-        # Filter by skills (search in core_skills or portfolio_data)
+        # Filter by skills (search in core_skills or the card's top skills)
         skills_list = [s.strip() for s in skills_filter.split(',')]
         q_objects = Q()
         for skill in skills_list:
-            q_objects |= Q(core_skills__icontains=skill) | Q(portfolio_data__top_skills__icontains=skill)
+            q_objects |= Q(core_skills__icontains=skill) | Q(top_skills__icontains=skill)
         developers = developers.filter(q_objects)
     
     if min_ghost_level:
         developers = developers.filter(ghost_level__gte=int(min_ghost_level))
     
     if min_authenticity:
-        # This would need to filter by portfolio_data authenticity
-        pass  # Implement if needed
+        developers = developers.filter(human_code_percentage__gte=int(min_authenticity))
     
     # Handle shortlist actions
     if request.method == 'POST':
-        action = request.POST.get('action')
-        developer_id = request.POST.get('developer_id')
-        
-        if 'shortlist' not in request.session:
-            request.session['shortlist'] = []
-        
-        if action == 'add_to_shortlist' and developer_id:
-            if developer_id not in request.session['shortlist']:
-                request.session['shortlist'].append(developer_id)
-                request.session.modified = True
-                messages.success(request, '👻 Added to shortlist!')
-        
-        elif action == 'remove_from_shortlist' and developer_id:
-            if developer_id in request.session['shortlist']:
-                request.session['shortlist'].remove(developer_id)
-                request.session.modified = True
-                messages.success(request, '✅ Removed from shortlist')
-        
+        _update_shortlist(request)
         return redirect('ghost_selector')
     
     # Paginate developers
@@ -1091,14 +1143,10 @@ def ghost_selector(request):
     page_number = request.GET.get('page')
     developers_page = paginator.get_page(page_number)
     
-    # Get shortlisted developers
-    shortlist_ids = request.session.get('shortlist', [])
-    shortlist = User.objects.filter(id__in=shortlist_ids)
-    
     context = {
         'developers': developers_page,
-        'shortlist': shortlist,
-        'shortlist_count': len(shortlist_ids),
+        'shortlist': Shortlist.developers_for(request.user),
+        'shortlist_count': Shortlist.count_for(request.user),
     }
     
     return render(request, 'ghost_selector.html', context)
@@ -1108,13 +1156,13 @@ def ghost_selector(request):
 @company_required
 def create_opportunity(request):
     """Company view to create an opportunity and invite developers"""
-    # Get shortlist from session
-    shortlist_ids = request.session.get('shortlist', [])
-    shortlist = User.objects.filter(id__in=shortlist_ids)
+    _adopt_session_shortlist(request)
     
     if request.method == 'POST':
+        shortlist = Shortlist.for_company(request.user)
+        
         # Validate shortlist
-        if not shortlist_ids:
+        if not shortlist.entries.exists():
             messages.error(request, '⚠️ Please add developers to your shortlist first!')
             return redirect('ghost_selector')
         
@@ -1159,35 +1207,21 @@ def create_opportunity(request):
         opportunity.save()
         
         # Send invitations to shortlisted developers
-        for dev_id in shortlist_ids:
-            developer = User.objects.get(id=dev_id)
-            invitation = Invitation.objects.create(
-                opportunity=opportunity,
-                developer=developer,
-                status='pending'
-            )
-            
-            # Create notification
-            from .models import Notification
-            Notification.objects.create(
-                user=developer,
-                notification_type='invitation_received',
-                title=f'New {opportunity.get_opportunity_type_display()} Invitation!',
-                message=f'{request.user.username} invited you to: {opportunity.title}',
-                link=f'/my-invitations/',
-                invitation=invitation
-            )
+        invited = shortlist.invite(
+            opportunity,
+            title=f'New {opportunity.get_opportunity_type_display()} Invitation!',
+            message=f'{request.user.username} invited you to: {opportunity.title}',
+        )
         
         # Clear shortlist
-        request.session['shortlist'] = []
-        request.session.modified = True
+        shortlist.clear()
         
-        messages.success(request, f'✨ Opportunity created and {len(shortlist_ids)} invitations sent!')
+        messages.success(request, f'✨ Opportunity created and {invited} invitations sent!')
         return redirect('company_dashboard')
     
     context = {
-        'shortlist': shortlist,
-        'shortlist_count': len(shortlist_ids),
+        'shortlist': Shortlist.developers_for(request.user),
+        'shortlist_count': Shortlist.count_for(request.user),
     }
     
     return render(request, 'create_opportunity.html', context)
@@ -1197,29 +1231,64 @@ def create_opportunity(request):
 @company_required
 def company_dashboard(request):
     """Company dashboard showing opportunities, invitations, and submissions"""
-    opportunities = Opportunity.objects.filter(company=request.user).annotate(
-        invitation_count=Count('invitations'),
-        accepted_count=Count('invitations', filter=Q(invitations__status='accepted')),
-        submission_count=Count('invitations__submission')
-    )
-    
-    invitations = Invitation.objects.filter(opportunity__company=request.user).select_related(
-        'developer', 'opportunity'
-    )
-    
-    # Get submissions awaiting rating
-    pending_submissions = Submission.objects.filter(
-        invitation__opportunity__company=request.user,
-        rating__isnull=True
-    ).select_related('invitation__developer', 'invitation__opportunity')
-    
-    context = {
+    return render(request, 'company_dashboard.html', _company_dashboard_context(request))
+
+
+def _company_dashboard_context(request):
+    """
+    Everything on the dashboard in a fixed number of queries: funnel numbers
+    come from the rollup rows (CompanyFunnel, Opportunity counters, daily
+    buckets) and the submission/invitation panels are paginated.
+    """
+    company = request.user
+    
+    opportunities = Opportunity.objects.filter(company=company).order_by('-created_at')
+    funnel = CompanyFunnel.objects.filter(company=company).first() or CompanyFunnel(company=company)
+    
+    # Submissions awaiting rating, oldest first
+    pending_submissions = Paginator(
+        Submission.objects.filter(invitation__opportunity__company=company, rating__isnull=True)
+        .select_related('invitation__developer', 'invitation__opportunity')
+        .order_by('submitted_at', 'id'),
+        DASHBOARD_PAGE_SIZE,
+    ).get_page(request.GET.get('submissions_page'))
+    
+    invitations = Paginator(
+        Invitation.objects.filter(opportunity__company=company)
+        .select_related('developer', 'opportunity')
+        .order_by('-sent_at', '-id'),
+        DASHBOARD_PAGE_SIZE,
+    ).get_page(request.GET.get('invitations_page'))
+    
+    return {
         'opportunities': opportunities,
+        'funnel': funnel,
+        'funnel_history': _funnel_history(company),
         'invitations': invitations,
         'pending_submissions': pending_submissions,
     }
+
+
+def _funnel_history(company, days=FUNNEL_HISTORY_DAYS):
+    """The last `days` days of funnel buckets, gaps filled with zeros, bars scaled to the busiest day"""
+    today = timezone.localdate()
+    start = today - timedelta(days=days - 1)
+    buckets = {bucket.day: bucket for bucket in company.funnel_days.filter(day__gte=start)}
+    
+    history = []
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        bucket = buckets.get(day)
+        history.append({
+            'day': day,
+            **{stage: getattr(bucket, f'{stage}_count', 0) for stage in FUNNEL_STAGES},
+        })
     
-    return render(request, 'company_dashboard.html', context)
+    peak = max((point['invited'] for point in history), default=0) or 1
+    for point in history:
+        point['invited_pct'] = round(100 * point['invited'] / peak)
+        point['accepted_pct'] = round(100 * point['accepted'] / peak)
+    return history
 
 
 @login_required
@@ -1266,9 +1335,9 @@ def accept_invitation(request, invitation_id):
         return redirect('my_invitations')
     
     if request.method == 'POST':
-        invitation.status = 'accepted'
-        invitation.responded_at = timezone.now()
-        invitation.save()
+        if not invitation.respond('accepted'):
+            messages.error(request, '⚠️ This invitation has already been responded to.')
+            return redirect('my_invitations')
         
         # Notify company
         from .models import Notification
@@ -1298,9 +1367,9 @@ def decline_invitation(request, invitation_id):
         return redirect('my_invitations')
     
     if request.method == 'POST':
-        invitation.status = 'declined'
-        invitation.responded_at = timezone.now()
-        invitation.save()
+        if not invitation.respond('declined'):
+            messages.error(request, '⚠️ This invitation has already been responded to.')
+            return redirect('my_invitations')
         
         # Notify company
         from .models import Notification
@@ -1351,6 +1420,12 @@ def submit_work(request, invitation_id):
         if files:
             submission.files = files
             submission.save()
+        try:
+            index_submission(submission)
+        except Exception as e:
+            # Similarity flags are a review aid - never fail a submission over them
+            logger.error(f"Error fingerprinting submission {submission.id}: {e}")
+        record_funnel(invitation.opportunity, 'submitted')
         
         # Notify company
         from .models import Notification
@@ -1397,11 +1472,9 @@ def rate_submission(request, submission_id):
             return render(request, 'rate_submission.html', {'submission': submission})
         
         # Save rating
-        submission.rating = rating
-        submission.feedback = feedback
-        submission.public_feedback = public_feedback
-        submission.rated_at = timezone.now()
-        submission.save()
+        if not submission.rate(rating, feedback, public_feedback):
+            messages.error(request, '⚠️ This submission has already been rated.')
+            return redirect('company_dashboard')
         
         # Notify developer
         from .models import Notification
@@ -1416,8 +1489,15 @@ def rate_submission(request, submission_id):
         messages.success(request, f'⭐ Submission rated {rating}/5!')
         return redirect('company_dashboard')
     
+    try:
+        near_duplicates = find_near_duplicates(submission)
+    except Exception as e:
+        logger.error(f"Error finding near-duplicates of submission {submission.id}: {e}")
+        near_duplicates = []
+    
     context = {
         'submission': submission,
+        'near_duplicates': near_duplicates,
     }
     
     return render(request, 'rate_submission.html', context)
@@ -1425,6 +1505,7 @@ def rate_submission(request, submission_id):
 
 
 @login_required
+@replica_reads
 def notifications_api(request):
     """API endpoint for notifications"""
     if request.method == 'GET':
@@ -1462,12 +1543,54 @@ def notifications_api(request):
     return JsonResponse({'error': 'Invalid request'}, status=400)
 
 
+@login_required
+@company_required
+def shortlist_api(request):
+    """
+    GET: ids of the shortlisted developers.
+    POST: action=add|remove|clear with developer_ids (repeated) - bulk edits
+    """
+    _adopt_session_shortlist(request)
+    
+    if request.method == 'GET':
+        developer_ids = list(
+            Shortlist.developers_for(request.user).order_by().values_list('id', flat=True)
+        )
+        return JsonResponse({'developer_ids': developer_ids, 'count': len(developer_ids)})
+    
+    elif request.method == 'POST':
+        action = request.POST.get('action')
+        developer_ids = _developer_ids(request.POST.getlist('developer_ids'))
+        shortlist = Shortlist.for_company(request.user)
+        
+        if action == 'add':
+            shortlist.add(developer_ids)
+        elif action == 'remove':
+            shortlist.remove(developer_ids)
+        elif action == 'clear':
+            shortlist.clear()
+        else:
+            return JsonResponse({'error': 'Invalid request'}, status=400)
+        return JsonResponse({'success': True, 'count': shortlist.entries.count()})
+    
+    return JsonResponse({'error': 'Invalid request'}, status=400)
+
+
+@login_required
+def circuit_breakers_api(request):
+    """State and counters of this worker's circuit breakers (staff only)"""
+    if not request.user.is_staff:
+        return JsonResponse({'error': 'Forbidden'}, status=403)
+    
+    return JsonResponse({'breakers': breaker_metrics()})
+
+
 
 @login_required
 def toggle_company_mode(request):
     """Toggle between company and developer mode (for testing/prototyping)"""
     request.user.is_company = not request.user.is_company
-    request.user.save()
+    request.user.save(update_fields=['is_company'])
     
     if request.user.is_company:
         messages.success(request, '🏢 Switched to Company Mode! You can now browse developers and create opportunities.')
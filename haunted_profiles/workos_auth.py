@@ -1,21 +1,37 @@
 """
 WorkOS Authentication Helper for Ghost Hire
 """
-from workos import WorkOSClient
 from django.conf import settings
 from django.contrib.auth import get_user_model
-import random
+from django.db import IntegrityError, transaction
+from .circuit_breaker import CircuitOpen, get_breaker
+from .ghost_ids import allocate_ghost_id
+import threading
 import logging
 
 logger = logging.getLogger(__name__)
 
 User = get_user_model()
 
-# Initialize WorkOS client
-workos_client = WorkOSClient(
-    api_key=settings.WORKOS_API_KEY,
-    client_id=settings.WORKOS_CLIENT_ID,
-)
+# WorkOS client is built on first use (not at import) so worker boot and
+# manage.py commands like migrate/collectstatic don't pay for the SDK
+_workos_client = None
+_workos_client_lock = threading.Lock()
+
+
+def get_workos_client():
+    """Return the shared WorkOS client, importing the SDK and creating it on first call"""
+    global _workos_client
+    if _workos_client is None:
+        with _workos_client_lock:
+            if _workos_client is None:
+                from workos import WorkOSClient
+                _workos_client = WorkOSClient(
+                    api_key=settings.WORKOS_API_KEY,
+                    client_id=settings.WORKOS_CLIENT_ID,
+                    request_timeout=get_breaker('workos').request_timeout,
+                )
+    return _workos_client
 
 
 def get_authorization_url(state=None):
@@ -37,7 +53,7 @@ def get_authorization_url(state=None):
     print(f"=" * 80)
     
     # Use WorkOS SSO with Google OAuth provider
-    authorization_url = workos_client.sso.get_authorization_url(
+    authorization_url = get_workos_client().sso.get_authorization_url(
         provider='GoogleOAuth',
         redirect_uri=redirect_uri,
         state=state or '',
@@ -60,8 +76,14 @@ def handle_callback(code):
         User: Django user object
     """
     try:
-        # Exchange code for profile using WorkOS SSO
-        profile_and_token = workos_client.sso.get_profile_and_token(code)
+        # Exchange code for profile using WorkOS SSO. Only WorkOS being down
+        # trips the breaker - a rejected code is the user's problem, not theirs
+        import httpx
+        from workos.exceptions import ServerException
+        profile_and_token = get_breaker('workos').call(
+            get_workos_client().sso.get_profile_and_token, code,
+            failure_types=(ServerException, httpx.TransportError),
+        )
         
         # Extract profile data
         profile = profile_and_token.profile
@@ -88,16 +110,13 @@ def handle_callback(code):
                 user.save()
             else:
                 # Create new user
-                username = generate_unique_username()
-                user = User.objects.create(
-                    email=email,
-                    username=username,
-                    google_id=workos_id,
-                )
-                logger.info(f"Created new user: {username} with WorkOS ID: {workos_id}")
+                user = create_ghost_user(email=email, google_id=workos_id)
+                logger.info(f"Created new user: {user.username} with WorkOS ID: {workos_id}")
         
         return user
         
+    except CircuitOpen:
+        raise
     except Exception as e:
         logger.error(f"Error handling WorkOS callback: {e}")
         print(f"❌ WorkOS Auth Error: {e}")
@@ -108,14 +127,23 @@ def handle_callback(code):
 
 
 def generate_unique_username():
-    """Generate a unique username in format ghost_XXXXX"""
-    max_attempts = 10
-    for _ in range(max_attempts):
-        username = f"ghost_{random.randint(10000, 99999)}"
-        if not User.objects.filter(username=username).exists():
-            return username
-    
-    # Fallback: use timestamp if all random attempts fail
-    import time
-    return f"ghost_{int(time.time()) % 100000}"
+    """Generate a unique username in format ghost_xxxxxx (see ghost_ids)"""
+    return allocate_ghost_id()
+
+
+def create_ghost_user(max_attempts=3, **fields):
+    """
+    Create a user under a freshly allocated ghost ID. Allocated IDs are
+    never reissued, so a clash only happens if someone took the name by
+    hand (e.g. in the admin) - then the next ID is used.
+    """
+    for attempt in range(max_attempts):
+        username = generate_unique_username()
+        try:
+            with transaction.atomic():
+                return User.objects.create(username=username, **fields)
+        except IntegrityError:
+            # Anything but a username clash (e.g. a duplicate email) is a real error
+            if attempt == max_attempts - 1 or not User.objects.filter(username=username).exists():
+                raise
 